@@ -3,6 +3,7 @@ from django import forms
 from django.utils import timezone
 from .models import Sektor, Grob, Pochowany
 from osoby.models import Osoba
+from osoby.forms import OsobaAutocompleteWidget, etykieta_osoby
 from sakramenty.models import Zgon 
 
 class BootstrapFormMixin:
@@ -17,17 +18,12 @@ class BootstrapFormMixin:
 
 # --- 1. SPECJALNE POLE DO WYBORU OSOBY (ROZWIĄZANIE PROBLEMU DUPLIKATÓW) ---
 class OsobaChoiceField(forms.ModelChoiceField):
+    # Opcje dociąga Tom Select z endpointu podpowiedzi – nie renderujemy całej parafii
+    widget = OsobaAutocompleteWidget
+
     def label_from_instance(self, obj):
-        # Tworzy etykietę: "Kowalski Jan (ur. 1980-01-01, o. Józefa)"
-        opis = f"{obj.nazwisko} {obj.imie_pierwsze}"
-        szczegoly = []
-        if obj.data_urodzenia:
-            szczegoly.append(f"ur. {obj.data_urodzenia}")
-        
-             
-        if szczegoly:
-            opis += f" ({', '.join(szczegoly)})"
-        return opis
+        # ta sama etykieta co w podpowiedziach (osoby/forms.py)
+        return etykieta_osoby(obj)
 
 class SektorForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
@@ -41,7 +37,7 @@ class GrobForm(BootstrapFormMixin, forms.ModelForm):
         queryset=Osoba.objects.all().order_by('nazwisko', 'imie_pierwsze'),
         required=False,
         label="Dysponent (Opiekun)",
-        widget=forms.Select(attrs={'class': 'form-select'}) # Klasa dla stylów
+        widget=OsobaAutocompleteWidget(attrs={'class': 'form-select'}) # Klasa dla stylów
     )
 
     class Meta:
@@ -75,5 +75,25 @@ class CmentarzWyszukiwanieTest(TestCase):
         self.assertEqual(resp.status_code, 200)
 
         groby = resp.context["groby"]
-        self.assertEqual(groby.count(), 1)
-        self.assertEqual(groby.first().pk, self.grob.pk)
+        self.assertEqual(len(groby), 1)
+        self.assertEqual(groby[0].pk, self.grob.pk)
+
+    def test_stronicowanie_kluczowe(self):
+        sektor_a = Sektor.objects.create(nazwa="A1")
+        Grob.objects.bulk_create(
+            Grob(sektor=sektor, rzad="2", numer=str(n))
+            for sektor in (self.sektor, sektor_a)
+            for n in range(1, 16)
+        )
+        oczekiwane = list(Grob.objects.order_by("sektor", "numer", "pk").values_list("pk", flat=True))
+
+        url = reverse("cmentarz:grob_lista")
+        resp = self.client.get(url)
+        pobrane = [g.pk for g in resp.context["groby"]]
+        while resp.context["page_obj"].has_next():
+            link = resp.context["page_obj"].url_nastepnej
+            self.assertIn("po=", link)
+            resp = self.client.get(url + link)
+            pobrane += [g.pk for g in resp.context["groby"]]
+
+        self.assertEqual(pobrane, oczekiwane)
@@ -19,6 +19,8 @@ from konta.mixins import RolaWymaganaMixin
 from konta.models import Rola
 from konta.utils import zapisz_log          # <<< DODANY IMPORT
 from parafia.utils_pdf import render_to_pdf
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import normalizuj
 
 from .forms import GrobForm, PochowanyForm, SektorForm
 from .models import Grob, Pochowany, Sektor
@@ -28,11 +30,12 @@ from .models import Grob, Pochowany, Sektor
 # GROBY
 # =============================================================================
 
-class GrobListaView(LoginRequiredMixin, ListView):
+class GrobListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Grob
     template_name = "cmentarz/lista.html"
     context_object_name = "groby"
     paginate_by = 20
+    klucz_stronicowania = ("sektor_id", "numer", "pk")
 
     def get_queryset(self):
         qs = (
@@ -43,11 +46,12 @@ class GrobListaView(LoginRequiredMixin, ListView):
 
         q = (self.request.GET.get("q") or "").strip()
         if q:
+            q_norm = normalizuj(q)
             qs = qs.filter(
                 Q(rzad__icontains=q)
                 | Q(numer__icontains=q)
-                | Q(pochowani__osoba__nazwisko__icontains=q)
-                | Q(pochowani__osoba__imie_pierwsze__icontains=q)
+                | Q(pochowani__osoba__nazwisko_norm__contains=q_norm)
+                | Q(pochowani__osoba__imie_norm__contains=q_norm)
             ).distinct()
 
         sektor = self.request.GET.get("sektor")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class KonfiguracjaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'konfiguracja'
+
+    def ready(self):
+        # rejestracja sygnałów (cache ustawień parafii)
+        from . import signals  # noqa: F401
@@ -1,9 +1,12 @@
+from django.utils.functional import SimpleLazyObject
+
 from .models import UstawieniaParafii
 
 def dane_parafii(request):
     """
     Wstrzykuje obiekt 'parafia' do każdego szablonu HTML.
+    Leniwie – ustawienia są pobierane dopiero przy pierwszym użyciu w szablonie.
     """
     return {
-        'parafia': UstawieniaParafii.load()
-    }
\ No newline at end of file
+        'parafia': SimpleLazyObject(UstawieniaParafii.load)
+    }
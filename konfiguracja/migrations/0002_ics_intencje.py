@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('konfiguracja', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ustawieniaparafii',
+            name='ics_intencje',
+            field=models.BooleanField(
+                default=False,
+                help_text='Gdy wyłączone, publiczny kalendarz mszy pokazuje tylko terminy.',
+                verbose_name='Publikuj treść intencji w kalendarzu ICS',
+            ),
+        ),
+    ]
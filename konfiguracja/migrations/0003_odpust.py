@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('konfiguracja', '0002_ics_intencje'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ustawieniaparafii',
+            name='odpust_data',
+            field=models.DateField(
+                blank=True,
+                null=True,
+                help_text='Rok nie ma znaczenia – odpust powtarza się co roku tego samego dnia.',
+                verbose_name='Dzień odpustu parafialnego',
+            ),
+        ),
+        migrations.AddField(
+            model_name='ustawieniaparafii',
+            name='odpust_nazwa',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='Tytuł odpustu'),
+        ),
+    ]
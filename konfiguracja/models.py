@@ -1,5 +1,13 @@
+import time
+
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+
+# Jak długo (s) obiekt ustawień żyje w pamięci procesu. W bieżącym procesie
+# zapis/usunięcie czyści go od razu (sygnały); limit czasu dotyczy innych
+# procesów serwera, które o zmianie nie wiedzą.
+CZAS_CACHE_USTAWIEN = 60
 
 class UstawieniaParafii(models.Model):
     """
@@ -16,6 +24,22 @@ class UstawieniaParafii(models.Model):
     konto_bankowe = models.CharField("Nr konta bankowego", max_length=30, blank=True, null=True)
     logo = models.ImageField("Logo / Pieczęć (do wydruków)", upload_to="konfiguracja/logo/", blank=True, null=True)
 
+    # Kalendarz ICS mszy jest publiczny – treść intencji tylko za zgodą parafii
+    ics_intencje = models.BooleanField(
+        "Publikuj treść intencji w kalendarzu ICS",
+        default=False,
+        help_text="Gdy wyłączone, publiczny kalendarz mszy pokazuje tylko terminy.",
+    )
+
+    # Odpust parafialny – liczy się tylko dzień i miesiąc (rok bez znaczenia)
+    odpust_data = models.DateField(
+        "Dzień odpustu parafialnego",
+        blank=True,
+        null=True,
+        help_text="Rok nie ma znaczenia – odpust powtarza się co roku tego samego dnia.",
+    )
+    odpust_nazwa = models.CharField("Tytuł odpustu", max_length=100, blank=True, default="")
+
     class Meta:
         verbose_name = "Konfiguracja Parafii"
         verbose_name_plural = "Konfiguracja Parafii"
@@ -29,8 +53,33 @@ class UstawieniaParafii(models.Model):
             raise ValidationError("Można zdefiniować tylko jedną konfigurację parafii. Edytuj istniejącą.")
         return super(UstawieniaParafii, self).save(*args, **kwargs)
 
+    # (obiekt, chwila wczytania) – wspólne dla całego procesu
+    _cache = None
+
     @classmethod
     def load(cls):
-        """Metoda pomocnicza: pobiera obiekt lub tworzy domyślny, jeśli brak."""
+        """
+        Metoda pomocnicza: pobiera obiekt lub tworzy domyślny, jeśli brak.
+        Wynik jest trzymany w pamięci procesu – kolejne wywołania nie pytają bazy.
+        """
+        wpis = cls._cache
+        if wpis is not None and time.monotonic() - wpis[1] < CZAS_CACHE_USTAWIEN:
+            return wpis[0]
+
         obj, created = cls.objects.get_or_create(pk=1)
-        return obj
\ No newline at end of file
+        cls._cache = (obj, time.monotonic())
+        return obj
+
+    @classmethod
+    def wyczysc_cache(cls):
+        cls._cache = None
+
+    @cached_property
+    def logo_url(self) -> str:
+        """URL logo (liczony raz na wczytany obiekt); '' gdy brak logo."""
+        return self.logo.url if self.logo else ""
+
+    @cached_property
+    def logo_sciezka(self) -> str:
+        """Ścieżka pliku logo na dysku – do wydruków PDF; '' gdy brak logo."""
+        return self.logo.path if self.logo else ""
\ No newline at end of file
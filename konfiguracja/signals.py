@@ -0,0 +1,14 @@
+# konfiguracja/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UstawieniaParafii
+
+
+# =============================================================================
+#  CACHE USTAWIEŃ PARAFII
+# =============================================================================
+@receiver(post_save, sender=UstawieniaParafii)
+@receiver(post_delete, sender=UstawieniaParafii)
+def ustawienia_zmienione(sender, **kwargs):
+    UstawieniaParafii.wyczysc_cache()
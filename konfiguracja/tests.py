@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from konfiguracja.context_processors import dane_parafii
+from konfiguracja.models import UstawieniaParafii
+
+
+class UstawieniaParafiiCacheTest(TestCase):
+    def setUp(self):
+        UstawieniaParafii.objects.get_or_create(pk=1)
+        UstawieniaParafii.wyczysc_cache()
+        self.addCleanup(UstawieniaParafii.wyczysc_cache)
+
+    def test_load_pyta_baze_raz(self):
+        with self.assertNumQueries(1):
+            UstawieniaParafii.load()
+        with self.assertNumQueries(0):
+            obj = UstawieniaParafii.load()
+        self.assertEqual(obj.logo_url, "")
+
+    def test_zapis_czysci_cache(self):
+        obj = UstawieniaParafii.load()
+        obj.nazwa = "Parafia św. Jana"
+        obj.save()
+        self.assertEqual(UstawieniaParafii.load().nazwa, "Parafia św. Jana")
+
+        UstawieniaParafii.objects.all().delete()
+        self.assertEqual(UstawieniaParafii.load().nazwa, "")  # utworzona od nowa
+
+    def test_kontekst_leniwy(self):
+        kontekst = dane_parafii(RequestFactory().get("/"))
+        with self.assertNumQueries(0):
+            Template("bez parafii").render(Context(kontekst))
+        with self.assertNumQueries(1):
+            Template("{{ parafia.nazwa }}").render(Context(kontekst))
+
+    def test_kolejne_strony_nie_pytaja_o_ustawienia(self):
+        User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+        self.client.get(reverse("osoba_lista"))
+
+        with CaptureQueriesContext(connection) as zapytania:
+            self.assertEqual(self.client.get(reverse("osoba_lista")).status_code, 200)
+        tabela = UstawieniaParafii._meta.db_table
+        self.assertFalse([z for z in zapytania if tabela in z["sql"]])
@@ -16,6 +16,7 @@ from django.views import View
 from django.views.generic import ListView, UpdateView
 
 from parafia.utils_pdf import render_to_pdf
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
 from konta.models import Rola
 from .forms import BackupUstawieniaForm
 from .models import BackupUstawienia, LogAkcji
@@ -65,11 +66,12 @@ def pobierz_backup(request):
         return response
 
 
-class LogAkcjiListaView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class LogAkcjiListaView(LoginRequiredMixin, UserPassesTestMixin, StronicowanieKluczoweMixin, ListView):
     model = LogAkcji
     template_name = "konta/log_akcji_lista.html"
     context_object_name = "logi"
     paginate_by = 50
+    klucz_stronicowania = ("-kiedy", "-pk")
 
     def test_func(self):
         user = self.request.user
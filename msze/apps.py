@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class MszeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'msze'
+
+    def ready(self):
+        # rejestracja sygnałów (licznik intencji mszy)
+        from . import signals  # noqa: F401
@@ -2,7 +2,20 @@
 from django import forms
 from datetime import datetime
 from django.utils import timezone
-from .models import Msza, IntencjaMszy, TypMszy
+from .harmonogram import MAKS_DNI
+from .models import (
+    DzienTygodnia,
+    IntencjaMszy,
+    Msza,
+    SposobWplaty,
+    SzablonMszy,
+    TypMszy,
+    WplataIntencji,
+)
+from .konflikty import CELEBRANS, MIEJSCE, konflikty_terminu
+from .liturgia import ADWENT, WIGILIA_PASCHALNA_OD, dzien_liturgiczny
+from .wolne_terminy import DOMYSLNY_LIMIT, MAKS_LIMIT
+from .wplaty import GRUPOWANIA, poczatek_kwartalu
 from slowniki.models import Duchowny
 
 
@@ -96,6 +109,22 @@ class MszaForm(BootstrapFormMixin, forms.ModelForm):
                 )
 
 
+        # 2a. Kalendarz liturgiczny: roraty tylko w dni powszednie Adwentu,
+        #     w Wielki Piątek nie ma mszy, w Wielką Sobotę tylko Wigilia Paschalna
+        if data:
+            dzien = dzien_liturgiczny(data)
+            godzina = cleaned_data.get("godzina")
+            if dzien.bez_mszy:
+                self.add_error("data", f"{dzien.nazwa} – w tym dniu nie odprawia się Mszy świętej.")
+            elif godzina and not dzien.msza_dozwolona(godzina):
+                self.add_error(
+                    "godzina",
+                    f"{dzien.nazwa} – tylko Wigilia Paschalna, "
+                    f"po zmroku (od {WIGILIA_PASCHALNA_OD:%H:%M}).",
+                )
+            elif typ == TypMszy.RORATNIA and (dzien.okres != ADWENT or data.weekday() == 6):
+                self.add_error("typ", "Roraty odprawia się tylko w dni powszednie Adwentu.")
+
     # 3. WALIDACJA: data + godzina nie mogą być w przeszłości
         data = cleaned_data.get("data")
         godzina = cleaned_data.get("godzina")
@@ -111,6 +140,26 @@ class MszaForm(BootstrapFormMixin, forms.ModelForm):
                 self.add_error("data", "Data i godzina mszy nie mogą być w przeszłości.")
                 self.add_error("godzina", "Data i godzina mszy nie mogą być w przeszłości.")
 
+        # 4. KOLIZJE: celebrans / miejsce zajęte o tej samej porze
+        if data and godzina:
+            konflikty = konflikty_terminu(
+                data,
+                godzina,
+                miejsce=cleaned_data.get("miejsce", ""),
+                celebrans=celebrans,
+                pomin_pk=self.instance.pk,
+            )
+            for msza in konflikty[CELEBRANS]:
+                self.add_error(
+                    "celebrans",
+                    f"{celebrans} ma już o tej porze mszę ({msza.miejsce}, {msza.get_typ_display()}).",
+                )
+            if konflikty[MIEJSCE]:
+                self.add_error(
+                    "miejsce",
+                    f"W tym miejscu jest już o tej porze msza ({konflikty[MIEJSCE][0].get_typ_display()}).",
+                )
+
         return cleaned_data
 
 
@@ -125,3 +174,226 @@ class IntencjaForm(BootstrapFormMixin, forms.ModelForm):
             "status_oplaty": forms.Select(),
             "uwagi": forms.Textarea(attrs={"rows": 2}),
         }
+
+
+class SzablonMszyForm(BootstrapFormMixin, forms.ModelForm):
+    celebrans = forms.ModelChoiceField(
+        queryset=Duchowny.objects.filter(aktywny=True).order_by("imie_nazwisko"),
+        required=False,
+        label="Celebrans domyślny",
+        empty_label="--- wybierz ---"
+    )
+
+    miejsce = forms.ChoiceField(
+        label="Miejsce",
+        choices=MszaForm.MIEJSCE_CHOICES,
+        initial="Kościół",
+        widget=forms.Select(),
+    )
+
+    class Meta:
+        model = SzablonMszy
+        fields = ["dzien_tygodnia", "godzina", "typ", "miejsce", "celebrans", "aktywny"]
+        widgets = {
+            "godzina": forms.TimeInput(attrs={"type": "time"}, format="%H:%M"),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["godzina"].input_formats = ["%H:%M"]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        typ = cleaned_data.get("typ")
+        dzien = cleaned_data.get("dzien_tygodnia")
+        if typ == TypMszy.NIEDZIELNA and dzien is not None and int(dzien) != 6:
+            self.add_error("typ", "Typ 'Niedzielna' można ustawić tylko dla niedzieli.")
+        return cleaned_data
+
+
+class GenerowanieMszyForm(BootstrapFormMixin, forms.Form):
+    data_od = forms.DateField(
+        label="Od dnia",
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    data_do = forms.DateField(
+        label="Do dnia",
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    szablony = forms.ModelMultipleChoiceField(
+        queryset=SzablonMszy.objects.filter(aktywny=True).select_related("celebrans"),
+        label="Szablony",
+        widget=forms.CheckboxSelectMultiple(),
+        required=False,
+        help_text="Domyślnie wszystkie aktywne.",
+    )
+
+    def clean_szablony(self):
+        # Brak zaznaczenia = wszystkie aktywne szablony (zgodnie z podpowiedzią).
+        return self.cleaned_data["szablony"] or self.fields["szablony"].queryset
+
+    def clean(self):
+        cleaned_data = super().clean()
+        data_od = cleaned_data.get("data_od")
+        data_do = cleaned_data.get("data_do")
+
+        if data_od and data_od < timezone.localdate():
+            self.add_error("data_od", "Nie można generować mszy w przeszłości.")
+
+        if data_od and data_do:
+            if data_do < data_od:
+                self.add_error("data_do", "Data końcowa jest wcześniejsza niż początkowa.")
+            elif (data_do - data_od).days >= MAKS_DNI:
+                self.add_error("data_do", f"Jednorazowo można wygenerować najwyżej {MAKS_DNI} dni.")
+
+        return cleaned_data
+
+
+class SeriaGregorianskaForm(IntencjaForm):
+    """Intencja + termin pierwszej z 30 mszy gregoriańskich."""
+
+    data_od = forms.DateField(
+        label="Pierwsza msza (dzień)",
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    godzina = forms.TimeField(
+        label="Godzina",
+        widget=forms.TimeInput(attrs={"type": "time"}, format="%H:%M"),
+    )
+    miejsce = forms.ChoiceField(
+        label="Miejsce",
+        choices=MszaForm.MIEJSCE_CHOICES,
+        initial="Kościół",
+        widget=forms.Select(),
+    )
+    celebrans = forms.ModelChoiceField(
+        queryset=Duchowny.objects.filter(aktywny=True).order_by("imie_nazwisko"),
+        required=False,
+        label="Celebrans (dla nowych mszy)",
+        empty_label="--- wybierz ---"
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["godzina"].input_formats = ["%H:%M"]
+
+    def clean_data_od(self):
+        data_od = self.cleaned_data["data_od"]
+        if data_od < timezone.localdate():
+            raise forms.ValidationError("Seria nie może zaczynać się w przeszłości.")
+        return data_od
+
+
+class WolneTerminyForm(BootstrapFormMixin, forms.Form):
+    """Filtry wyszukiwarki wolnych mszy (GET)."""
+
+    od = forms.DateField(
+        label="Od dnia",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    dni = forms.TypedMultipleChoiceField(
+        label="Dni tygodnia",
+        choices=DzienTygodnia.choices,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple(),
+    )
+    godzina_od = forms.TimeField(
+        label="Godzina od",
+        required=False,
+        widget=forms.TimeInput(attrs={"type": "time"}, format="%H:%M"),
+    )
+    godzina_do = forms.TimeField(
+        label="Godzina do",
+        required=False,
+        widget=forms.TimeInput(attrs={"type": "time"}, format="%H:%M"),
+    )
+    miejsce = forms.ChoiceField(
+        label="Miejsce",
+        choices=[("", "--- dowolne ---")] + MszaForm.MIEJSCE_CHOICES,
+        required=False,
+    )
+    typ = forms.ChoiceField(
+        label="Rodzaj mszy",
+        choices=[("", "--- dowolny ---")] + TypMszy.choices,
+        required=False,
+    )
+    limit = forms.IntegerField(
+        label="Ile terminów",
+        min_value=1,
+        max_value=MAKS_LIMIT,
+        required=False,
+        initial=DOMYSLNY_LIMIT,
+    )
+
+
+class WplataForm(BootstrapFormMixin, forms.ModelForm):
+    class Meta:
+        model = WplataIntencji
+        fields = ["kwota", "data", "sposob", "uwagi"]
+        # kwota wpisywana po polsku: "50,00"
+        localized_fields = ["kwota"]
+        widgets = {
+            "data": forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+            "sposob": forms.Select(),
+        }
+
+
+class OkresWplatForm(BootstrapFormMixin, forms.Form):
+    """Filtr okresu (GET) – domyślnie bieżący kwartał."""
+
+    data_od = forms.DateField(
+        label="Od dnia",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    data_do = forms.DateField(
+        label="Do dnia",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+
+    def okres(self):
+        """(data_od, data_do) z formularza, z domyślnymi wartościami."""
+        dzis = timezone.localdate()
+        dane = self.cleaned_data if self.is_valid() else {}
+        return (
+            dane.get("data_od") or poczatek_kwartalu(dzis),
+            dane.get("data_do") or dzis,
+        )
+
+
+class RejestrWplatForm(OkresWplatForm):
+    sposob = forms.ChoiceField(
+        label="Sposób",
+        choices=[("", "--- wszystkie ---")] + SposobWplaty.choices,
+        required=False,
+    )
+
+
+class RaportIntencjiForm(OkresWplatForm):
+    grupowanie = forms.ChoiceField(
+        label="Grupuj wg",
+        choices=[(klucz, etykieta) for klucz, (etykieta, _w) in GRUPOWANIA.items()],
+        required=False,
+    )
+
+
+class KonfliktyMszyForm(BootstrapFormMixin, forms.Form):
+    """Zakres kontroli kolizji – domyślnie cały porządek od dziś."""
+
+    data_od = forms.DateField(
+        label="Od dnia",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+    data_do = forms.DateField(
+        label="Do dnia",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
+    )
+
+    def zakres(self):
+        dane = self.cleaned_data if self.is_valid() else {}
+        return dane.get("data_od") or timezone.localdate(), dane.get("data_do")
@@ -0,0 +1,122 @@
+# msze/gregorianka.py
+"""
+Rezerwacja Mszy gregoriańskich – 30 mszy w kolejnych dniach
+z tą samą intencją. Dni, w których o tej godzinie mszy nie ma
+(Triduum – liturgia.DzienLiturgiczny.msza_dozwolona), seria pomija
+i kończy się o tyle dni później.
+
+Jeden przebieg w jednej transakcji:
+  1. jedno zapytanie o msze w terminach serii (z licznikiem intencji),
+  2. kontrola konfliktów – przy choćby jednym nic nie jest zapisywane,
+  3. bulk_create brakujących mszy,
+  4. bulk_create 30 intencji i jedno UPDATE liczników intencji
+     (bulk_create nie wysyła sygnałów).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .liturgia import dzien_liturgiczny
+from .models import IntencjaMszy, Msza, TypMszy, przelicz_intencje
+
+LICZBA_MSZY_GREGORIANSKICH = 30
+
+
+@dataclass
+class KonfliktSerii:
+    data: date
+    msza: Msza
+    powod: str
+
+    def __str__(self) -> str:
+        return f"{self.data:%d.%m.%Y} {self.msza.godzina:%H:%M}: {self.powod}"
+
+
+def dni_serii(data_od: date, godzina: time | None = None) -> list[date]:
+    """30 kolejnych dni, w których o tej godzinie można odprawić mszę."""
+    dni = []
+    dzien = data_od
+    while len(dni) < LICZBA_MSZY_GREGORIANSKICH:
+        if dzien_liturgiczny(dzien).msza_dozwolona(godzina):
+            dni.append(dzien)
+        dzien += timedelta(days=1)
+    return dni
+
+
+def _msze_serii(dni: list[date], godzina: time, miejsce: str, blokada: bool = False) -> dict[date, Msza]:
+    qs = (
+        Msza.objects
+        .filter(data__in=dni, godzina=godzina, miejsce=miejsce)
+        .order_by("data", "pk")
+    )
+    if blokada:
+        qs = qs.select_for_update()
+    msze = {}
+    for msza in qs:
+        # przy zdublowanym terminie liczy się pierwsza msza
+        msze.setdefault(msza.data, msza)
+    return msze
+
+
+def _konflikty(msze: dict[date, Msza]) -> list[KonfliktSerii]:
+    return [
+        KonfliktSerii(dzien, msza, "msza ma już intencję")
+        for dzien, msza in sorted(msze.items())
+        if msza.liczba_intencji
+    ]
+
+
+def zarezerwuj_serie(
+    data_od: date,
+    godzina: time,
+    miejsce: str,
+    intencja: IntencjaMszy,
+    celebrans=None,
+) -> list[IntencjaMszy]:
+    """
+    Zapisuje intencję (niezapisany obiekt-wzór) na 30 kolejnych dni od `data_od`.
+    Brakujące msze tworzy jako gregoriańskie. Przy konflikcie rzuca
+    ValidationError z listą zajętych terminów – nic nie zostaje zapisane.
+    """
+    dni = dni_serii(data_od, godzina)
+    with transaction.atomic():
+        msze = _msze_serii(dni, godzina, miejsce, blokada=True)
+
+        konflikty = _konflikty(msze)
+        if konflikty:
+            raise ValidationError(
+                [f"Termin zajęty – {k}" for k in konflikty],
+                code="konflikt_serii",
+            )
+
+        nowe_msze = [
+            Msza(
+                data=dzien,
+                godzina=godzina,
+                miejsce=miejsce,
+                typ=TypMszy.GREGORIANSKA,
+                celebrans=celebrans,
+            )
+            for dzien in dni
+            if dzien not in msze
+        ]
+        for msza in Msza.objects.bulk_create(nowe_msze):
+            msze[msza.data] = msza
+
+        intencje = IntencjaMszy.objects.bulk_create(
+            IntencjaMszy(
+                msza=msze[dzien],
+                tresc=intencja.tresc,
+                zamawiajacy=intencja.zamawiajacy,
+                status_oplaty=intencja.status_oplaty,
+                uwagi=intencja.uwagi,
+            )
+            for dzien in dni
+        )
+        przelicz_intencje([msza.pk for msza in msze.values()])
+
+    return intencje
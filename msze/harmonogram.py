@@ -0,0 +1,93 @@
+# msze/harmonogram.py
+"""
+Generowanie mszy ze stałego porządku (SzablonMszy) na wybrany okres.
+
+Cały zakres (np. rok) tworzony jest w jednej transakcji:
+  1. jedno zapytanie o już istniejące terminy (data, godzina, miejsce),
+  2. bulk_create brakujących mszy w porcjach.
+Terminy już obecne w kalendarzu (dodane ręcznie lub wcześniejszym
+generowaniem) są pomijane, więc generowanie można bezpiecznie powtarzać.
+
+Rodzaj mszy bierzemy z szablonu, ale w dni świąteczne i w odpust zwykła
+msza (powszednia / niedzielna) dostaje rodzaj z kalendarza liturgicznego
+(liturgia.py – tabela dni liczona raz na rok). W Wielki Piątek mszy
+nie tworzymy, w Wielką Sobotę tylko wieczorne (Wigilia Paschalna –
+DzienLiturgiczny.msza_dozwolona).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .liturgia import domyslny_typ_mszy, kalendarz, odpust
+from .models import Msza, SzablonMszy, TypMszy
+
+ROZMIAR_PORCJI = 500
+MAKS_DNI = 366
+
+# rodzaje z szablonu, które w święto / odpust zastępuje rodzaj z kalendarza
+TYPY_ZWYKLE = (TypMszy.POWSZEDNIA, TypMszy.NIEDZIELNA)
+TYPY_SWIATECZNE = (TypMszy.SWIATECZNA, TypMszy.ODPUSTOWA)
+
+
+def typ_mszy_z_szablonu(szablon: SzablonMszy, dzien: date, termin_odpustu=None) -> str:
+    if szablon.typ not in TYPY_ZWYKLE:
+        return szablon.typ
+    typ = domyslny_typ_mszy(dzien, termin_odpustu)
+    return typ if typ in TYPY_SWIATECZNE else szablon.typ
+
+
+def generuj_msze(data_od: date, data_do: date, szablony=None) -> tuple[int, int]:
+    """
+    Tworzy msze z szablonów dla dni od `data_od` do `data_do` (włącznie).
+    Domyślnie bierze wszystkie aktywne szablony.
+    Zwraca (liczba utworzonych, liczba pominiętych – termin już zajęty
+    lub dzień bez mszy).
+    """
+    if szablony is None:
+        szablony = SzablonMszy.objects.filter(aktywny=True)
+
+    wg_dnia = defaultdict(list)
+    for szablon in szablony:
+        wg_dnia[szablon.dzien_tygodnia].append(szablon)
+
+    if not wg_dnia or data_od > data_do:
+        return 0, 0
+
+    dni_liturgiczne = kalendarz(data_od, data_do)
+    termin_odpustu = odpust()
+
+    with transaction.atomic():
+        zajete = set(
+            Msza.objects
+            .filter(data__range=(data_od, data_do))
+            .values_list("data", "godzina", "miejsce")
+        )
+
+        nowe = []
+        pominiete = 0
+        dzien = data_od
+        while dzien <= data_do:
+            dzien_l = dni_liturgiczne[dzien]
+            for szablon in wg_dnia.get(dzien.weekday(), ()):
+                termin = (dzien, szablon.godzina, szablon.miejsce)
+                if not dzien_l.msza_dozwolona(szablon.godzina) or termin in zajete:
+                    pominiete += 1
+                    continue
+                zajete.add(termin)
+                nowe.append(
+                    Msza(
+                        data=dzien,
+                        godzina=szablon.godzina,
+                        miejsce=szablon.miejsce,
+                        typ=typ_mszy_z_szablonu(szablon, dzien, termin_odpustu),
+                        celebrans_id=szablon.celebrans_id,
+                    )
+                )
+            dzien += timedelta(days=1)
+
+        Msza.objects.bulk_create(nowe, batch_size=ROZMIAR_PORCJI)
+
+    return len(nowe), pominiete
@@ -0,0 +1,129 @@
+# msze/ics.py
+"""
+Publiczny kalendarz mszy w formacie iCalendar (RFC 5545) – do subskrypcji
+w telefonach i osadzenia na stronie parafii.
+
+- znacznik zakresu (znacznik_zmian_mszy – jedno zapytanie agregujące)
+  daje ETag / Last-Modified i wersję cache,
+- treść pliku budowana jest jednym zapytaniem i trzymana w cache per zakres
+  (parafia/utils_cache.py); generujemy ją ponownie tylko wtedy, gdy
+  znacznik zakresu się zmieni.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from parafia.utils_sql import GroupConcat
+
+from .models import Msza
+
+DNI_WSTECZ = 7
+DNI_NAPRZOD = 90
+MAKS_DNI = 400
+DLUGOSC_MSZY = timedelta(hours=1)
+
+
+# =============================================================================
+#  ZAKRES
+# =============================================================================
+def zakres_z_parametrow(params) -> tuple[date, date]:
+    """?od=RRRR-MM-DD&do=RRRR-MM-DD (domyślnie tydzień wstecz – 90 dni naprzód)."""
+    dzis = timezone.localdate()
+    try:
+        od = parse_date(params.get("od") or "") or dzis - timedelta(days=DNI_WSTECZ)
+        do = parse_date(params.get("do") or "") or od + timedelta(days=DNI_WSTECZ + DNI_NAPRZOD)
+    except ValueError:
+        raise ValueError("Nieprawidłowa data.")
+    if do < od:
+        raise ValueError("Data końcowa jest wcześniejsza niż początkowa.")
+    if (do - od).days > MAKS_DNI:
+        raise ValueError(f"Zakres może obejmować najwyżej {MAKS_DNI} dni.")
+    return od, do
+
+
+# =============================================================================
+#  FORMAT iCalendar
+# =============================================================================
+def _tekst(wartosc: str) -> str:
+    return (
+        wartosc.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _zawin(linia: str) -> list[str]:
+    """Linie dłuższe niż 75 bajtów dzielimy (kontynuacja zaczyna się spacją)."""
+    wynik = []
+    biezaca, dlugosc = "", 0
+    for znak in linia:
+        rozmiar = len(znak.encode("utf-8"))
+        if dlugosc + rozmiar > 75:
+            wynik.append(biezaca)
+            biezaca, dlugosc = " ", 1
+        biezaca += znak
+        dlugosc += rozmiar
+    wynik.append(biezaca)
+    return wynik
+
+
+def _utc(dt: datetime) -> str:
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _wydarzenie(msza: Msza, domena: str, z_intencjami: bool) -> list[str]:
+    poczatek = timezone.make_aware(datetime.combine(msza.data, msza.godzina))
+
+    opis = []
+    celebrans = str(msza.celebrans) if msza.celebrans_id else msza.celebrans_opis
+    if celebrans:
+        opis.append(f"Celebrans: {celebrans}")
+    if z_intencjami and msza.tresci_intencji:
+        opis.append("Intencje:")
+        opis.extend(msza.tresci_intencji.split("\n"))
+
+    linie = [
+        "BEGIN:VEVENT",
+        f"UID:msza-{msza.pk}@{domena}",
+        f"DTSTAMP:{_utc(msza.zmieniono)}",
+        f"LAST-MODIFIED:{_utc(msza.zmieniono)}",
+        f"DTSTART:{_utc(poczatek)}",
+        f"DTEND:{_utc(poczatek + DLUGOSC_MSZY)}",
+        f"SUMMARY:{_tekst(f'Msza św. – {msza.get_typ_display()}')}",
+        f"LOCATION:{_tekst(msza.miejsce)}",
+    ]
+    if opis:
+        linie.append(f"DESCRIPTION:{_tekst(chr(10).join(opis))}")
+    linie.append("END:VEVENT")
+    return linie
+
+
+def generuj_ics(msze_qs, nazwa: str, domena: str, z_intencjami: bool) -> str:
+    """Cały plik .ics dla mszy z querysetu – jedno zapytanie."""
+    msze_qs = msze_qs.select_related("celebrans").order_by("data", "godzina", "pk")
+    if z_intencjami:
+        msze_qs = msze_qs.annotate(
+            tresci_intencji=GroupConcat("intencje__tresc", separator="\n")
+        )
+
+    linie = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{_tekst(domena)}//Msze//PL",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_tekst(nazwa)}",
+        f"X-WR-TIMEZONE:{timezone.get_current_timezone_name()}",
+    ]
+    for msza in msze_qs:
+        linie.extend(_wydarzenie(msza, domena, z_intencjami))
+    linie.append("END:VCALENDAR")
+
+    return "".join(
+        czesc + "\r\n" for linia in linie for czesc in _zawin(linia)
+    )
@@ -0,0 +1,170 @@
+# msze/konflikty.py
+"""
+Wykrywanie kolizji w porządku mszy:
+  - ten sam celebrans (Duchowny) na dwóch nakładających się mszach,
+  - więcej niż MAKS_MSZY_W_MIEJSCU nakładających się mszy w jednym miejscu.
+
+Msza trwa DLUGOSC_MSZY (jak w kalendarzu iCalendar – ics.py), więc msze
+o 18:00 i 18:30 kolidują, a o 18:00 i 19:00 już nie. Porównujemy msze
+z tego samego dnia (msza nie przechodzi przez północ).
+
+Każdy rodzaj kolizji to jedno zapytanie po całym zakresie dat (bez pętli
+po dniach): każda msza złączona z mszami tego dnia, które zaczynają się
+przed jej końcem (podzapytanie po indeksie daty), plus jedno zapytanie
+dociągające msze do wyświetlenia.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import CharField, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+
+from parafia.utils_sql import GroupConcat
+
+from .ics import DLUGOSC_MSZY
+from .models import Msza
+
+MAKS_MSZY_W_MIEJSCU = 1
+
+CELEBRANS = "celebrans"
+MIEJSCE = "miejsce"
+
+
+@dataclass
+class Konflikt:
+    rodzaj: str                     # CELEBRANS / MIEJSCE
+    data: date
+    godzina: time
+    msze_ids: list[int]
+    msze: list[Msza] = field(default_factory=list)
+
+    @property
+    def opis(self) -> str:
+        kto = self.msze[0].celebrans if self.rodzaj == CELEBRANS else self.msze[0].miejsce
+        return f"{kto} – nakładających się mszy: {len(self.msze_ids)}"
+
+    def __str__(self) -> str:
+        return f"{self.data:%d.%m.%Y} {self.godzina:%H:%M}: {self.opis}"
+
+
+def _pozniejsze_nakladajace(pole: str):
+    """
+    Msze z tą samą wartością `pole` tego samego dnia, które zaczynają się
+    nie wcześniej niż msza zewnętrzna i przed jej końcem (przy tej samej
+    godzinie – tylko o większym pk, żeby para nie liczyła się dwa razy).
+    """
+    odstep = ExpressionWrapper(F("godzina") - OuterRef("godzina"), output_field=DurationField())
+    return (
+        Msza.objects.filter(data=OuterRef("data"), **{pole: OuterRef(pole)})
+        .alias(odstep=odstep)
+        .filter(odstep__lt=DLUGOSC_MSZY)
+        .filter(Q(odstep__gt=timedelta(0)) | Q(godzina=OuterRef("godzina"), pk__gt=OuterRef("pk")))
+    )
+
+
+def _grupy(qs, pole: str, maks: int) -> list[tuple[date, time, list[int]]]:
+    """
+    (dzień, godzina, pk mszy) – msza i wszystkie zaczynające się przed jej
+    końcem; trwają naraz w chwili rozpoczęcia ostatniej z nich.
+    """
+    pozniejsze = (
+        _pozniejsze_nakladajace(pole)
+        .order_by()
+        .values(pole)
+        .annotate(msze=GroupConcat(Cast("pk", CharField()), separator=","))
+        .values("msze")
+    )
+    grupy = []
+    for w in (
+        qs.order_by("data", "godzina", "pk")
+        .annotate(pozniejsze=Subquery(pozniejsze[:1]))
+        .filter(pozniejsze__isnull=False)
+        .values("pk", "data", "godzina", "pozniejsze")
+    ):
+        ids = sorted([w["pk"], *(int(pk) for pk in w["pozniejsze"].split(","))])
+        if len(ids) > maks:
+            grupy.append((w["data"], w["godzina"], ids))
+
+    # grupa zawarta w grupie wcześniejszej mszy (np. 7:00, 7:20, 7:40) to ta sama kolizja
+    return [
+        (dzien, godzina, ids)
+        for dzien, godzina, ids in grupy
+        if not any(
+            inne is not ids and inny_dzien == dzien and set(ids) < set(inne)
+            for inny_dzien, _g, inne in grupy
+        )
+    ]
+
+
+def znajdz_konflikty(data_od: date | None = None, data_do: date | None = None) -> list[Konflikt]:
+    """Wszystkie kolizje w zakresie dat (granice opcjonalne), posortowane wg terminu."""
+    qs = Msza.objects.all()
+    if data_od:
+        qs = qs.filter(data__gte=data_od)
+    if data_do:
+        qs = qs.filter(data__lte=data_do)
+
+    konflikty = [
+        Konflikt(CELEBRANS, dzien, godzina, ids)
+        for dzien, godzina, ids in _grupy(qs.filter(celebrans__isnull=False), "celebrans_id", 1)
+    ] + [
+        Konflikt(MIEJSCE, dzien, godzina, ids)
+        for dzien, godzina, ids in _grupy(qs, "miejsce", MAKS_MSZY_W_MIEJSCU)
+    ]
+    if not konflikty:
+        return []
+
+    msze = Msza.objects.select_related("celebrans").in_bulk(
+        {pk for k in konflikty for pk in k.msze_ids}
+    )
+    for k in konflikty:
+        k.msze = [msze[pk] for pk in k.msze_ids]
+
+    konflikty.sort(key=lambda k: (k.data, k.godzina, k.rodzaj))
+    return konflikty
+
+
+def konflikty_terminu(
+    data: date,
+    godzina: time,
+    miejsce: str = "",
+    celebrans=None,
+    pomin_pk: int | None = None,
+) -> dict[str, list[Msza]]:
+    """
+    Kontrola pojedynczej (jeszcze niezapisanej) mszy – jedno zapytanie:
+        {"celebrans": [nakładające się msze z tym samym celebransem],
+         "miejsce": [nakładające się msze w tym miejscu]}
+    """
+    warunek = Q()
+    if miejsce:
+        warunek |= Q(miejsce=miejsce)
+    if celebrans:
+        warunek |= Q(celebrans=celebrans)
+    wynik = {CELEBRANS: [], MIEJSCE: []}
+    if not warunek:
+        return wynik
+
+    # msze tego dnia, które zaczynają się mniej niż DLUGOSC_MSZY przed lub po tej
+    poczatek = datetime.combine(data, godzina)
+    zakres = Q()
+    if (poczatek - DLUGOSC_MSZY).date() == data:
+        zakres &= Q(godzina__gt=(poczatek - DLUGOSC_MSZY).time())
+    if (poczatek + DLUGOSC_MSZY).date() == data:
+        zakres &= Q(godzina__lt=(poczatek + DLUGOSC_MSZY).time())
+
+    qs = Msza.objects.filter(warunek, zakres, data=data).order_by("godzina", "pk")
+    if pomin_pk:
+        qs = qs.exclude(pk=pomin_pk)
+
+    for msza in qs:
+        if celebrans and msza.celebrans_id == celebrans.pk:
+            wynik[CELEBRANS].append(msza)
+        if miejsce and msza.miejsce == miejsce:
+            wynik[MIEJSCE].append(msza)
+    # limit dotyczy łącznej liczby mszy w miejscu (razem z zapisywaną)
+    if len(wynik[MIEJSCE]) + 1 <= MAKS_MSZY_W_MIEJSCU:
+        wynik[MIEJSCE] = []
+    return wynik
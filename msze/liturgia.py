@@ -0,0 +1,327 @@
+# msze/liturgia.py
+"""
+Kalendarz liturgiczny (ryt rzymski, kalendarz dla Polski) – na potrzeby
+porządku mszy: okresy, uroczystości stałe i ruchome, kolor liturgiczny
+i proponowany rodzaj mszy dla każdego dnia.
+
+Wielkanoc i święta ruchome liczone są raz na rok, a cały rok trafia do
+tabeli {data: DzienLiturgiczny} trzymanej w pamięci procesu (lru_cache).
+Kolejne odczyty – generowanie porządku, formularz mszy, kalendarz –
+to zwykłe wyszukanie w słowniku.
+
+Odpust parafialny (UstawieniaParafii.odpust_data) nie wchodzi do tabeli
+(zależy od ustawień), dolicza go dopiero domyslny_typ_mszy().
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from functools import lru_cache
+
+from django.apps import apps
+
+from .models import TypMszy
+
+# okresy liturgiczne
+ADWENT = "ADWENT"
+BOZE_NARODZENIE = "BOZE_NARODZENIE"
+WIELKI_POST = "WIELKI_POST"
+TRIDUUM = "TRIDUUM"
+WIELKANOCNY = "WIELKANOCNY"
+ZWYKLY = "ZWYKLY"
+
+OKRESY = {
+    ADWENT: "Adwent",
+    BOZE_NARODZENIE: "Okres Bożego Narodzenia",
+    WIELKI_POST: "Wielki Post",
+    TRIDUUM: "Triduum Paschalne",
+    WIELKANOCNY: "Okres Wielkanocny",
+    ZWYKLY: "Okres zwykły",
+}
+
+# kolory liturgiczne
+BIALY = "biały"
+CZERWONY = "czerwony"
+FIOLETOWY = "fioletowy"
+ZIELONY = "zielony"
+
+KOLOR_OKRESU = {
+    ADWENT: FIOLETOWY,
+    BOZE_NARODZENIE: BIALY,
+    WIELKI_POST: FIOLETOWY,
+    TRIDUUM: BIALY,
+    WIELKANOCNY: BIALY,
+    ZWYKLY: ZIELONY,
+}
+
+# tło dnia w kalendarzu mszy (FullCalendar)
+KOLOR_TLA = {
+    BIALY: "#fff3cd",
+    CZERWONY: "#f8d7da",
+    FIOLETOWY: "#e2d9f3",
+    ZIELONY: "#d1e7dd",
+}
+
+# rangi obchodów
+UROCZYSTOSC = "uroczystość"
+SWIETO = "święto"
+WSPOMNIENIE = "wspomnienie"
+# dni Triduum mają własną rangę – nie są uroczystościami (msze nie świąteczne)
+DZIEN_TRIDUUM = "dzień Triduum"
+# dzień bez rangi obchodu (Środa Popielcowa) – formularz nie dopisuje rangi
+DZIEN_POWSZEDNI = ""
+
+LATA_W_PAMIECI = 64
+
+# Wigilia Paschalna – po zmroku; wcześniejszych mszy w Wielką Sobotę nie ma
+WIGILIA_PASCHALNA_OD = time(18, 0)
+
+
+@dataclass(frozen=True)
+class Obchod:
+    nazwa: str
+    ranga: str
+    kolor: str = BIALY
+    # dzień świąteczny (nakazany lub wolny od pracy) – msze jak w niedzielę
+    swiateczny: bool = False
+
+
+@dataclass(frozen=True)
+class DzienLiturgiczny:
+    data: date
+    okres: str
+    kolor: str
+    obchod: Obchod | None = None
+
+    @property
+    def nazwa(self) -> str:
+        return self.obchod.nazwa if self.obchod else ""
+
+    @property
+    def nazwa_okresu(self) -> str:
+        return OKRESY[self.okres]
+
+    @property
+    def swiateczny(self) -> bool:
+        return bool(self.obchod and self.obchod.swiateczny)
+
+    @property
+    def bez_mszy(self) -> bool:
+        """Wielki Piątek – jedyny dzień roku bez żadnej Mszy świętej."""
+        return self.obchod is WIELKI_PIATEK
+
+    def msza_dozwolona(self, godzina: time | None) -> bool:
+        """
+        Czy o tej godzinie można odprawić mszę: w Wielki Piątek nie,
+        w Wielką Sobotę tylko Wigilię Paschalną (od WIGILIA_PASCHALNA_OD).
+        """
+        if self.bez_mszy:
+            return False
+        if self.obchod is WIELKA_SOBOTA:
+            return godzina is not None and godzina >= WIGILIA_PASCHALNA_OD
+        return True
+
+    @property
+    def typ_mszy(self) -> str:
+        """Proponowany rodzaj mszy (bez odpustu – patrz domyslny_typ_mszy)."""
+        if self.swiateczny:
+            return TypMszy.SWIATECZNA
+        if self.data.weekday() == 6:
+            return TypMszy.NIEDZIELNA
+        if self.obchod and self.obchod.ranga == UROCZYSTOSC:
+            return TypMszy.SWIATECZNA
+        if self.okres == ADWENT:
+            return TypMszy.RORATNIA
+        return TypMszy.POWSZEDNIA
+
+
+# =============================================================================
+#  DATY RUCHOME
+# =============================================================================
+def wielkanoc(rok: int) -> date:
+    """Niedziela Wielkanocna (algorytm Meeusa/Jonesa/Butchera, kalendarz gregoriański)."""
+    a = rok % 19
+    b, c = divmod(rok, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    miesiac, dzien = divmod(h + l - 7 * m + 114, 31)
+    return date(rok, miesiac, dzien + 1)
+
+
+def pierwsza_niedziela_adwentu(rok: int) -> date:
+    """Czwarta niedziela przed Bożym Narodzeniem (27.11 – 3.12)."""
+    boze_narodzenie = date(rok, 12, 25)
+    return boze_narodzenie - timedelta(days=boze_narodzenie.weekday() + 1 + 21)
+
+
+def chrzest_panski(rok: int) -> date:
+    """Niedziela po Objawieniu Pańskim (6.01) – koniec okresu Bożego Narodzenia."""
+    objawienie = date(rok, 1, 6)
+    return objawienie + timedelta(days=6 - objawienie.weekday() or 7)
+
+
+def _swieta_rodzina(rok: int) -> date:
+    """Niedziela w oktawie Bożego Narodzenia, a gdy jej brak – 30 grudnia."""
+    for dzien in range(26, 32):
+        if date(rok, 12, dzien).weekday() == 6:
+            return date(rok, 12, dzien)
+    return date(rok, 12, 30)
+
+
+# =============================================================================
+#  OBCHODY
+# =============================================================================
+# (miesiąc, dzień) -> obchód
+STALE = {
+    (1, 1): Obchod("Świętej Bożej Rodzicielki Maryi", UROCZYSTOSC, swiateczny=True),
+    (1, 6): Obchod("Objawienie Pańskie", UROCZYSTOSC, swiateczny=True),
+    (2, 2): Obchod("Ofiarowanie Pańskie", SWIETO),
+    (3, 19): Obchod("Św. Józefa, Oblubieńca NMP", UROCZYSTOSC),
+    (3, 25): Obchod("Zwiastowanie Pańskie", UROCZYSTOSC),
+    (5, 3): Obchod("NMP Królowej Polski", UROCZYSTOSC, swiateczny=True),
+    (6, 29): Obchod("Świętych Apostołów Piotra i Pawła", UROCZYSTOSC, CZERWONY),
+    (8, 15): Obchod("Wniebowzięcie NMP", UROCZYSTOSC, swiateczny=True),
+    (11, 1): Obchod("Wszystkich Świętych", UROCZYSTOSC, swiateczny=True),
+    (11, 2): Obchod("Wspomnienie wszystkich wiernych zmarłych", WSPOMNIENIE, FIOLETOWY),
+    (12, 8): Obchod("Niepokalane Poczęcie NMP", UROCZYSTOSC),
+    (12, 25): Obchod("Boże Narodzenie", UROCZYSTOSC, swiateczny=True),
+    (12, 26): Obchod("Św. Szczepana, pierwszego męczennika", SWIETO, CZERWONY, swiateczny=True),
+}
+
+WIELKI_PIATEK = Obchod("Wielki Piątek", DZIEN_TRIDUUM, CZERWONY)
+WIELKA_SOBOTA = Obchod("Wielka Sobota", DZIEN_TRIDUUM)
+
+# przesunięcie względem Wielkanocy (dni) -> obchód
+RUCHOME = {
+    -46: Obchod("Środa Popielcowa", DZIEN_POWSZEDNI, FIOLETOWY),
+    -7: Obchod("Niedziela Palmowa Męki Pańskiej", UROCZYSTOSC, CZERWONY),
+    -3: Obchod("Wielki Czwartek", DZIEN_TRIDUUM),
+    -2: WIELKI_PIATEK,
+    -1: WIELKA_SOBOTA,
+    0: Obchod("Niedziela Zmartwychwstania Pańskiego", UROCZYSTOSC, swiateczny=True),
+    1: Obchod("Poniedziałek Wielkanocny", UROCZYSTOSC, swiateczny=True),
+    7: Obchod("Niedziela Miłosierdzia Bożego", SWIETO),
+    42: Obchod("Wniebowstąpienie Pańskie", UROCZYSTOSC),
+    49: Obchod("Zesłanie Ducha Świętego", UROCZYSTOSC, CZERWONY, swiateczny=True),
+    50: Obchod("NMP Matki Kościoła", WSPOMNIENIE),
+    56: Obchod("Najświętszej Trójcy", UROCZYSTOSC),
+    60: Obchod("Najświętszego Ciała i Krwi Chrystusa (Boże Ciało)", UROCZYSTOSC, swiateczny=True),
+    68: Obchod("Najświętszego Serca Pana Jezusa", UROCZYSTOSC),
+}
+
+CHRYSTUSA_KROLA = Obchod("Jezusa Chrystusa, Króla Wszechświata", UROCZYSTOSC)
+SWIETEJ_RODZINY = Obchod("Świętej Rodziny: Jezusa, Maryi i Józefa", SWIETO)
+CHRZTU_PANSKIEGO = Obchod("Chrzest Pański", SWIETO)
+
+
+def _okres(dzien: date, pasch: date, adwent: date, koniec_bn: date) -> str:
+    if dzien <= koniec_bn:
+        return BOZE_NARODZENIE
+    if pasch - timedelta(days=46) <= dzien <= pasch - timedelta(days=4):
+        return WIELKI_POST
+    if pasch - timedelta(days=3) <= dzien < pasch:
+        return TRIDUUM
+    if pasch <= dzien <= pasch + timedelta(days=49):
+        return WIELKANOCNY
+    if dzien >= date(dzien.year, 12, 25):
+        return BOZE_NARODZENIE
+    if dzien >= adwent:
+        return ADWENT
+    return ZWYKLY
+
+
+def _termin_uroczystosci(dzien: date, pasch: date, adwent: date) -> date:
+    """
+    Uroczystości, które nie mogą być obchodzone w swoim dniu, są przenoszone:
+    z Wielkiego Tygodnia i oktawy Wielkanocy oraz z niedziel Adwentu
+    i Wielkiego Postu (na poniedziałek).
+    """
+    if pasch - timedelta(days=7) <= dzien <= pasch + timedelta(days=7):
+        if dzien.month == 3 and dzien.day == 19:
+            return pasch - timedelta(days=8)        # sobota przed Niedzielą Palmową
+        return pasch + timedelta(days=8)            # poniedziałek po Niedzieli Miłosierdzia
+    if dzien.weekday() == 6 and (
+        pasch - timedelta(days=46) <= dzien < pasch
+        or adwent <= dzien < date(dzien.year, 12, 25)
+    ):
+        return dzien + timedelta(days=1)
+    return dzien
+
+
+@lru_cache(maxsize=LATA_W_PAMIECI)
+def tabela_roku(rok: int) -> dict[date, DzienLiturgiczny]:
+    """Każdy dzień roku -> DzienLiturgiczny. Liczone raz na rok i proces."""
+    pasch = wielkanoc(rok)
+    adwent = pierwsza_niedziela_adwentu(rok)
+    koniec_bn = chrzest_panski(rok)
+
+    obchody: dict[date, Obchod] = {}
+    for (miesiac, dzien), obchod in STALE.items():
+        termin = date(rok, miesiac, dzien)
+        if obchod.ranga == UROCZYSTOSC and not obchod.swiateczny:
+            termin = _termin_uroczystosci(termin, pasch, adwent)
+        obchody[termin] = obchod
+    obchody[_swieta_rodzina(rok)] = SWIETEJ_RODZINY
+    obchody[koniec_bn] = CHRZTU_PANSKIEGO
+    obchody[adwent - timedelta(days=7)] = CHRYSTUSA_KROLA
+    # przy zbiegu dat ruchome mają pierwszeństwo przed stałymi
+    for przesuniecie, obchod in RUCHOME.items():
+        obchody[pasch + timedelta(days=przesuniecie)] = obchod
+
+    tabela = {}
+    dzien = date(rok, 1, 1)
+    while dzien.year == rok:
+        okres = _okres(dzien, pasch, adwent, koniec_bn)
+        obchod = obchody.get(dzien)
+        tabela[dzien] = DzienLiturgiczny(
+            data=dzien,
+            okres=okres,
+            kolor=obchod.kolor if obchod else KOLOR_OKRESU[okres],
+            obchod=obchod,
+        )
+        dzien += timedelta(days=1)
+    return tabela
+
+
+def kalendarz(data_od: date, data_do: date) -> dict[date, DzienLiturgiczny]:
+    """Tabela dni z zakresu (lata liczone raz – potem tylko słownik)."""
+    wynik = {}
+    for rok in range(data_od.year, data_do.year + 1):
+        wynik.update(tabela_roku(rok))
+    return {d: dl for d, dl in wynik.items() if data_od <= d <= data_do}
+
+
+def dzien_liturgiczny(dzien: date) -> DzienLiturgiczny:
+    return tabela_roku(dzien.year)[dzien]
+
+
+# =============================================================================
+#  ODPUST I RODZAJ MSZY
+# =============================================================================
+def odpust() -> tuple[int, int, str] | None:
+    """(miesiąc, dzień, nazwa) odpustu parafialnego z ustawień albo None."""
+    UstawieniaParafii = apps.get_model("konfiguracja", "UstawieniaParafii")
+    ustawienia = UstawieniaParafii.load()
+    if not ustawienia.odpust_data:
+        return None
+    return (
+        ustawienia.odpust_data.month,
+        ustawienia.odpust_data.day,
+        ustawienia.odpust_nazwa or "Odpust parafialny",
+    )
+
+
+def czy_odpust(dzien: date, termin_odpustu=None) -> bool:
+    return bool(termin_odpustu) and (dzien.month, dzien.day) == termin_odpustu[:2]
+
+
+def domyslny_typ_mszy(dzien: date, termin_odpustu=None) -> str:
+    """Rodzaj mszy proponowany dla dnia (odpust > dzień świąteczny > niedziela > roraty)."""
+    if czy_odpust(dzien, termin_odpustu):
+        return TypMszy.ODPUSTOWA
+    return dzien_liturgiczny(dzien).typ_mszy
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from msze.konflikty import znajdz_konflikty
+
+
+class Command(BaseCommand):
+    help = (
+        "Wyszukuje kolizje w porządku mszy: ten sam celebrans lub to samo "
+        "miejsce na kilku nakładających się mszach."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--od", help="Data początkowa RRRR-MM-DD (domyślnie bez ograniczenia).")
+        parser.add_argument("--do", help="Data końcowa RRRR-MM-DD (domyślnie bez ograniczenia).")
+
+    def _data(self, wartosc):
+        if not wartosc:
+            return None
+        try:
+            data = parse_date(wartosc)
+        except ValueError:
+            data = None
+        if data is None:
+            raise CommandError(f"Nieprawidłowa data: {wartosc}")
+        return data
+
+    def handle(self, *args, **options):
+        data_od = self._data(options["od"])
+        data_do = self._data(options["do"])
+
+        start = time.monotonic()
+        konflikty = znajdz_konflikty(data_od, data_do)
+        czas = time.monotonic() - start
+
+        for konflikt in konflikty:
+            msze = ", ".join(f"#{m.pk}" for m in konflikt.msze)
+            self.stdout.write(f"[{konflikt.rodzaj}] {konflikt} ({msze})")
+
+        styl = self.style.WARNING if konflikty else self.style.SUCCESS
+        self.stdout.write(styl(f"Znaleziono kolizji: {len(konflikty)} (w {czas:.2f} s)"))
@@ -0,0 +1,32 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msze', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='msza',
+            name='zmieniono',
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name='Ostatnia zmiana',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='intencjamszy',
+            name='zmieniono',
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name='Ostatnia zmiana',
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,74 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msze', '0002_zmieniono'),
+        ('slowniki', '0002_pola_norm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SzablonMszy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dzien_tygodnia', models.PositiveSmallIntegerField(
+                    choices=[
+                        (0, 'Poniedziałek'),
+                        (1, 'Wtorek'),
+                        (2, 'Środa'),
+                        (3, 'Czwartek'),
+                        (4, 'Piątek'),
+                        (5, 'Sobota'),
+                        (6, 'Niedziela'),
+                    ],
+                    verbose_name='Dzień tygodnia',
+                )),
+                ('godzina', models.TimeField(verbose_name='Godzina mszy')),
+                ('typ', models.CharField(
+                    choices=[
+                        ('POWSZEDNIA', 'Powszednia'),
+                        ('NIEDZIELNA', 'Niedzielna'),
+                        ('SLUBNA', 'Ślubna'),
+                        ('POGRZEBOWA', 'Pogrzebowa'),
+                        ('ODPUSTOWA', 'Odpustowa'),
+                        ('SWIATECZNA', 'Świąteczna'),
+                        ('GREGORIANSKA', 'Gregoriańska'),
+                        ('ZBIOROWA', 'Zbiorowa (wiele intencji)'),
+                        ('JUBILEUSZOWA', 'Jubileuszowa (rocznice)'),
+                        ('RORATNIA', 'Roratnia'),
+                    ],
+                    default='POWSZEDNIA',
+                    max_length=30,
+                    verbose_name='Rodzaj mszy',
+                )),
+                ('miejsce', models.CharField(max_length=120, verbose_name='Miejsce')),
+                ('aktywny', models.BooleanField(
+                    default=True,
+                    help_text='Nieaktywne szablony są pomijane przy generowaniu mszy.',
+                    verbose_name='Aktywny',
+                )),
+                ('celebrans', models.ForeignKey(
+                    blank=True,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='szablony_mszy',
+                    to='slowniki.duchowny',
+                    verbose_name='Celebrans domyślny',
+                )),
+            ],
+            options={
+                'verbose_name': 'Szablon mszy',
+                'verbose_name_plural': 'Szablony mszy',
+                'ordering': ['dzien_tygodnia', 'godzina', 'miejsce'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('dzien_tygodnia', 'godzina', 'miejsce'),
+                        name='unique_szablon_mszy_slot',
+                    ),
+                ],
+            },
+        ),
+    ]
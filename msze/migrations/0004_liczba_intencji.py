@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def przelicz_intencje(apps, schema_editor):
+    Msza = apps.get_model("msze", "Msza")
+    IntencjaMszy = apps.get_model("msze", "IntencjaMszy")
+    liczba = (
+        IntencjaMszy.objects
+        .filter(msza=OuterRef("pk"))
+        .order_by()
+        .values("msza")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Msza.objects.update(liczba_intencji=Coalesce(Subquery(liczba), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msze', '0003_szablonmszy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='msza',
+            name='liczba_intencji',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Liczba intencji'),
+        ),
+        migrations.RunPython(przelicz_intencje, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='msza',
+            index=models.Index(fields=['liczba_intencji', 'data', 'godzina'], name='msza_wolne_terminy_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msze', '0004_liczba_intencji'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WplataIntencji',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kwota', models.DecimalField(
+                    decimal_places=2,
+                    max_digits=8,
+                    validators=[django.core.validators.MinValueValidator(Decimal('0.01'))],
+                    verbose_name='Kwota (zł)',
+                )),
+                ('data', models.DateField(default=django.utils.timezone.localdate, verbose_name='Data wpłaty')),
+                ('sposob', models.CharField(
+                    choices=[('GOTOWKA', 'Gotówka'), ('PRZELEW', 'Przelew'), ('INNY', 'Inny')],
+                    default='GOTOWKA',
+                    max_length=10,
+                    verbose_name='Sposób wpłaty',
+                )),
+                ('uwagi', models.CharField(blank=True, max_length=200, verbose_name='Uwagi')),
+                ('utworzono', models.DateTimeField(auto_now_add=True, verbose_name='Zarejestrowano')),
+                ('intencja', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='wplaty',
+                    to='msze.intencjamszy',
+                    verbose_name='Intencja',
+                )),
+            ],
+            options={
+                'verbose_name': 'Wpłata za intencję',
+                'verbose_name_plural': 'Wpłaty za intencje',
+                'ordering': ['-data', '-pk'],
+                'indexes': [models.Index(fields=['data'], name='msze_wplata_data_c7d4fe_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,13 @@
 # msze/models.py
+import hashlib
+from decimal import Decimal
+
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 
 from slowniki.models import Duchowny
 
@@ -63,12 +70,27 @@ class Msza(models.Model):
         help_text="Np. zmiana celebransa, uwagi organizacyjne.",
     )
 
+    # znacznik zmiany – ETag / Last-Modified kalendarza mszy
+    zmieniono = models.DateTimeField("Ostatnia zmiana", auto_now=True)
+
+    # licznik utrzymywany przez przelicz_intencje() (sygnały intencji);
+    # 0 = msza wolna – wyszukiwarka wolnych terminów idzie po indeksie
+    liczba_intencji = models.PositiveIntegerField(
+        "Liczba intencji",
+        default=0,
+        editable=False,
+    )
+
     class Meta:
         verbose_name = "Msza"
         verbose_name_plural = "Msze"
         ordering = ["data", "godzina", "miejsce"]
         indexes = [
             models.Index(fields=["data"]),
+            models.Index(
+                fields=["liczba_intencji", "data", "godzina"],
+                name="msza_wolne_terminy_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -145,6 +167,8 @@ class IntencjaMszy(models.Model):
         default=STATUS_NIEOPLACONA,
     )
 
+    zmieniono = models.DateTimeField("Ostatnia zmiana", auto_now=True)
+
     class Meta:
         verbose_name = "Intencja mszalna"
         verbose_name_plural = "Intencje mszalne"
@@ -153,3 +177,154 @@ class IntencjaMszy(models.Model):
     def __str__(self) -> str:
         skrot = (self.tresc[:50] + "…") if len(self.tresc) > 50 else self.tresc
         return f"Intencja na {self.msza.data} {self.msza.godzina}: {skrot}"
+
+
+
+# =============================================================================
+#  Wpłaty za intencje (rejestr kasowy)
+# =============================================================================
+class SposobWplaty(models.TextChoices):
+    GOTOWKA = "GOTOWKA", "Gotówka"
+    PRZELEW = "PRZELEW", "Przelew"
+    INNY = "INNY", "Inny"
+
+
+class WplataIntencji(models.Model):
+    intencja = models.ForeignKey(
+        IntencjaMszy,
+        on_delete=models.CASCADE,
+        related_name="wplaty",
+        verbose_name="Intencja",
+    )
+
+    kwota = models.DecimalField(
+        "Kwota (zł)",
+        max_digits=8,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal("0.01"))],
+    )
+
+    data = models.DateField("Data wpłaty", default=timezone.localdate)
+
+    sposob = models.CharField(
+        "Sposób wpłaty",
+        max_length=10,
+        choices=SposobWplaty.choices,
+        default=SposobWplaty.GOTOWKA,
+    )
+
+    uwagi = models.CharField("Uwagi", max_length=200, blank=True)
+
+    utworzono = models.DateTimeField("Zarejestrowano", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Wpłata za intencję"
+        verbose_name_plural = "Wpłaty za intencje"
+        ordering = ["-data", "-pk"]
+        indexes = [
+            models.Index(fields=["data"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kwota} zł ({self.get_sposob_display()}) {self.data}"
+
+def przelicz_intencje(msze_ids) -> None:
+    """
+    Ustawia Msza.liczba_intencji na podstawie faktycznej liczby intencji
+    (jedno UPDATE z podzapytaniem dla wszystkich podanych mszy).
+    Wołane z sygnałów intencji oraz po operacjach zbiorczych (bulk_create).
+    """
+    liczba = (
+        IntencjaMszy.objects
+        .filter(msza=OuterRef("pk"))
+        .order_by()
+        .values("msza")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Msza.objects.filter(pk__in=msze_ids).update(
+        liczba_intencji=Coalesce(Subquery(liczba), 0)
+    )
+
+
+# =============================================================================
+#  Stały porządek mszy (szablon tygodniowy)
+# =============================================================================
+class DzienTygodnia(models.IntegerChoices):
+    # numeracja jak date.weekday(): 0=pn ... 6=nd
+    PONIEDZIALEK = 0, "Poniedziałek"
+    WTOREK = 1, "Wtorek"
+    SRODA = 2, "Środa"
+    CZWARTEK = 3, "Czwartek"
+    PIATEK = 4, "Piątek"
+    SOBOTA = 5, "Sobota"
+    NIEDZIELA = 6, "Niedziela"
+
+
+class SzablonMszy(models.Model):
+    """
+    Jedna pozycja stałego porządku mszy, np. "niedziela 10:00, Kościół".
+    Z aktywnych szablonów generator (msze/harmonogram.py) tworzy msze
+    na wybrany okres.
+    """
+
+    dzien_tygodnia = models.PositiveSmallIntegerField(
+        "Dzień tygodnia",
+        choices=DzienTygodnia.choices,
+    )
+    godzina = models.TimeField("Godzina mszy")
+
+    typ = models.CharField(
+        "Rodzaj mszy",
+        max_length=30,
+        choices=TypMszy.choices,
+        default=TypMszy.POWSZEDNIA,
+    )
+
+    miejsce = models.CharField("Miejsce", max_length=120)
+
+    celebrans = models.ForeignKey(
+        Duchowny,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Celebrans domyślny",
+        related_name="szablony_mszy",
+    )
+
+    aktywny = models.BooleanField(
+        "Aktywny",
+        default=True,
+        help_text="Nieaktywne szablony są pomijane przy generowaniu mszy.",
+    )
+
+    class Meta:
+        verbose_name = "Szablon mszy"
+        verbose_name_plural = "Szablony mszy"
+        ordering = ["dzien_tygodnia", "godzina", "miejsce"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dzien_tygodnia", "godzina", "miejsce"],
+                name="unique_szablon_mszy_slot",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_dzien_tygodnia_display()} {self.godzina:%H:%M} – {self.miejsce}"
+
+
+def znacznik_zmian_mszy(msze_qs):
+    """
+    (skrót stanu mszy z querysetu razem z ich intencjami, chwila ostatniej
+    zmiany lub None) – jedno zapytanie agregujące. Liczniki łapią usunięcia,
+    których nie widać po dacie ostatniej zmiany.
+    """
+    znacznik = msze_qs.aggregate(
+        liczba_mszy=Count("pk", distinct=True),
+        liczba_intencji=Count("intencje"),
+        zmiana_mszy=Max("zmieniono"),
+        zmiana_intencji=Max("intencje__zmieniono"),
+    )
+    zmiany = [z for z in (znacznik["zmiana_mszy"], znacznik["zmiana_intencji"]) if z]
+    skrot = hashlib.md5(repr(sorted(znacznik.items())).encode("utf-8")).hexdigest()
+    return skrot, max(zmiany) if zmiany else None
@@ -0,0 +1,90 @@
+# msze/ogloszenia.py
+"""
+Tygodniowy wykaz intencji (gablota / gazetka parafialna): poniedziałek –
+niedziela, pogrupowany wg dni i miejsc.
+
+PDF tygodnia jest trzymany w cache z wersją = znacznik zmian mszy
+i intencji tego tygodnia (+ dane parafii z nagłówka). Ponowny wydruk
+kosztuje jedno zapytanie agregujące; WeasyPrint rusza tylko po zmianie danych.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.apps import apps
+from django.db.models import Prefetch
+
+from parafia.utils_cache import z_cache_wersji
+from parafia.utils_pdf import html_do_pdf
+
+from .models import IntencjaMszy, Msza, znacznik_zmian_mszy
+
+SZABLON_PDF = "msze/druki/ogloszenia_tygodnia_pdf.html"
+
+
+def granice_tygodnia(dzien: date) -> tuple[date, date]:
+    """(poniedziałek, niedziela) tygodnia, w którym leży `dzien`."""
+    poniedzialek = dzien - timedelta(days=dzien.weekday())
+    return poniedzialek, poniedzialek + timedelta(days=6)
+
+
+def msze_tygodnia(poniedzialek: date):
+    return Msza.objects.filter(data__range=(poniedzialek, poniedzialek + timedelta(days=6)))
+
+
+def dni_tygodnia(poniedzialek: date) -> list[dict]:
+    """
+    [{"data": date, "miejsca": [{"miejsce": str, "msze": [Msza, ...]}, ...]}, ...]
+    dla wszystkich 7 dni (także bez mszy). Dwa zapytania: msze + intencje.
+    """
+    msze = list(
+        msze_tygodnia(poniedzialek)
+        .select_related("celebrans")
+        .prefetch_related(Prefetch("intencje", queryset=IntencjaMszy.objects.order_by("pk")))
+        .order_by("data", "miejsce", "godzina", "pk")
+    )
+    wg_dnia = {
+        dzien: list(msze_dnia)
+        for dzien, msze_dnia in groupby(msze, key=lambda m: m.data)
+    }
+
+    dni = []
+    for i in range(7):
+        dzien = poniedzialek + timedelta(days=i)
+        dni.append({
+            "data": dzien,
+            "miejsca": [
+                {"miejsce": miejsce, "msze": list(msze_miejsca)}
+                for miejsce, msze_miejsca in groupby(wg_dnia.get(dzien, []), key=lambda m: m.miejsce)
+            ],
+        })
+    return dni
+
+
+def _wersja_parafii() -> str:
+    UstawieniaParafii = apps.get_model("konfiguracja", "UstawieniaParafii")
+    parafia = UstawieniaParafii.load()
+    return f"{parafia.nazwa}|{parafia.miejscowosc}|{parafia.adres}|{parafia.logo.name if parafia.logo else ''}"
+
+
+def wersja_tygodnia(poniedzialek: date):
+    """(wersja do ETag / cache, chwila ostatniej zmiany lub None)."""
+    skrot, ostatnia_zmiana = znacznik_zmian_mszy(msze_tygodnia(poniedzialek))
+    wersja = hashlib.md5(
+        f"{poniedzialek}|{skrot}|{_wersja_parafii()}".encode("utf-8")
+    ).hexdigest()
+    return wersja, ostatnia_zmiana
+
+
+def pdf_tygodnia(poniedzialek: date, wersja: str) -> bytes:
+    """PDF wykazu intencji – z cache, jeśli dane tygodnia się nie zmieniły."""
+    def generuj() -> bytes:
+        return html_do_pdf(SZABLON_PDF, {
+            "poniedzialek": poniedzialek,
+            "niedziela": poniedzialek + timedelta(days=6),
+            "dni": dni_tygodnia(poniedzialek),
+        })
+
+    return z_cache_wersji(f"msze:ogloszenia:{poniedzialek}", wersja, generuj)
@@ -0,0 +1,14 @@
+# msze/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import IntencjaMszy, przelicz_intencje
+
+
+# =============================================================================
+#  LICZNIK INTENCJI MSZY (wyszukiwarka wolnych terminów)
+# =============================================================================
+@receiver(post_save, sender=IntencjaMszy)
+@receiver(post_delete, sender=IntencjaMszy)
+def intencja_zmieniona(sender, instance, **kwargs):
+    przelicz_intencje([instance.msza_id])
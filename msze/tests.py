@@ -1,3 +1,598 @@
+# msze/tests.py
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfReader, PdfWriter
+
+from konfiguracja.models import UstawieniaParafii
+from konta.models import Profil, Rola
+from msze.gregorianka import LICZBA_MSZY_GREGORIANSKICH, zarezerwuj_serie
+from msze.forms import GenerowanieMszyForm, MszaForm
+from msze.harmonogram import generuj_msze
+from msze.konflikty import CELEBRANS, MIEJSCE, znajdz_konflikty
+from msze.liturgia import ADWENT, TRIDUUM, dzien_liturgiczny, tabela_roku, wielkanoc
+from msze.wolne_terminy import wolne_terminy
+from msze.models import DzienTygodnia, IntencjaMszy, Msza, SposobWplaty, SzablonMszy, TypMszy, WplataIntencji
+from msze.wplaty import raport_intencji
+from slowniki.models import Duchowny
+
+
+class KalendarzMszyDaneTest(TestCase):
+    def setUp(self):
+        self.url = reverse("msza_kalendarz_dane")
+        jutro = timezone.localdate() + timedelta(days=1)
+        self.zajeta = Msza.objects.create(data=jutro, godzina=time(7, 0), miejsce="Kościół")
+        IntencjaMszy.objects.create(msza=self.zajeta, tresc="+ Jan Kowalski")
+        IntencjaMszy.objects.create(msza=self.zajeta, tresc="+ Anna Nowak")
+        for godzina in range(8, 18):
+            Msza.objects.create(data=jutro, godzina=time(godzina, 0), miejsce="Kościół")
+
+    def test_jedno_zapytanie_na_wydarzenia(self):
+        # znacznik zmian + lista mszy z intencjami – niezależnie od liczby mszy
+        with self.assertNumQueries(2):
+            resp = self.client.get(self.url)
+        wydarzenia = resp.json()
+        self.assertEqual(len(wydarzenia), 11)
+
+        pierwsza = wydarzenia[0]
+        self.assertTrue(pierwsza["extendedProps"]["isBusy"])
+        self.assertEqual(set(pierwsza["title"].split(" • ")), {"+ Jan Kowalski", "+ Anna Nowak"})
+        self.assertFalse(wydarzenia[1]["extendedProps"]["isBusy"])
+        self.assertEqual(wydarzenia[1]["title"], f"{TypMszy.POWSZEDNIA.label} - wolna")
+
+    def test_304_gdy_bez_zmian(self):
+        resp = self.client.get(self.url)
+        etag = resp.headers["ETag"]
+        self.assertIn("Last-Modified", resp.headers)
+
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_zmiana_intencji_zmienia_etag(self):
+        etag = self.client.get(self.url).headers["ETag"]
+
+        self.zajeta.intencje.first().delete()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+        etag = resp.headers["ETag"]
+        intencja = self.zajeta.intencje.first()
+        intencja.tresc = "+ Józef Nowak"
+        intencja.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()[0]["title"], "+ Józef Nowak")
+
+
+class GenerowanieMszyTest(TestCase):
+    def setUp(self):
+        for godzina in (8, 10, 12):
+            SzablonMszy.objects.create(
+                dzien_tygodnia=DzienTygodnia.NIEDZIELA,
+                godzina=time(godzina, 0),
+                miejsce="Kościół",
+                typ=TypMszy.NIEDZIELNA,
+            )
+        SzablonMszy.objects.create(
+            dzien_tygodnia=DzienTygodnia.PONIEDZIALEK, godzina=time(18, 0), miejsce="Kościół"
+        )
+        SzablonMszy.objects.create(
+            dzien_tygodnia=DzienTygodnia.WTOREK, godzina=time(7, 0), miejsce="Kaplica", aktywny=False
+        )
+        # ustawienia parafii (odpust) są w pamięci procesu – bez zapytania przy generowaniu
+        UstawieniaParafii.load()
+
+    def test_caly_rok_stala_liczba_zapytan(self):
+        with CaptureQueriesContext(connection) as zapytania:
+            utworzone, pominiete = generuj_msze(date(2031, 1, 1), date(2031, 12, 31))
+        # szablony + zajęte terminy, potem tylko INSERT-y porcjami
+        # (ich liczba zależy od limitu parametrów bazy, nie od liczby dni)
+        selecty = [z for z in zapytania.captured_queries if z["sql"].startswith("SELECT")]
+        self.assertEqual(len(selecty), 2)
+        self.assertLess(len(zapytania), 10)
+        # 2031: 52 niedziele i 52 poniedziałki
+        self.assertEqual((utworzone, pominiete), (52 * 3 + 52, 0))
+        self.assertFalse(Msza.objects.filter(miejsce="Kaplica").exists())
+        self.assertTrue(
+            all(m.data.weekday() == 6 for m in Msza.objects.filter(typ=TypMszy.NIEDZIELNA))
+        )
+
+    def test_pomija_istniejace_terminy(self):
+        # 2031-01-05 to niedziela
+        Msza.objects.create(data=date(2031, 1, 5), godzina=time(10, 0), miejsce="Kościół")
+        Msza.objects.create(data=date(2031, 1, 5), godzina=time(10, 0), miejsce="Kaplica")
+
+        utworzone, pominiete = generuj_msze(date(2031, 1, 5), date(2031, 1, 6))
+        self.assertEqual((utworzone, pominiete), (3, 1))
+
+        # ponowne uruchomienie niczego nie dubluje
+        self.assertEqual(generuj_msze(date(2031, 1, 5), date(2031, 1, 6)), (0, 4))
+        self.assertEqual(Msza.objects.filter(data=date(2031, 1, 5)).count(), 4)
+
+    def test_formularz_bez_szablonow_bierze_wszystkie_aktywne(self):
+        form = GenerowanieMszyForm(data={"data_od": "2031-01-05", "data_do": "2031-01-06"})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertQuerySetEqual(
+            form.cleaned_data["szablony"],
+            SzablonMszy.objects.filter(aktywny=True),
+            ordered=False,
+        )
+
+
+class SeriaGregorianskaTest(TestCase):
+    def setUp(self):
+        self.start = date(2031, 3, 1)
+        self.istniejaca = Msza.objects.create(
+            data=self.start + timedelta(days=3), godzina=time(7, 0), miejsce="Kościół"
+        )
+
+    def wzor(self):
+        return IntencjaMszy(tresc="+ Jan Kowalski (gregorianka)", zamawiajacy="Rodzina")
+
+    def test_rezerwuje_30_dni_w_stalej_liczbie_zapytan(self):
+        # SELECT terminów, INSERT mszy, INSERT intencji, UPDATE liczników (+ savepointy)
+        with self.assertNumQueries(6):
+            intencje = zarezerwuj_serie(self.start, time(7, 0), "Kościół", self.wzor())
+
+        self.assertEqual(len(intencje), LICZBA_MSZY_GREGORIANSKICH)
+        msze = Msza.objects.filter(intencje__tresc__endswith="(gregorianka)").order_by("data")
+        self.assertEqual(msze.count(), 30)
+        self.assertEqual(msze.first().data, self.start)
+        self.assertEqual(msze.last().data, self.start + timedelta(days=29))
+        # istniejąca wolna msza została użyta, nie zdublowana
+        self.assertEqual(Msza.objects.count(), 30)
+        self.assertEqual(self.istniejaca.intencje.count(), 1)
+        self.assertEqual(Msza.objects.filter(typ=TypMszy.GREGORIANSKA).count(), 29)
+        self.assertFalse(Msza.objects.exclude(liczba_intencji=1).exists())
+
+    def test_seria_pomija_dni_bez_mszy(self):
+        # 2031: Wielki Piątek 11.04, Wielka Sobota 12.04 – o 7:00 bez mszy
+        start = date(2031, 3, 25)
+        intencje = zarezerwuj_serie(start, time(7, 0), "Kościół", self.wzor())
+
+        dni = [intencja.msza.data for intencja in intencje]
+        self.assertEqual(len(dni), LICZBA_MSZY_GREGORIANSKICH)
+        self.assertNotIn(date(2031, 4, 11), dni)
+        self.assertNotIn(date(2031, 4, 12), dni)
+        self.assertEqual(dni[-1], start + timedelta(days=31))
+        self.assertFalse(Msza.objects.filter(data__range=(date(2031, 4, 11), date(2031, 4, 12))).exists())
+
+    def test_konflikt_nic_nie_zapisuje(self):
+        IntencjaMszy.objects.create(msza=self.istniejaca, tresc="+ Anna Nowak")
+
+        with self.assertRaises(ValidationError) as ctx:
+            zarezerwuj_serie(self.start, time(7, 0), "Kościół", self.wzor())
+
+        self.assertEqual(len(ctx.exception.messages), 1)
+        self.assertIn("04.03.2031", ctx.exception.messages[0])
+        self.assertEqual(Msza.objects.count(), 1)
+        self.assertEqual(IntencjaMszy.objects.count(), 1)
+
+
+class WolneTerminyTest(TestCase):
+    def setUp(self):
+        # 2031-01-05 niedziela, 2031-01-06 poniedziałek
+        self.nd_8 = Msza.objects.create(data=date(2031, 1, 5), godzina=time(8, 0), miejsce="Kościół")
+        self.nd_10 = Msza.objects.create(data=date(2031, 1, 5), godzina=time(10, 0), miejsce="Kaplica")
+        self.pn_18 = Msza.objects.create(data=date(2031, 1, 6), godzina=time(18, 0), miejsce="Kościół")
+        self.przeszla = Msza.objects.create(
+            data=timezone.localdate() - timedelta(days=1), godzina=time(18, 0), miejsce="Kościół"
+        )
+
+    def test_licznik_intencji_po_zmianach(self):
+        intencja = IntencjaMszy.objects.create(msza=self.nd_8, tresc="+ Jan")
+        IntencjaMszy.objects.create(msza=self.nd_8, tresc="+ Anna")
+        self.nd_8.refresh_from_db()
+        self.assertEqual(self.nd_8.liczba_intencji, 2)
+
+        intencja.delete()
+        self.nd_8.refresh_from_db()
+        self.assertEqual(self.nd_8.liczba_intencji, 1)
+
+    def test_filtry(self):
+        self.assertEqual(wolne_terminy(), [self.nd_8, self.nd_10, self.pn_18])
+
+        IntencjaMszy.objects.create(msza=self.nd_8, tresc="+ Jan")
+        self.assertEqual(wolne_terminy(), [self.nd_10, self.pn_18])
+        self.assertEqual(wolne_terminy(dni_tygodnia=[0]), [self.pn_18])
+        self.assertEqual(wolne_terminy(miejsce="Kościół"), [self.pn_18])
+        self.assertEqual(wolne_terminy(godzina_od=time(9, 0), godzina_do=time(12, 0)), [self.nd_10])
+        self.assertEqual(wolne_terminy(limit=1), [self.nd_10])
+
+    def test_dane_json(self):
+        User.objects.create_user("sekretariat", password="x")
+        self.client.login(username="sekretariat", password="x")
+        resp = self.client.get(reverse("msza_wolne_terminy_dane"), {"dni": 6, "limit": 5})
+        self.assertEqual([m["id"] for m in resp.json()], [self.nd_8.pk, self.nd_10.pk])
+
+        resp = self.client.get(reverse("msza_wolne_terminy_dane"), {"limit": 500})
+        self.assertEqual(resp.status_code, 400)
+
+
+class KalendarzICSTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        UstawieniaParafii.objects.create(pk=1, nazwa="Parafia św. Jana", ics_intencje=True)
+        UstawieniaParafii.wyczysc_cache()
+        self.url = reverse("msza_kalendarz_ics")
+        jutro = timezone.localdate() + timedelta(days=1)
+        self.msza = Msza.objects.create(data=jutro, godzina=time(18, 0), miejsce="Kościół")
+        IntencjaMszy.objects.create(msza=self.msza, tresc="+ Jan Kowalski, od rodziny")
+        Msza.objects.create(data=jutro, godzina=time(7, 0), miejsce="Kaplica")
+
+    def test_plik_ics_bez_logowania(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/calendar"))
+        tresc = resp.content.decode("utf-8")
+        self.assertTrue(tresc.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(tresc.count("BEGIN:VEVENT"), 2)
+        self.assertIn(f"UID:msza-{self.msza.pk}@testserver", tresc)
+        # intencje tylko na życzenie
+        self.assertNotIn("Kowalski", tresc)
+
+        tresc = self.client.get(self.url, {"intencje": "1", "miejsce": "Kościół"}).content.decode("utf-8")
+        self.assertEqual(tresc.count("BEGIN:VEVENT"), 1)
+        self.assertIn("Kowalski\\, od rodziny", tresc)
+
+    def test_cache_i_warunkowy_get(self):
+        resp = self.client.get(self.url)
+        etag = resp.headers["ETag"]
+
+        # bez zmian: tylko znacznik zakresu, treść z cache
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).content, resp.content)
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        self.msza.miejsce = "Kaplica"
+        self.msza.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn(b"LOCATION:Ko", resp.content)
+
+    def test_bledny_zakres(self):
+        resp = self.client.get(self.url, {"od": "2030-01-10", "do": "2030-01-01"})
+        self.assertEqual(resp.status_code, 400)
+
+
+class OgloszeniaTygodniaTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user("sekretariat", password="x")
+        self.client.login(username="sekretariat", password="x")
+        self.url = reverse("msza_ogloszenia_pdf")
+        # 2031-01-08 środa -> tydzień 06.01 – 12.01
+        self.msza = Msza.objects.create(data=date(2031, 1, 8), godzina=time(18, 0), miejsce="Kościół")
+        IntencjaMszy.objects.create(msza=self.msza, tresc="+ Jan Kowalski")
+        Msza.objects.create(data=date(2031, 1, 12), godzina=time(10, 0), miejsce="Kaplica")
+        Msza.objects.create(data=date(2031, 1, 13), godzina=time(10, 0), miejsce="Kościół")
+
+    def test_grupowanie_dni_i_miejsc(self):
+        resp = self.client.get(reverse("msza_ogloszenia"), {"tydzien": "2031-01-08"})
+        dni = resp.context["dni"]
+        self.assertEqual([d["data"] for d in dni][0], date(2031, 1, 6))
+        self.assertEqual(len(dni), 7)
+        self.assertEqual(dni[2]["miejsca"][0]["msze"], [self.msza])
+        self.assertEqual(dni[6]["miejsca"][0]["miejsce"], "Kaplica")
+        self.assertEqual(dni[0]["miejsca"], [])
+
+    def test_pdf_z_cache_do_zmiany_danych(self):
+        with patch("msze.ogloszenia.html_do_pdf", return_value=b"%PDF") as render:
+            self.client.get(self.url, {"tydzien": "2031-01-08"})
+            resp = self.client.get(self.url, {"tydzien": "2031-01-06"})
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(resp.content, b"%PDF")
+
+            resp = self.client.get(self.url, {"tydzien": "2031-01-08"}, HTTP_IF_NONE_MATCH=resp["ETag"])
+            self.assertEqual(resp.status_code, 304)
+
+            # zmiana w innym tygodniu nie unieważnia wydruku
+            IntencjaMszy.objects.create(msza=Msza.objects.get(data=date(2031, 1, 13)), tresc="+ Anna")
+            self.client.get(self.url, {"tydzien": "2031-01-08"})
+            self.assertEqual(render.call_count, 1)
+
+            IntencjaMszy.objects.create(msza=self.msza, tresc="+ Anna Nowak")
+            self.client.get(self.url, {"tydzien": "2031-01-08"})
+            self.assertEqual(render.call_count, 2)
+
+
+class WplatyIntencjiTest(TestCase):
+    def setUp(self):
+        uzytkownik = User.objects.create_user("proboszcz", password="x")
+        Profil.objects.create(uzytkownik=uzytkownik, rola=Rola.KSIADZ)
+        self.client.login(username="proboszcz", password="x")
+
+        ks = Duchowny.objects.create(imie_nazwisko="Jan Nowak")
+        styczen = Msza.objects.create(data=date(2031, 1, 5), godzina=time(10, 0), miejsce="Kościół", celebrans=ks)
+        luty = Msza.objects.create(
+            data=date(2031, 2, 2), godzina=time(10, 0), miejsce="Kościół", typ=TypMszy.NIEDZIELNA
+        )
+        self.oplacona = IntencjaMszy.objects.create(
+            msza=styczen, tresc="+ Jan", status_oplaty=IntencjaMszy.STATUS_OPLACONA
+        )
+        IntencjaMszy.objects.create(msza=styczen, tresc="+ Anna")
+        self.luty = IntencjaMszy.objects.create(msza=luty, tresc="O zdrowie")
+        WplataIntencji.objects.create(intencja=self.oplacona, kwota=Decimal("50.00"), data=date(2031, 1, 2))
+        WplataIntencji.objects.create(
+            intencja=self.oplacona, kwota=Decimal("20.50"), data=date(2031, 1, 3), sposob=SposobWplaty.PRZELEW
+        )
+
+    def test_raport_w_jednym_zapytaniu(self):
+        with self.assertNumQueries(1):
+            wiersze = raport_intencji(date(2031, 1, 1), date(2031, 3, 31), "miesiac")
+        self.assertEqual(
+            [(w["grupa"], w["liczba"], w["nieoplacone"], w["wplacono"]) for w in wiersze],
+            [
+                (date(2031, 1, 1), 2, 1, Decimal("70.50")),
+                (date(2031, 2, 1), 1, 1, Decimal("0")),
+            ],
+        )
+
+        wg_celebransa = raport_intencji(date(2031, 1, 1), date(2031, 3, 31), "celebrans")
+        self.assertEqual(
+            {w["grupa"]: w["liczba"] for w in wg_celebransa},
+            {"Jan Nowak": 2, "(nie podano)": 1},
+        )
+        wg_typu = raport_intencji(date(2031, 1, 1), date(2031, 3, 31), "typ")
+        self.assertIn(TypMszy.NIEDZIELNA.label, [w["grupa"] for w in wg_typu])
+
+    def test_rejestr_i_eksport_csv(self):
+        params = {"data_od": "2031-01-01", "data_do": "2031-01-31"}
+        resp = self.client.get(reverse("wplaty_lista"), params)
+        self.assertEqual(resp.context["sumy"]["razem"], Decimal("70.50"))
+
+        resp = self.client.get(reverse("wplaty_csv"), params)
+        self.assertIsInstance(resp, StreamingHttpResponse)
+        tresc = b"".join(resp.streaming_content).decode("utf-8")
+        self.assertTrue(tresc.startswith("\ufeffData wpłaty;Kwota;"))
+        self.assertIn("2031-01-03;20,50;Przelew;2031-01-05;10:00;+ Jan", tresc)
+
+    def test_wplata_oznacza_intencje_jako_oplacona(self):
+        resp = self.client.post(
+            reverse("wplata_nowa", args=[self.luty.pk]),
+            {"kwota": "100,00", "data": "2031-01-20", "sposob": SposobWplaty.GOTOWKA, "uwagi": ""},
+        )
+        self.assertRedirects(resp, self.luty.msza.get_absolute_url())
+        self.luty.refresh_from_db()
+        self.assertEqual(self.luty.status_oplaty, IntencjaMszy.STATUS_OPLACONA)
+        self.assertEqual(self.luty.wplaty.get().kwota, Decimal("100.00"))
+
+        resp = self.client.get(self.luty.msza.get_absolute_url())
+        self.assertContains(resp, "Razem: 100")
+
+
+class KonfliktyMszyTest(TestCase):
+    def setUp(self):
+        self.dzien = timezone.localdate() + timedelta(days=10)
+        self.ks = Duchowny.objects.create(imie_nazwisko="Jan Nowak")
+        self.kosciol = Msza.objects.create(
+            data=self.dzien, godzina=time(18, 0), miejsce="Kościół", celebrans=self.ks
+        )
+
+    def dane_formularza(self, **zmiany):
+        dane = {
+            "data": self.dzien.isoformat(),
+            "godzina": "18:00",
+            "typ": TypMszy.POWSZEDNIA,
+            "miejsce": "Kaplica",
+            "celebrans": self.ks.pk,
+            "celebrans_opis": "",
+            "uwagi": "",
+        }
+        dane.update(zmiany)
+        return dane
+
+    def test_formularz_wykrywa_kolizje(self):
+        form = MszaForm(data=self.dane_formularza())
+        self.assertFalse(form.is_valid())
+        self.assertIn("celebrans", form.errors)
+
+        form = MszaForm(data=self.dane_formularza(miejsce="Kościół", celebrans=""))
+        self.assertFalse(form.is_valid())
+        self.assertIn("miejsce", form.errors)
+
+        self.assertTrue(MszaForm(data=self.dane_formularza(godzina="19:00")).is_valid())
+        # edycja tej samej mszy nie koliduje sama ze sobą
+        form = MszaForm(data=self.dane_formularza(miejsce="Kościół"), instance=self.kosciol)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_kolizje_mszy_o_roznych_godzinach(self):
+        # msza trwa godzinę: 18:30 i 17:30 kolidują z 18:00, 19:00 już nie
+        self.assertIn("celebrans", MszaForm(data=self.dane_formularza(godzina="18:30")).errors)
+        self.assertIn("celebrans", MszaForm(data=self.dane_formularza(godzina="17:30")).errors)
+        form = MszaForm(data=self.dane_formularza(godzina="18:45", miejsce="Kościół", celebrans=""))
+        self.assertIn("miejsce", form.errors)
+        self.assertTrue(MszaForm(data=self.dane_formularza(godzina="19:00", miejsce="Kościół")).is_valid())
+
+        kaplica = Msza.objects.create(
+            data=self.dzien, godzina=time(18, 30), miejsce="Kaplica", celebrans=self.ks
+        )
+        wieczorna = Msza.objects.create(
+            data=self.dzien, godzina=time(19, 0), miejsce="Kościół", celebrans=self.ks
+        )
+        poranne = [
+            Msza.objects.create(data=self.dzien, godzina=time(7, minuty), miejsce="Kościół")
+            for minuty in (0, 20, 40)
+        ]
+
+        konflikty = znajdz_konflikty(self.dzien, self.dzien)
+        self.assertEqual(
+            [(k.rodzaj, k.godzina, k.msze_ids) for k in konflikty],
+            [
+                # 7:00, 7:20 i 7:40 trwają naraz – jedna kolizja, nie dwie
+                (MIEJSCE, time(7, 0), [m.pk for m in poranne]),
+                (CELEBRANS, time(18, 0), [self.kosciol.pk, kaplica.pk]),
+                (CELEBRANS, time(18, 30), [kaplica.pk, wieczorna.pk]),
+            ],
+        )
+
+    def test_audyt_zakresu(self):
+        kaplica = Msza.objects.create(
+            data=self.dzien, godzina=time(18, 0), miejsce="Kaplica", celebrans=self.ks
+        )
+        drugi = Msza.objects.create(data=self.dzien, godzina=time(18, 0), miejsce="Kościół")
+        for i in range(20):
+            Msza.objects.create(data=self.dzien + timedelta(days=i + 1), godzina=time(18, 0), miejsce="Kościół")
+
+        # dwa GROUP BY + dociągnięcie mszy – niezależnie od długości zakresu
+        with self.assertNumQueries(3):
+            konflikty = znajdz_konflikty(self.dzien, self.dzien + timedelta(days=60))
+        self.assertEqual(
+            [(k.rodzaj, k.msze_ids) for k in konflikty],
+            [
+                (CELEBRANS, [self.kosciol.pk, kaplica.pk]),
+                (MIEJSCE, [self.kosciol.pk, drugi.pk]),
+            ],
+        )
+        self.assertEqual(znajdz_konflikty(self.dzien + timedelta(days=1)), [])
+
+        wyjscie = StringIO()
+        call_command("sprawdz_konflikty_mszy", stdout=wyjscie)
+        self.assertIn("Znaleziono kolizji: 2", wyjscie.getvalue())
+
+
+class KalendarzLiturgicznyTest(TestCase):
+    def setUp(self):
+        UstawieniaParafii.wyczysc_cache()
+        self.addCleanup(UstawieniaParafii.wyczysc_cache)
+
+    def test_swieta_ruchome(self):
+        self.assertEqual(
+            [wielkanoc(rok) for rok in (2024, 2025, 2038)],
+            [date(2024, 3, 31), date(2025, 4, 20), date(2038, 4, 25)],
+        )
+        boze_cialo = dzien_liturgiczny(date(2025, 6, 19))
+        self.assertIn("Boże Ciało", boze_cialo.nazwa)
+        self.assertEqual(boze_cialo.typ_mszy, TypMszy.SWIATECZNA)
+        self.assertEqual(dzien_liturgiczny(date(2025, 11, 30)).okres, ADWENT)
+        self.assertEqual(dzien_liturgiczny(date(2025, 12, 1)).typ_mszy, TypMszy.RORATNIA)
+        self.assertEqual(dzien_liturgiczny(date(2025, 4, 18)).okres, TRIDUUM)
+
+        # 2025: Środa Popielcowa 5.03, Wielki Czwartek 17.04, Wielka Sobota 19.04
+        popielec = dzien_liturgiczny(date(2025, 3, 5))
+        self.assertEqual((popielec.nazwa, popielec.obchod.ranga), ("Środa Popielcowa", ""))
+        self.assertEqual(popielec.typ_mszy, TypMszy.POWSZEDNIA)
+        self.assertEqual(dzien_liturgiczny(date(2025, 4, 17)).typ_mszy, TypMszy.POWSZEDNIA)
+        self.assertEqual(
+            [dzien_liturgiczny(date(2025, 4, d)).bez_mszy for d in (17, 18, 19, 20)],
+            [False, True, False, False],
+        )
+        # Wielka Sobota – tylko Wigilia Paschalna wieczorem
+        sobota = dzien_liturgiczny(date(2025, 4, 19))
+        self.assertFalse(sobota.msza_dozwolona(time(7, 0)))
+        self.assertTrue(sobota.msza_dozwolona(time(20, 0)))
+
+        # 2008: Wielkanoc 23.03 – uroczystości z Wielkiego Tygodnia przeniesione
+        nazwy = {d: dl.nazwa for d, dl in tabela_roku(2008).items()}
+        self.assertEqual(nazwy[date(2008, 3, 15)], "Św. Józefa, Oblubieńca NMP")
+        self.assertEqual(nazwy[date(2008, 3, 31)], "Zwiastowanie Pańskie")
+
+    def test_generowanie_wg_kalendarza(self):
+        UstawieniaParafii.objects.create(pk=1, odpust_data=date(2000, 6, 24), odpust_nazwa="Św. Jana")
+        for dzien in (DzienTygodnia.PONIEDZIALEK, DzienTygodnia.WTOREK, DzienTygodnia.PIATEK):
+            SzablonMszy.objects.create(dzien_tygodnia=dzien, godzina=time(18, 0), miejsce="Kościół")
+        for godzina in (time(7, 0), time(19, 0)):
+            SzablonMszy.objects.create(dzien_tygodnia=DzienTygodnia.SOBOTA, godzina=godzina, miejsce="Kościół")
+
+        # 2031: Wielkanoc 13.04, odpust 24.06 (wtorek)
+        utworzone, pominiete = generuj_msze(date(2031, 4, 10), date(2031, 6, 30))
+        # Wielki Piątek (11.04) bez mszy, w Wielką Sobotę (12.04) tylko wieczorna
+        self.assertEqual(pominiete, 2)
+        self.assertFalse(Msza.objects.filter(data=date(2031, 4, 11)).exists())
+        self.assertEqual(
+            list(Msza.objects.filter(data=date(2031, 4, 12)).values_list("godzina", flat=True)),
+            [time(19, 0)],
+        )
+        self.assertEqual(Msza.objects.get(data=date(2031, 4, 14)).typ, TypMszy.SWIATECZNA)
+        self.assertEqual(Msza.objects.get(data=date(2031, 6, 24)).typ, TypMszy.ODPUSTOWA)
+        self.assertEqual(Msza.objects.get(data=date(2031, 6, 23)).typ, TypMszy.POWSZEDNIA)
+
+    def test_formularz_mszy(self):
+        uzytkownik = User.objects.create_user("proboszcz", password="x")
+        Profil.objects.create(uzytkownik=uzytkownik, rola=Rola.KSIADZ)
+        self.client.login(username="proboszcz", password="x")
+
+        resp = self.client.get(reverse("msza_nowa"), {"data": "2031-12-25"})
+        self.assertEqual(resp.context["form"].initial["typ"], TypMszy.SWIATECZNA)
+        self.assertContains(resp, "Boże Narodzenie")
+
+        form = MszaForm(data={
+            "data": "2031-06-03", "godzina": "06:30", "typ": TypMszy.RORATNIA, "miejsce": "Kościół",
+        })
+        self.assertIn("typ", form.errors)
+        form = MszaForm(data={
+            "data": "2031-12-03", "godzina": "06:30", "typ": TypMszy.RORATNIA, "miejsce": "Kościół",
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+
+        # 2031: Wielki Piątek 11.04, Wigilia Paschalna 12.04 wieczorem
+        def formularz(dzien, godzina):
+            return MszaForm(data={
+                "data": dzien, "godzina": godzina, "typ": TypMszy.SWIATECZNA, "miejsce": "Kościół",
+            })
+
+        self.assertIn("data", formularz("2031-04-11", "18:00").errors)
+        self.assertIn("godzina", formularz("2031-04-12", "08:00").errors)
+        wigilia = formularz("2031-04-12", "20:00")
+        self.assertTrue(wigilia.is_valid(), wigilia.errors)
+
+
+class WydrukListyMszyTest(TestCase):
+    def setUp(self):
+        User.objects.create_user("sekretariat", password="x")
+        self.client.login(username="sekretariat", password="x")
+        for i in range(5):
+            msza = Msza.objects.create(data=date(2031, 1, 1 + i), godzina=time(18, 0), miejsce="Kościół")
+            IntencjaMszy.objects.create(msza=msza, tresc=f"+ Intencja {i + 1}")
+        Msza.objects.create(data=date(2032, 1, 1), godzina=time(18, 0), miejsce="Kościół")
+
+    @patch("msze.views.ROZMIAR_PORCJI_DRUKU", 2)
+    def test_druk_html_strumieniowo_porcjami(self):
+        resp = self.client.get(reverse("msza_lista_druk"), {"data_do": "2031-12-31"})
+        self.assertIsInstance(resp, StreamingHttpResponse)
+
+        # jedno zapytanie o msze (kursor czytany porcjami) + prefetch intencji na porcję
+        with self.assertNumQueries(4):
+            tresc = b"".join(resp.streaming_content).decode("utf-8")
+        self.assertEqual(tresc.count("<tr>"), 1 + 5)
+        self.assertLess(tresc.index("+ Intencja 2"), tresc.index("+ Intencja 3"))
+        self.assertIn('<td class="col-lp">5</td>', tresc)
+        self.assertIn("Mszy: 5", tresc)
+        self.assertTrue(tresc.rstrip().endswith("</html>"))
+
+    @patch("msze.views.ROZMIAR_SEKCJI_PDF", 2)
+    @patch("parafia.utils_pdf.HTML")
+    def test_pdf_renderowany_sekcjami(self, html):
+        def zapis_strony(plik):
+            strona = PdfWriter()
+            strona.add_blank_page(100, 100)
+            strona.write(plik)
+
+        html.return_value.write_pdf.side_effect = zapis_strony
+
+        resp = self.client.get(reverse("msza_lista_pdf"), {"data_do": "2031-12-31"})
 
-# Create your tests here.
+        sekcje = [wywolanie.kwargs["string"] for wywolanie in html.call_args_list]
+        self.assertEqual(len(sekcje), 3)
+        self.assertIn("Część 2 z 3", sekcje[1])
+        self.assertIn('<td class="col-lp">3</td>', sekcje[1])
+        self.assertIn("+ Intencja 5", sekcje[2])
+        self.assertNotIn("+ Intencja 1", sekcje[1])
+        # każda sekcja zapisana osobno, pliki scalone w jeden dokument
+        self.assertEqual(html.return_value.write_pdf.call_count, 3)
+        self.assertEqual(len(PdfReader(BytesIO(resp.content)).pages), 3)
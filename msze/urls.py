@@ -9,10 +9,32 @@ urlpatterns = [
     path("msze/<int:pk>/edytuj/", views.MszaEdycjaView.as_view(), name="msza_edytuj"),
     path("msze/<int:pk>/usun/", views.MszaUsunView.as_view(), name="msza_usun"),
     path("msze/<int:msza_pk>/intencja/nowa/",views.IntencjaNowaView.as_view(),name="intencja_nowa"),
+    path("msze/gregorianka/nowa/", views.SeriaGregorianskaView.as_view(), name="gregorianka_nowa"),
     path("panel/intencje/<int:pk>/edytuj/", views.IntencjaEdycjaView.as_view(), name="intencja_edytuj"), 
     path("panel/intencje/<int:pk>/usun/", views.IntencjaUsunView.as_view(), name="intencja_usun"),
 
+    path("panel/intencje/<int:intencja_pk>/wplata/", views.WplataNowaView.as_view(), name="wplata_nowa"),
+    path("panel/wplaty/<int:pk>/usun/", views.WplataUsunView.as_view(), name="wplata_usun"),
+    path("msze/wplaty/", views.RejestrWplatView.as_view(), name="wplaty_lista"),
+    path("msze/wplaty/csv/", views.RejestrWplatCSVView.as_view(), name="wplaty_csv"),
+    path("msze/intencje/raport/", views.RaportIntencjiView.as_view(), name="intencje_raport"),
+
     path("msze/kalendarz/", views.KalendarzMszyView.as_view(), name="msza_kalendarz"),
     path("msze/kalendarz/dane/", views.kalendarz_mszy_dane, name="msza_kalendarz_dane"),
+    path("msze/kalendarz.ics", views.kalendarz_mszy_ics, name="msza_kalendarz_ics"),
+    path("msze/porzadek/", views.SzablonMszyListaView.as_view(), name="szablon_mszy_lista"),
+    path("msze/porzadek/nowy/", views.SzablonMszyNowyView.as_view(), name="szablon_mszy_nowy"),
+    path("msze/porzadek/<int:pk>/edytuj/", views.SzablonMszyEdycjaView.as_view(), name="szablon_mszy_edytuj"),
+    path("msze/porzadek/<int:pk>/usun/", views.SzablonMszyUsunView.as_view(), name="szablon_mszy_usun"),
+    path("msze/porzadek/generuj/", views.GenerujMszeView.as_view(), name="msza_generuj"),
+
+    path("msze/konflikty/", views.KonfliktyMszyView.as_view(), name="msza_konflikty"),
+    path("msze/wolne/", views.WolneTerminyView.as_view(), name="msza_wolne_terminy"),
+    path("msze/wolne/dane/", views.wolne_terminy_dane, name="msza_wolne_terminy_dane"),
+
+    path("msze/intencje-tygodnia/", views.OgloszeniaTygodniaView.as_view(), name="msza_ogloszenia"),
+    path("msze/intencje-tygodnia/pdf/", views.OgloszeniaTygodniaPDFView.as_view(), name="msza_ogloszenia_pdf"),
+
+    path("lista/druk/", views.MszaListaDrukView.as_view(), name="msza_lista_druk"),
     path("lista/pdf/", views.MszaListaPDFView.as_view(), name="msza_lista_pdf"),
 ]
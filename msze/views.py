@@ -1,14 +1,22 @@
 # msze/views.py
-from datetime import datetime
+import hashlib
+from calendar import timegm
+from datetime import datetime, timedelta
+from itertools import islice
 
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Exists, OuterRef, Q
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Q, Sum
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag
 from django.views.generic import (
     ListView,
     DetailView,
@@ -17,26 +25,53 @@ from django.views.generic import (
     DeleteView,
     TemplateView,
     FormView,
+    View,
 )
 
-from parafia.utils_pdf import render_to_pdf
+from parafia.utils_cache import z_cache_wersji
+from parafia.utils_csv import strumien_csv
+from parafia.utils_pdf import odpowiedz_pdf, pdf_z_sekcji
+from parafia.utils_sql import GroupConcat
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import normalizuj
 
+from konfiguracja.models import UstawieniaParafii
 from konta.mixins import RolaWymaganaMixin
 from konta.models import Rola
 from konta.utils import zapisz_log
 
-from .forms import MszaForm, IntencjaForm
-from .models import Msza, IntencjaMszy, TypMszy
+from .forms import (
+    GenerowanieMszyForm,
+    IntencjaForm,
+    KonfliktyMszyForm,
+    MszaForm,
+    RaportIntencjiForm,
+    RejestrWplatForm,
+    SeriaGregorianskaForm,
+    SzablonMszyForm,
+    WolneTerminyForm,
+    WplataForm,
+)
+from .gregorianka import LICZBA_MSZY_GREGORIANSKICH, zarezerwuj_serie
+from .harmonogram import generuj_msze
+from .ics import generuj_ics, zakres_z_parametrow
+from .konflikty import znajdz_konflikty
+from .liturgia import KOLOR_TLA, czy_odpust, domyslny_typ_mszy, dzien_liturgiczny, kalendarz, odpust
+from .ogloszenia import dni_tygodnia, granice_tygodnia, pdf_tygodnia, wersja_tygodnia
+from .models import Msza, IntencjaMszy, SzablonMszy, TypMszy, WplataIntencji, znacznik_zmian_mszy
+from .wolne_terminy import DOMYSLNY_LIMIT, wolne_terminy
+from .wplaty import GRUPOWANIA, NAGLOWEK_CSV, raport_intencji, sumy_wplat, wiersze_csv, wplaty_w_okresie
 
 
 # =============================================================================
 #  LISTA / FILTROWANIE MSZY
 # =============================================================================
-class MszaListaView(LoginRequiredMixin, ListView):
+class MszaListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Msza
     template_name = "msze/lista_mszy.html"
     context_object_name = "msze"
     paginate_by = 50
+    klucz_stronicowania = ("data", "godzina", "pk")
 
     def get_queryset(self):
         """
@@ -63,22 +98,19 @@ class MszaListaView(LoginRequiredMixin, ListView):
         if typ:
             qs = qs.filter(typ=typ)
 
-        # --- 3. Filtr Statusu (Wolna/Zajęta) ---
-        qs = qs.annotate(
-            zajeta=Exists(IntencjaMszy.objects.filter(msza=OuterRef("pk")))
-        )
+        # --- 3. Filtr Statusu (Wolna/Zajęta) – po liczniku intencji ---
         status = (self.request.GET.get("status") or "").lower().strip()
         if status == "wolna":
-            qs = qs.filter(zajeta=False)
+            qs = qs.filter(liczba_intencji=0)
         elif status == "zajeta":
-            qs = qs.filter(zajeta=True)
+            qs = qs.filter(liczba_intencji__gt=0)
 
         # --- 4. Wyszukiwarka tekstowa ---
         q = (self.request.GET.get("q") or "").strip()
         if q:
             qs = qs.filter(
                 Q(miejsce__icontains=q)
-                | Q(celebrans__imie_nazwisko__icontains=q)
+                | Q(celebrans__imie_nazwisko_norm__contains=normalizuj(q))
             )
 
         return qs
@@ -124,8 +156,19 @@ class MszaNowaView(RolaWymaganaMixin, CreateView):
                 if kliknieta_data:
                     initial["data"] = kliknieta_data
 
+        # rodzaj mszy podpowiada kalendarz liturgiczny (niedziela, święto, roraty, odpust)
+        self.dzien_liturgiczny = None
+        if "data" in initial:
+            initial["typ"] = domyslny_typ_mszy(initial["data"], odpust())
+            self.dzien_liturgiczny = dzien_liturgiczny(initial["data"])
+
         return initial
 
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["dzien_liturgiczny"] = getattr(self, "dzien_liturgiczny", None)
+        return ctx
+
     def form_valid(self, form):
         response = super().form_valid(form)
 
@@ -174,7 +217,11 @@ class MszaSzczegolyView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         msza = self.object
-        ctx["intencje"] = msza.intencje.all()
+        ctx["intencje"] = (
+            msza.intencje
+            .annotate(wplacono=Sum("wplaty__kwota"))
+            .prefetch_related("wplaty")
+        )
         return ctx
 
 
@@ -202,26 +249,222 @@ class MszaUsunView(RolaWymaganaMixin, DeleteView):
 # =============================================================================
 #  LISTA / DRUK / PDF
 # =============================================================================
+# wydruk HTML: ile mszy (z intencjami) pobieramy i renderujemy naraz
+ROZMIAR_PORCJI_DRUKU = 200
+# PDF: ile mszy na jedną sekcję renderowaną przez WeasyPrint
+ROZMIAR_SEKCJI_PDF = 300
+
+
+def _porcje(iterator, rozmiar: int):
+    while porcja := list(islice(iterator, rozmiar)):
+        yield porcja
+
+
 class MszaListaDrukView(MszaListaView):
     """
-    Widok do wydruku (HTML) – bez paginacji, z prefetch intencji.
+    Wydruk (HTML) całej listy – bez stronicowania.
+    Odpowiedź jest strumieniowana: msze czytane są porcjami (iterator +
+    prefetch intencji dla każdej porcji), a każda porcja wierszy wysyłana
+    od razu – nawet wykaz z całego roku nie leży w pamięci naraz.
     """
-    template_name = "msze/druki/msza_lista_druk.html"
     paginate_by = None
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        return qs.prefetch_related("intencje")
+    def get(self, request, *args, **kwargs):
+        msze = (
+            self.get_queryset()
+            .select_related("celebrans")
+            .prefetch_related("intencje")
+            .iterator(chunk_size=ROZMIAR_PORCJI_DRUKU)
+        )
+        return StreamingHttpResponse(
+            self._strumien(msze, self.get_context_data(object_list=[])),
+            content_type="text/html; charset=utf-8",
+        )
+
+    def _strumien(self, msze, kontekst):
+        kontekst["today"] = timezone.now()
+        yield render_to_string("msze/druki/msza_lista_druk_poczatek.html", kontekst, request=self.request)
+
+        liczba = 0
+        for porcja in _porcje(msze, ROZMIAR_PORCJI_DRUKU):
+            yield render_to_string(
+                "msze/druki/msza_lista_wiersze.html", {"msze": porcja, "lp_od": liczba}
+            )
+            liczba += len(porcja)
+
+        kontekst["liczba"] = liczba
+        yield render_to_string("msze/druki/msza_lista_druk_koniec.html", kontekst, request=self.request)
 
 
 class MszaListaPDFView(MszaListaView):
     """
     Generuje PDF z listy mszy, zachowując aktywne filtry (data, status, typ).
+    Długie wykazy renderowane są sekcjami po ROZMIAR_SEKCJI_PDF mszy
+    i scalane w jeden dokument (parafia/utils_pdf.pdf_z_sekcji).
+    """
+    paginate_by = None
+
+    def get(self, request, *args, **kwargs):
+        qs = self.get_queryset()
+        kontekst = self.get_context_data(object_list=[])
+        kontekst["today"] = timezone.now()
+
+        pdf = pdf_z_sekcji("msze/druki/msza_lista_pdf.html", self._sekcje(qs), kontekst)
+        return odpowiedz_pdf(pdf, f"Wykaz_Mszy_{timezone.localdate()}.pdf")
+
+    def _sekcje(self, qs):
+        czesci = max(1, -(-qs.count() // ROZMIAR_SEKCJI_PDF))
+        msze = (
+            qs.select_related("celebrans")
+            .prefetch_related("intencje")
+            .iterator(chunk_size=ROZMIAR_SEKCJI_PDF)
+        )
+        porcje = _porcje(msze, ROZMIAR_SEKCJI_PDF)
+        for czesc in range(1, czesci + 1):
+            yield {
+                "msze": next(porcje, []),
+                "lp_od": (czesc - 1) * ROZMIAR_SEKCJI_PDF,
+                "czesc": czesc,
+                "czesci": czesci,
+            }
+
+
+# =============================================================================
+#  STAŁY PORZĄDEK MSZY (SZABLONY) I GENEROWANIE
+# =============================================================================
+class SzablonMszyListaView(LoginRequiredMixin, ListView):
+    model = SzablonMszy
+    template_name = "msze/szablon_lista.html"
+    context_object_name = "szablony"
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("celebrans")
+
+
+class SzablonMszyNowyView(RolaWymaganaMixin, CreateView):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = SzablonMszy
+    form_class = SzablonMszyForm
+    template_name = "msze/szablon_formularz.html"
+    success_url = reverse_lazy("szablon_mszy_lista")
+
+    def form_valid(self, form):
+        messages.success(self.request, "Dodano pozycję porządku mszy.")
+        return super().form_valid(form)
+
+
+class SzablonMszyEdycjaView(RolaWymaganaMixin, UpdateView):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = SzablonMszy
+    form_class = SzablonMszyForm
+    template_name = "msze/szablon_formularz.html"
+    success_url = reverse_lazy("szablon_mszy_lista")
+
+    def form_valid(self, form):
+        messages.success(self.request, "Zmiany zapisano.")
+        return super().form_valid(form)
+
+
+class SzablonMszyUsunView(RolaWymaganaMixin, DeleteView):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = SzablonMszy
+    template_name = "msze/szablon_usun.html"
+    success_url = reverse_lazy("szablon_mszy_lista")
+
+    def form_valid(self, form):
+        messages.success(self.request, "Usunięto pozycję porządku mszy.")
+        return super().form_valid(form)
+
+
+class GenerujMszeView(RolaWymaganaMixin, FormView):
+    """
+    Tworzy msze z wybranych szablonów na podany okres (np. cały rok).
+    Terminy już obecne w kalendarzu są pomijane.
+    """
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    form_class = GenerowanieMszyForm
+    template_name = "msze/generuj_msze.html"
+    success_url = reverse_lazy("msza_lista")
+
+    def get_initial(self):
+        initial = super().get_initial()
+        dzis = timezone.localdate()
+        initial["data_od"] = dzis
+        initial["data_do"] = dzis.replace(month=12, day=31)
+        initial["szablony"] = SzablonMszy.objects.filter(aktywny=True)
+        return initial
+
+    def form_valid(self, form):
+        data_od = form.cleaned_data["data_od"]
+        data_do = form.cleaned_data["data_do"]
+        utworzone, pominiete = generuj_msze(data_od, data_do, form.cleaned_data["szablony"])
+
+        zapisz_log(
+            self.request,
+            "GENEROWANIE_MSZY",
+            model="Msza",
+            opis=f"Wygenerowano msze z porządku stałego: {data_od} – {data_do}. "
+                 f"Utworzono: {utworzone}, pominięto (termin zajęty): {pominiete}.",
+        )
+
+        messages.success(
+            self.request,
+            f"Utworzono {utworzone} mszy. Pominięto {pominiete} (termin już w kalendarzu).",
+        )
+        return super().form_valid(form)
+
+
+# =============================================================================
+#  WYKAZ INTENCJI TYGODNIA (gablota / gazetka)
+# =============================================================================
+def _poniedzialek_z_parametru(request):
+    """?tydzien=RRRR-MM-DD (dowolny dzień tygodnia); domyślnie bieżący tydzień."""
+    try:
+        dzien = parse_date(request.GET.get("tydzien") or "")
+    except ValueError:
+        dzien = None
+    return granice_tygodnia(dzien or timezone.localdate())[0]
+
+
+class OgloszeniaTygodniaView(LoginRequiredMixin, TemplateView):
+    template_name = "msze/ogloszenia_tygodnia.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        poniedzialek = _poniedzialek_z_parametru(self.request)
+        ctx["poniedzialek"] = poniedzialek
+        ctx["niedziela"] = poniedzialek + timedelta(days=6)
+        ctx["poprzedni"] = poniedzialek - timedelta(days=7)
+        ctx["nastepny"] = poniedzialek + timedelta(days=7)
+        ctx["dni"] = dni_tygodnia(poniedzialek)
+        return ctx
+
+
+class OgloszeniaTygodniaPDFView(LoginRequiredMixin, View):
+    """
+    PDF wykazu intencji tygodnia. Dopóki msze i intencje tygodnia się nie
+    zmienią, PDF idzie z cache (lub 304 dla przeglądarki z aktualną kopią).
     """
-    def render_to_response(self, context, **response_kwargs):
-        context["today"] = timezone.now()
-        filename = f"Wykaz_Mszy_{timezone.localdate()}.pdf"
-        return render_to_pdf("msze/druki/msza_lista_pdf.html", context, filename)
+
+    def get(self, request, *args, **kwargs):
+        poniedzialek = _poniedzialek_z_parametru(request)
+        wersja, ostatnia_zmiana = wersja_tygodnia(poniedzialek)
+        etag = quote_etag(wersja)
+        ostatnia_zmiana = timegm(ostatnia_zmiana.utctimetuple()) if ostatnia_zmiana else None
+
+        niezmienione = get_conditional_response(request, etag=etag, last_modified=ostatnia_zmiana)
+        if niezmienione is not None:
+            return niezmienione
+
+        response = odpowiedz_pdf(
+            pdf_tygodnia(poniedzialek, wersja),
+            f"Intencje_{poniedzialek:%Y-%m-%d}.pdf",
+        )
+        response.headers["ETag"] = etag
+        if ostatnia_zmiana is not None:
+            response.headers["Last-Modified"] = http_date(ostatnia_zmiana)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 # =============================================================================
@@ -260,6 +503,64 @@ class IntencjaNowaView(RolaWymaganaMixin, FormView):
         return ctx
 
 
+class SeriaGregorianskaView(RolaWymaganaMixin, FormView):
+    """
+    Msze gregoriańskie: jedna intencja na 30 kolejnych dni.
+    Konflikty (termin z inną intencją) są pokazywane w formularzu
+    zanim cokolwiek zostanie zapisane.
+    """
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    template_name = "msze/gregorianka_formularz.html"
+    form_class = SeriaGregorianskaForm
+
+    def get_initial(self):
+        initial = super().get_initial()
+        initial["data_od"] = timezone.localdate() + timedelta(days=1)
+        return initial
+
+    def form_valid(self, form):
+        dane = form.cleaned_data
+        try:
+            intencje = zarezerwuj_serie(
+                dane["data_od"],
+                dane["godzina"],
+                dane["miejsce"],
+                form.save(commit=False),
+                celebrans=dane["celebrans"],
+            )
+        except ValidationError as e:
+            return self.render_to_response(
+                self.get_context_data(form=form, konflikty=e.messages)
+            )
+
+        ostatnia = intencje[-1].msza.data
+        zapisz_log(
+            self.request,
+            "DODANIE_GREGORIANKI",
+            intencje[0],
+            opis=(
+                f"Dodano Msze gregoriańskie {dane['data_od']} – {ostatnia} "
+                f"{dane['godzina']:%H:%M} w {dane['miejsce']}: {intencje[0].tresc[:10]}"
+            ),
+        )
+
+        messages.success(
+            self.request,
+            f"Zapisano {len(intencje)} intencji gregoriańskich "
+            f"({dane['data_od']:%d.%m.%Y} – {ostatnia:%d.%m.%Y}).",
+        )
+        return redirect(
+            f"{reverse('msza_lista')}?data_od={dane['data_od']}&data_do={ostatnia}"
+        )
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["liczba_mszy"] = LICZBA_MSZY_GREGORIANSKICH
+        form = ctx["form"]
+        ctx["pola_terminu"] = [form[nazwa] for nazwa in ("data_od", "godzina", "miejsce", "celebrans")]
+        return ctx
+
+
 class IntencjaEdycjaView(RolaWymaganaMixin, UpdateView):
     dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
     model = IntencjaMszy
@@ -323,6 +624,10 @@ class KalendarzMszyView(LoginRequiredMixin, TemplateView):
     template_name = "msze/kalendarz.html"
 
 
+# tło liturgiczne tylko dla zakresów widoku kalendarza (miesiąc to ok. 6 tygodni)
+MAKS_DNI_TLA = 62
+
+
 def kalendarz_mszy_dane(request):
     """
     Zwraca listę wydarzeń dla FullCalendar z uwzględnieniem kolorów typów mszy
@@ -344,12 +649,7 @@ def kalendarz_mszy_dane(request):
     end_dt = parse_iso(end_str)
 
     today = timezone.localdate()
-    msze_qs = (
-        Msza.objects
-        .filter(data__gte=today)
-        .order_by("data", "godzina")
-        .prefetch_related("intencje")
-    )
+    msze_qs = Msza.objects.filter(data__gte=today)
 
     if start_dt and end_dt:
         msze_qs = msze_qs.filter(
@@ -357,15 +657,42 @@ def kalendarz_mszy_dane(request):
             data__lte=end_dt.date(),
         )
 
+    # 0. Warunkowy GET – znacznik zmian zakresu (jedno zapytanie agregujące).
+    #    Liczniki łapią usunięcia, których nie widać po dacie ostatniej zmiany.
+    znacznik = msze_qs.aggregate(
+        liczba_mszy=Count("pk", distinct=True),
+        liczba_intencji=Count("intencje"),
+        zmiana_mszy=Max("zmieniono"),
+        zmiana_intencji=Max("intencje__zmieniono"),
+    )
+    zmiany = [z for z in (znacznik["zmiana_mszy"], znacznik["zmiana_intencji"]) if z]
+    ostatnia_zmiana = timegm(max(zmiany).utctimetuple()) if zmiany else None
+    termin_odpustu = odpust() if start_dt and end_dt else None
+    etag = quote_etag(
+        hashlib.md5(
+            f"{today}|{start_str}|{end_str}|{termin_odpustu}|{sorted(znacznik.items())}".encode("utf-8")
+        ).hexdigest()
+    )
+
+    niezmienione = get_conditional_response(request, etag=etag, last_modified=ostatnia_zmiana)
+    if niezmienione is not None:
+        return niezmienione
+
+    # 1. Msze z intencjami sklejonymi w bazie – jedno zapytanie na cały zakres
+    msze_qs = (
+        msze_qs
+        .order_by("data", "godzina")
+        .annotate(tresci_intencji=GroupConcat("intencje__tresc", separator=" • "))
+    )
+
     events = []
     for msza in msze_qs:
         dt = datetime.combine(msza.data, msza.godzina)
-        has_intencje = msza.intencje.exists()
+        has_intencje = msza.liczba_intencji > 0
 
         # 1. Tytuł wydarzenia
         if has_intencje:
-            tresci = list(msza.intencje.values_list("tresc", flat=True))
-            tytul = " • ".join(tresci)
+            tytul = msza.tresci_intencji
         else:
             # jeśli nie ma intencji – pokazujemy typ mszy
             tytul = f"{msza.get_typ_display()} - wolna"
@@ -393,4 +720,292 @@ def kalendarz_mszy_dane(request):
             }
         )
 
-    return JsonResponse(events, safe=False)
+    # 2. Tło: święta i odpust z kalendarza liturgicznego (tabela w pamięci)
+    if start_dt and end_dt and (end_dt - start_dt).days <= MAKS_DNI_TLA:
+        for dzien in kalendarz(start_dt.date(), end_dt.date()).values():
+            nazwa = termin_odpustu[2] if czy_odpust(dzien.data, termin_odpustu) else dzien.nazwa
+            if not nazwa:
+                continue
+            events.append(
+                {
+                    "title": nazwa,
+                    "start": dzien.data.isoformat(),
+                    "allDay": True,
+                    "display": "background",
+                    "color": KOLOR_TLA[dzien.kolor],
+                }
+            )
+
+    response = JsonResponse(events, safe=False)
+    response.headers["ETag"] = etag
+    if ostatnia_zmiana is not None:
+        response.headers["Last-Modified"] = http_date(ostatnia_zmiana)
+    # przeglądarka trzyma kopię, ale zawsze pyta serwer (304, jeśli bez zmian)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# =============================================================================
+#  WPŁATY ZA INTENCJE
+# =============================================================================
+class WplataNowaView(RolaWymaganaMixin, CreateView):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = WplataIntencji
+    form_class = WplataForm
+    template_name = "msze/wplata_formularz.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        self.intencja = get_object_or_404(
+            IntencjaMszy.objects.select_related("msza"), pk=kwargs["intencja_pk"]
+        )
+        return super().dispatch(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        form.instance.intencja = self.intencja
+        response = super().form_valid(form)
+
+        if self.intencja.status_oplaty != IntencjaMszy.STATUS_OPLACONA:
+            self.intencja.status_oplaty = IntencjaMszy.STATUS_OPLACONA
+            self.intencja.save(update_fields=["status_oplaty", "zmieniono"])
+
+        zapisz_log(
+            self.request,
+            "DODANIE_WPLATY",
+            self.object,
+            opis=(
+                f"Wpłata {self.object.kwota} zł ({self.object.get_sposob_display()}) "
+                f"za intencję z {self.intencja.msza.data}: {self.intencja.tresc[:10]}"
+            ),
+        )
+
+        messages.success(self.request, "Zarejestrowano wpłatę.")
+        return response
+
+    def get_success_url(self):
+        return self.intencja.msza.get_absolute_url()
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["intencja"] = self.intencja
+        ctx["msza"] = self.intencja.msza
+        return ctx
+
+
+class WplataUsunView(RolaWymaganaMixin, DeleteView):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = WplataIntencji
+    template_name = "msze/wplata_usun.html"
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("intencja__msza")
+
+    def get_success_url(self):
+        return self.object.intencja.msza.get_absolute_url()
+
+    def form_valid(self, form):
+        zapisz_log(
+            self.request,
+            "USUNIECIE_WPLATY",
+            self.object,
+            opis=(
+                f"Usunięto wpłatę {self.object.kwota} zł z {self.object.data} "
+                f"za intencję: {self.object.intencja.tresc[:10]}"
+            ),
+        )
+        messages.success(self.request, "Wpłata została usunięta.")
+        return super().form_valid(form)
+
+
+class RejestrWplatView(RolaWymaganaMixin, StronicowanieKluczoweMixin, ListView):
+    """Rejestr wpłat z okresu (domyślnie bieżący kwartał) z sumami wg sposobu."""
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = WplataIntencji
+    template_name = "msze/wplaty_lista.html"
+    context_object_name = "wplaty"
+    paginate_by = 50
+    klucz_stronicowania = ("-data", "-pk")
+
+    def get_queryset(self):
+        self.form = RejestrWplatForm(self.request.GET or None)
+        self.data_od, self.data_do = self.form.okres()
+        sposob = self.form.cleaned_data.get("sposob", "") if self.form.is_valid() else ""
+        return (
+            wplaty_w_okresie(self.data_od, self.data_do, sposob)
+            .select_related("intencja__msza")
+        )
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["form"] = self.form
+        ctx["data_od"] = self.data_od
+        ctx["data_do"] = self.data_do
+        ctx["sumy"] = sumy_wplat(self.object_list)
+        return ctx
+
+
+class RejestrWplatCSVView(RejestrWplatView):
+    """Ten sam rejestr jako CSV – strumieniowo, bez ładowania całego okresu."""
+
+    def get(self, request, *args, **kwargs):
+        qs = self.get_queryset()
+        return strumien_csv(
+            NAGLOWEK_CSV,
+            wiersze_csv(qs),
+            f"wplaty_{self.data_od:%Y-%m-%d}_{self.data_do:%Y-%m-%d}.csv",
+        )
+
+
+class RaportIntencjiView(RolaWymaganaMixin, TemplateView):
+    """Intencje z okresu: liczba, nieopłacone i suma wpłat wg miesiąca / celebransa / rodzaju."""
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    template_name = "msze/raport_intencji.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        form = RaportIntencjiForm(self.request.GET or None)
+        data_od, data_do = form.okres()
+        grupowanie = (form.cleaned_data.get("grupowanie") if form.is_valid() else "") or "miesiac"
+
+        wiersze = raport_intencji(data_od, data_do, grupowanie)
+        ctx.update({
+            "form": form,
+            "data_od": data_od,
+            "data_do": data_do,
+            "grupowanie": grupowanie,
+            "etykieta_grupy": GRUPOWANIA[grupowanie][0],
+            "wiersze": wiersze,
+            "razem": {
+                pole: sum(w[pole] for w in wiersze)
+                for pole in ("liczba", "nieoplacone", "wplacono")
+            },
+        })
+        return ctx
+
+
+# =============================================================================
+#  PUBLICZNY KALENDARZ ICS
+# =============================================================================
+def kalendarz_mszy_ics(request):
+    """
+    Msze w formacie iCalendar – bez logowania, do subskrypcji w telefonie.
+    Parametry: ?od=&do= (RRRR-MM-DD), ?miejsce=, ?intencje=1 (treść intencji,
+    tylko jeśli parafia zezwoliła na to w konfiguracji).
+    """
+    try:
+        od, do = zakres_z_parametrow(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    ustawienia = UstawieniaParafii.load()
+    miejsce = (request.GET.get("miejsce") or "").strip()
+    z_intencjami = ustawienia.ics_intencje and request.GET.get("intencje") == "1"
+    nazwa = ustawienia.nazwa or "Msze święte"
+    domena = request.get_host()
+
+    msze_qs = Msza.objects.filter(data__range=(od, do))
+    if miejsce:
+        msze_qs = msze_qs.filter(miejsce=miejsce)
+
+    # 1. Warunkowy GET – znacznik zakresu (jedno zapytanie agregujące)
+    skrot, ostatnia_zmiana = znacznik_zmian_mszy(msze_qs)
+    parametry = f"{od}|{do}|{miejsce}|{z_intencjami}|{domena}"
+    wersja = hashlib.md5(f"{parametry}|{nazwa}|{skrot}".encode("utf-8")).hexdigest()
+    etag = quote_etag(wersja)
+    ostatnia_zmiana = timegm(ostatnia_zmiana.utctimetuple()) if ostatnia_zmiana else None
+
+    niezmienione = get_conditional_response(request, etag=etag, last_modified=ostatnia_zmiana)
+    if niezmienione is not None:
+        return niezmienione
+
+    # 2. Treść z cache; generowana ponownie tylko po zmianie mszy w zakresie
+    tresc = z_cache_wersji(
+        "msze:ics:" + hashlib.md5(parametry.encode("utf-8")).hexdigest(),
+        wersja,
+        lambda: generuj_ics(msze_qs, nazwa, domena, z_intencjami),
+    )
+
+    response = HttpResponse(tresc, content_type="text/calendar; charset=utf-8")
+    response.headers["Content-Disposition"] = 'inline; filename="msze.ics"'
+    response.headers["ETag"] = etag
+    if ostatnia_zmiana is not None:
+        response.headers["Last-Modified"] = http_date(ostatnia_zmiana)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+# =============================================================================
+#  KOLIZJE W PORZĄDKU MSZY
+# =============================================================================
+class KonfliktyMszyView(LoginRequiredMixin, TemplateView):
+    """Celebrans lub miejsce zajęte przez kilka mszy naraz – w całym porządku."""
+    template_name = "msze/konflikty.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        form = KonfliktyMszyForm(self.request.GET or None)
+        data_od, data_do = form.zakres()
+        ctx["form"] = form
+        ctx["data_od"] = data_od
+        ctx["data_do"] = data_do
+        ctx["konflikty"] = znajdz_konflikty(data_od, data_do)
+        return ctx
+
+
+# =============================================================================
+#  WOLNE TERMINY (do zapisu intencji)
+# =============================================================================
+def _szukaj_wolnych(request):
+    """(formularz filtrów, lista wolnych mszy) – wspólne dla strony i JSON."""
+    form = WolneTerminyForm(request.GET or None)
+    if form.is_bound and not form.is_valid():
+        return form, []
+    dane = form.cleaned_data if form.is_bound else {}
+    msze = wolne_terminy(
+        od=dane.get("od"),
+        dni_tygodnia=dane.get("dni"),
+        godzina_od=dane.get("godzina_od"),
+        godzina_do=dane.get("godzina_do"),
+        miejsce=dane.get("miejsce", ""),
+        typ=dane.get("typ", ""),
+        limit=dane.get("limit") or DOMYSLNY_LIMIT,
+    )
+    return form, msze
+
+
+class WolneTerminyView(LoginRequiredMixin, TemplateView):
+    template_name = "msze/wolne_terminy.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["form"], ctx["msze"] = _szukaj_wolnych(self.request)
+        return ctx
+
+
+@login_required
+def wolne_terminy_dane(request):
+    """
+    Najbliższe wolne msze jako JSON, np.
+    ?dni=6&godzina_od=07:00&godzina_do=12:00&miejsce=Kościół&limit=5
+    """
+    form, msze = _szukaj_wolnych(request)
+    if form.errors:
+        return JsonResponse({"bledy": form.errors}, status=400)
+
+    return JsonResponse(
+        [
+            {
+                "id": msza.pk,
+                "data": msza.data.isoformat(),
+                "godzina": msza.godzina.strftime("%H:%M"),
+                "dzien_tygodnia": msza.data.weekday(),
+                "miejsce": msza.miejsce,
+                "typ": msza.typ,
+                "typ_nazwa": msza.get_typ_display(),
+                "celebrans": str(msza.celebrans) if msza.celebrans else msza.celebrans_opis,
+                "url": msza.get_absolute_url(),
+                "url_intencji": reverse("intencja_nowa", args=[msza.pk]),
+            }
+            for msza in msze
+        ],
+        safe=False,
+    )
@@ -0,0 +1,64 @@
+# msze/wolne_terminy.py
+"""
+Wyszukiwarka najbliższych wolnych mszy (bez intencji) do zapisania intencji.
+
+Zapytanie idzie po indeksie (liczba_intencji, data, godzina) – licznik
+intencji jest utrzymywany w tabeli mszy (msze/signals.py), więc nie
+potrzeba podzapytania EXISTS po intencjach dla każdej przyszłej mszy.
+"""
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Msza
+
+DOMYSLNY_LIMIT = 10
+MAKS_LIMIT = 50
+
+
+def wolne_terminy(
+    od: date | None = None,
+    dni_tygodnia=None,
+    godzina_od: time | None = None,
+    godzina_do: time | None = None,
+    miejsce: str = "",
+    typ: str = "",
+    limit: int = DOMYSLNY_LIMIT,
+) -> list[Msza]:
+    """
+    Najbliższe `limit` wolnych mszy od dnia `od` (domyślnie od teraz),
+    w kolejności daty i godziny. Filtry opcjonalne:
+      - dni_tygodnia: lista numerów 0=pn ... 6=nd,
+      - godzina_od / godzina_do: przedział godzin (włącznie),
+      - miejsce, typ: dokładne dopasowanie.
+    """
+    teraz = timezone.localtime()
+    if od is None or od <= teraz.date():
+        # dzisiejsze msze, które już się odbyły, nie są wolnym terminem
+        qs = Msza.objects.filter(
+            Q(data__gt=teraz.date()) | Q(data=teraz.date(), godzina__gte=teraz.time())
+        )
+    else:
+        qs = Msza.objects.filter(data__gte=od)
+
+    qs = qs.filter(liczba_intencji=0)
+
+    if dni_tygodnia:
+        # iso_week_day: 1=pn ... 7=nd
+        qs = qs.filter(data__iso_week_day__in=[int(d) + 1 for d in dni_tygodnia])
+    if godzina_od:
+        qs = qs.filter(godzina__gte=godzina_od)
+    if godzina_do:
+        qs = qs.filter(godzina__lte=godzina_do)
+    if miejsce:
+        qs = qs.filter(miejsce=miejsce)
+    if typ:
+        qs = qs.filter(typ=typ)
+
+    limit = max(1, min(limit, MAKS_LIMIT))
+    return list(
+        qs.select_related("celebrans").order_by("data", "godzina", "pk")[:limit]
+    )
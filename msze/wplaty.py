@@ -0,0 +1,132 @@
+# msze/wplaty.py
+"""
+Rejestr wpłat za intencje i zestawienia okresowe.
+
+Wszystkie sumy liczy baza (GROUP BY) – jedno zapytanie na zestawienie,
+niezależnie od liczby intencji. Eksport CSV czyta wpłaty porcjami
+(iterator) i od razu wysyła je do przeglądarki.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf, TruncMonth
+
+from parafia.utils_csv import ROZMIAR_PORCJI
+
+from .models import IntencjaMszy, SposobWplaty, TypMszy, WplataIntencji
+
+BRAK_CELEBRANSA = "(nie podano)"
+
+# klucz -> (etykieta kolumny, wyrażenie grupujące intencje)
+GRUPOWANIA = {
+    "miesiac": ("Miesiąc", TruncMonth("msza__data")),
+    "celebrans": (
+        "Celebrans",
+        Coalesce(
+            NullIf("msza__celebrans__imie_nazwisko", Value("")),
+            NullIf("msza__celebrans_opis", Value("")),
+            Value(BRAK_CELEBRANSA),
+        ),
+    ),
+    "typ": ("Rodzaj mszy", F("msza__typ")),
+}
+
+NAGLOWEK_CSV = [
+    "Data wpłaty",
+    "Kwota",
+    "Sposób",
+    "Data mszy",
+    "Godzina mszy",
+    "Intencja",
+    "Zamawiający",
+    "Uwagi",
+]
+
+
+def poczatek_kwartalu(dzien: date) -> date:
+    return date(dzien.year, 3 * ((dzien.month - 1) // 3) + 1, 1)
+
+
+def raport_intencji(data_od: date, data_do: date, grupowanie: str) -> list[dict]:
+    """
+    Intencje z mszy w okresie, zgrupowane wg `grupowanie` (klucz GRUPOWANIA):
+        [{"grupa", "liczba", "nieoplacone", "wplacono"}, ...]
+    Jedno zapytanie.
+    """
+    _etykieta, wyrazenie = GRUPOWANIA[grupowanie]
+    wiersze = list(
+        IntencjaMszy.objects
+        .filter(msza__data__range=(data_od, data_do))
+        .values(grupa=wyrazenie)
+        .annotate(
+            # złączenie z wpłatami mnoży wiersze – liczymy intencje bez powtórzeń
+            liczba=Count("pk", distinct=True),
+            nieoplacone=Count(
+                "pk",
+                filter=Q(status_oplaty=IntencjaMszy.STATUS_NIEOPLACONA),
+                distinct=True,
+            ),
+            wplacono=Coalesce(
+                Sum("wplaty__kwota"),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        .order_by("grupa")
+    )
+    if grupowanie == "typ":
+        for wiersz in wiersze:
+            wiersz["grupa"] = TypMszy(wiersz["grupa"]).label
+    return wiersze
+
+
+def wplaty_w_okresie(data_od: date, data_do: date, sposob: str = ""):
+    qs = WplataIntencji.objects.filter(data__range=(data_od, data_do))
+    if sposob:
+        qs = qs.filter(sposob=sposob)
+    return qs
+
+
+def sumy_wplat(wplaty_qs) -> dict:
+    """{"razem": Decimal, "wg_sposobu": [(etykieta, suma), ...]} – jedno zapytanie."""
+    wg_sposobu = [
+        (SposobWplaty(w["sposob"]).label, w["suma"])
+        for w in wplaty_qs.order_by().values("sposob").annotate(suma=Sum("kwota")).order_by("sposob")
+    ]
+    return {
+        "razem": sum((suma for _s, suma in wg_sposobu), Decimal("0")),
+        "wg_sposobu": wg_sposobu,
+    }
+
+
+def wiersze_csv(wplaty_qs):
+    """Wiersze eksportu – leniwie, porcjami z bazy (bez ładowania całości)."""
+    etykiety = dict(SposobWplaty.choices)
+    for data, kwota, sposob, data_mszy, godzina, tresc, zamawiajacy, uwagi in (
+        wplaty_qs
+        .order_by("data", "pk")
+        .values_list(
+            "data",
+            "kwota",
+            "sposob",
+            "intencja__msza__data",
+            "intencja__msza__godzina",
+            "intencja__tresc",
+            "intencja__zamawiajacy",
+            "uwagi",
+        )
+        .iterator(chunk_size=ROZMIAR_PORCJI)
+    ):
+        yield [
+            data.isoformat(),
+            f"{kwota:.2f}".replace(".", ","),
+            etykiety.get(sposob, sposob),
+            data_mszy.isoformat(),
+            godzina.strftime("%H:%M"),
+            tresc,
+            zamawiajacy,
+            uwagi,
+        ]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OsobyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'osoby'
+
+    def ready(self):
+        # rejestracja sygnałów (indeks wyszukiwarki osób)
+        from . import signals  # noqa: F401
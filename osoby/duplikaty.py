@@ -0,0 +1,133 @@
+# osoby/duplikaty.py
+"""
+Wykrywanie prawdopodobnych duplikatów osób.
+
+1. Blokowanie: kandydaci muszą mieć ten sam klucz
+   (znormalizowane nazwisko + rok urodzenia + pierwsza litera imienia).
+   Klucze występujące więcej niż raz wyznacza jedno zapytanie GROUP BY,
+   więc porównujemy pary tylko wewnątrz małych grup, a nie "każdy z każdym".
+2. Punktacja par: data urodzenia, imię, imiona rodziców, nazwisko rodowe
+   matki, miejsce urodzenia.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from itertools import combinations
+
+from django.db.models import Count
+from django.db.models.functions import ExtractYear, Substr
+
+from parafia.utils_tekst import normalizuj
+
+from .models import Osoba
+
+PROG_DOMYSLNY = 60
+
+POLA_POROWNANIA = [
+    "pk",
+    "nazwisko_norm",
+    "imie_norm",
+    "data_urodzenia",
+    "imie_ojca",
+    "imie_matki",
+    "nazwisko_matki_rodowe",
+    "miejsce_urodzenia",
+]
+
+# (pole, punkty za zgodność, punkty ujemne za sprzeczność)
+_WAGI_POL = [
+    ("imie_ojca", 10, 10),
+    ("imie_matki", 10, 10),
+    ("nazwisko_matki_rodowe", 10, 10),
+    ("miejsce_urodzenia", 10, 5),
+]
+
+
+def _z_kluczem(qs):
+    return qs.annotate(
+        rok_ur=ExtractYear("data_urodzenia"),
+        inicjal=Substr("imie_norm", 1, 1),
+    )
+
+
+def _grupy_duplikatow(qs):
+    return (
+        _z_kluczem(qs.order_by())
+        .values("nazwisko_norm", "rok_ur", "inicjal")
+        .annotate(ile=Count("id"))
+        .filter(ile__gt=1)
+    )
+
+
+def klucze_blokujace(qs=None) -> set[tuple]:
+    """Klucze (nazwisko_norm, rok, inicjał), pod którymi jest więcej niż jedna osoba."""
+    qs = Osoba.objects.all() if qs is None else qs
+    return {
+        (w["nazwisko_norm"], w["rok_ur"], w["inicjal"])
+        for w in _grupy_duplikatow(qs)
+    }
+
+
+def ocen_pare(a: dict, b: dict) -> tuple[int, list[str]]:
+    """
+    Zwraca (wynik 0–100, lista powodów) dla dwóch osób z tego samego bloku.
+    """
+    wynik = 0
+    powody = []
+
+    if a["data_urodzenia"] == b["data_urodzenia"]:
+        wynik += 40
+        powody.append("ta sama data urodzenia")
+    else:
+        wynik += 10
+        powody.append("ten sam rok urodzenia")
+
+    if a["imie_norm"] == b["imie_norm"]:
+        wynik += 20
+        powody.append("to samo imię")
+
+    for pole, plus, minus in _WAGI_POL:
+        wa, wb = normalizuj(a[pole]), normalizuj(b[pole])
+        if not wa or not wb:
+            continue
+        if wa == wb:
+            wynik += plus
+            powody.append(f"zgodne: {pole.replace('_', ' ')}")
+        else:
+            wynik -= minus
+
+    return max(0, min(wynik, 100)), powody
+
+
+def znajdz_duplikaty(prog: int = PROG_DOMYSLNY, qs=None) -> list[dict]:
+    """
+    Lista par prawdopodobnych duplikatów, od najwyżej ocenionych:
+        [{"a_id", "b_id", "wynik", "powody"}, ...]
+    """
+    qs = Osoba.objects.all() if qs is None else qs
+    klucze = klucze_blokujace(qs)
+    if not klucze:
+        return []
+
+    bloki: dict[tuple, list[dict]] = defaultdict(list)
+
+    # tylko osoby z nazwiskami, które w ogóle tworzą grupy (podzapytanie, bez listy parametrów)
+    kandydaci = (
+        _z_kluczem(qs.order_by())
+        .filter(nazwisko_norm__in=_grupy_duplikatow(qs).values("nazwisko_norm"))
+        .values(*POLA_POROWNANIA, "rok_ur", "inicjal")
+    )
+    for osoba in kandydaci.iterator(chunk_size=2000):
+        klucz = (osoba["nazwisko_norm"], osoba["rok_ur"], osoba["inicjal"])
+        if klucz in klucze:
+            bloki[klucz].append(osoba)
+
+    pary = []
+    for blok in bloki.values():
+        for a, b in combinations(sorted(blok, key=lambda o: o["pk"]), 2):
+            wynik, powody = ocen_pare(a, b)
+            if wynik >= prog:
+                pary.append({"a_id": a["pk"], "b_id": b["pk"], "wynik": wynik, "powody": powody})
+
+    pary.sort(key=lambda p: (-p["wynik"], p["a_id"], p["b_id"]))
+    return pary
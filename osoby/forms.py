@@ -2,6 +2,8 @@
 import re
 from django.utils import timezone
 from django import forms
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
 from .models import Osoba
 from slowniki.models import Wyznanie 
 
@@ -21,6 +23,65 @@ class BootstrapFormMixin:
             if not widget.attrs.get("placeholder") and field.label:
                 widget.attrs["placeholder"] = field.label
 
+def etykieta_osoby(osoba) -> str:
+    """
+    Etykieta osoby na listach wyboru: "Kowalski Jan (ur. 1990-01-01, o. Adam, m. Maria)".
+    Wspólna dla pól OsobaChoiceField i endpointu podpowiedzi (osoba_podpowiedzi) –
+    po wyborze z listy pole pokazuje ten sam tekst co podpowiedź.
+    """
+    opis = f"{osoba.nazwisko} {osoba.imie_pierwsze}"
+    szczegoly = []
+    if osoba.data_urodzenia:
+        szczegoly.append(f"ur. {osoba.data_urodzenia}")
+    if osoba.imie_ojca:
+        szczegoly.append(f"o. {osoba.imie_ojca}")
+    if osoba.imie_matki:
+        szczegoly.append(f"m. {osoba.imie_matki}")
+    if szczegoly:
+        opis += f" ({', '.join(szczegoly)})"
+    return opis
+
+
+class OsobaAutocompleteWidget(forms.Select):
+    """
+    <select> dla pól wyboru osoby, zasilany zdalnie przez Tom Select.
+
+    Renderuje tylko aktualnie wybraną osobę (a nie całą parafię),
+    pozostałe pozycje dociąga JS z endpointu 'osoba_podpowiedzi'.
+    Walidacja w ModelChoiceField i tak sprawdza tylko przesłane pk.
+    """
+
+    def __init__(self, attrs=None, choices=()):
+        attrs = dict(attrs or {})
+        css = attrs.get("class", "")
+        if "js-osoba-select" not in css:
+            attrs["class"] = (css + " js-osoba-select").strip()
+        attrs.setdefault("data-url", reverse_lazy("osoba_podpowiedzi"))
+        super().__init__(attrs, choices)
+
+    def optgroups(self, name, value, attrs=None):
+        pelne_choices = self.choices
+
+        if isinstance(pelne_choices, ModelChoiceIterator):
+            field = pelne_choices.field
+            wybrane_pk = [v for v in value if v and str(v).isdigit()]
+
+            ograniczone = []
+            if field.empty_label is not None:
+                ograniczone.append(("", field.empty_label))
+            if wybrane_pk:
+                for obj in pelne_choices.queryset.filter(pk__in=wybrane_pk):
+                    ograniczone.append(
+                        (field.prepare_value(obj), field.label_from_instance(obj))
+                    )
+            self.choices = ograniczone
+
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = pelne_choices
+
+
 class OsobaForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Osoba
@@ -122,4 +183,27 @@ class OsobaForm(BootstrapFormMixin, forms.ModelForm):
             if not telefon.isdigit():
                 self.add_error("telefon", "Numer telefonu może składać się wyłącznie z cyfr (bez spacji, myślników i +).")
 
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+class ScalOsobyForm(forms.Form):
+    """
+    Wybór zdublowanej kartoteki, która zostanie wchłonięta przez bieżącą osobę.
+    """
+
+    zrodlowa = forms.ModelChoiceField(
+        queryset=Osoba.objects.all(),
+        label="Duplikat do scalenia",
+        widget=OsobaAutocompleteWidget(attrs={"class": "form-select"}),
+        help_text="Wszystkie wpisy tej osoby zostaną przeniesione, a jej kartoteka usunięta.",
+    )
+
+    def __init__(self, *args, docelowa=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["zrodlowa"].label_from_instance = etykieta_osoby
+        self.docelowa = docelowa
+
+    def clean_zrodlowa(self):
+        zrodlowa = self.cleaned_data["zrodlowa"]
+        if self.docelowa is not None and zrodlowa.pk == self.docelowa.pk:
+            raise forms.ValidationError("Wybierz inną osobę niż bieżąca.")
+        return zrodlowa
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from osoby.wyszukiwarka import fts_dostepne, przebuduj_indeks
+
+
+class Command(BaseCommand):
+    help = "Przebudowuje indeks pełnotekstowy osób (np. po imporcie lub operacjach masowych)."
+
+    def handle(self, *args, **options):
+        if not fts_dostepne():
+            self.stdout.write(self.style.WARNING("Indeks FTS działa tylko na SQLite – pomijam."))
+            return
+
+        liczba = przebuduj_indeks()
+        self.stdout.write(self.style.SUCCESS(f"Zaindeksowano osób: {liczba}"))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from osoby.duplikaty import PROG_DOMYSLNY, znajdz_duplikaty
+from osoby.models import Osoba
+
+
+class Command(BaseCommand):
+    help = (
+        "Wyszukuje prawdopodobne duplikaty osób "
+        "(blokowanie: nazwisko + rok urodzenia + inicjał imienia)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prog",
+            type=int,
+            default=PROG_DOMYSLNY,
+            help=f"Minimalny wynik pary 0–100 (domyślnie {PROG_DOMYSLNY}).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=200,
+            help="Ile par wypisać (0 = wszystkie).",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        pary = znajdz_duplikaty(prog=options["prog"])
+        czas = time.monotonic() - start
+
+        limit = options["limit"] or len(pary)
+        pokazane = pary[:limit]
+        osoby = Osoba.objects.in_bulk(
+            {p["a_id"] for p in pokazane} | {p["b_id"] for p in pokazane}
+        )
+
+        for para in pokazane:
+            a, b = osoby[para["a_id"]], osoby[para["b_id"]]
+            self.stdout.write(
+                f"[{para['wynik']:3d}] #{a.pk} {a} ({a.data_urodzenia}) "
+                f"<-> #{b.pk} {b} ({b.data_urodzenia}) – {', '.join(para['powody'])}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Znaleziono par: {len(pary)} (w {czas:.2f} s)")
+        )
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from osoby.wyszukiwarka import FTS_TABELA, przebuduj_indeks, sql_utworz_indeks
+
+
+def utworz_indeks(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    Osoba = apps.get_model("osoby", "Osoba")
+    schema_editor.execute(sql_utworz_indeks())
+    przebuduj_indeks(Osoba.objects.all())
+
+
+def usun_indeks(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABELA}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(utworz_indeks, usun_indeks),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+def uzupelnij_kolumny_norm(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("osoby", "Osoba"), {
+        "nazwisko_norm": ("nazwisko",),
+        "imie_norm": ("imie_pierwsze",),
+        "nazwisko_rodowe_norm": ("nazwisko_rodowe",),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0002_osoba_fts'),
+        ('slowniki', '0002_pola_norm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='osoba',
+            name='imie_norm',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='osoba',
+            name='nazwisko_norm',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='osoba',
+            name='nazwisko_rodowe_norm',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='osoba',
+            index=models.Index(fields=['nazwisko_norm', 'imie_norm'], name='osoby_osoba_nazwisk_540b69_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='osoba',
+            index=models.Index(fields=['nazwisko_rodowe_norm'], name='osoby_osoba_nazwisk_52df6a_idx'),
+        ),
+        migrations.RunPython(uzupelnij_kolumny_norm, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import klucz_fonetyczny, uzupelnij_pola_norm
+
+
+def uzupelnij_klucze(apps, schema_editor):
+    uzupelnij_pola_norm(
+        apps.get_model("osoby", "Osoba"),
+        {"nazwisko_fonet": ("nazwisko",), "nazwisko_rodowe_fonet": ("nazwisko_rodowe",)},
+        funkcja=klucz_fonetyczny,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0003_osoba_pola_norm'),
+        ('slowniki', '0002_pola_norm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='osoba',
+            name='nazwisko_fonet',
+            field=models.CharField(blank=True, editable=False, max_length=6),
+        ),
+        migrations.AddField(
+            model_name='osoba',
+            name='nazwisko_rodowe_fonet',
+            field=models.CharField(blank=True, editable=False, max_length=6),
+        ),
+        migrations.AddIndex(
+            model_name='osoba',
+            index=models.Index(fields=['nazwisko_fonet'], name='osoby_osoba_nazwisk_722900_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='osoba',
+            index=models.Index(fields=['nazwisko_rodowe_fonet'], name='osoby_osoba_nazwisk_9b01b2_idx'),
+        ),
+        migrations.RunPython(uzupelnij_klucze, migrations.RunPython.noop),
+    ]
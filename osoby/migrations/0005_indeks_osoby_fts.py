@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import osoby.wyszukiwarka
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0004_osoba_klucze_fonetyczne'),
+    ]
+
+    operations = [
+        # tabela wirtualna powstaje w 0002_osoba_fts – tu tylko model do złączeń
+        migrations.CreateModel(
+            name='IndeksOsobyFTS',
+            fields=[
+                ('rowid', models.IntegerField(db_column='rowid', primary_key=True, serialize=False)),
+                ('dopasowanie', osoby.wyszukiwarka.KolumnaFTS(db_column='osoby_osoba_fts')),
+            ],
+            options={
+                'db_table': 'osoby_osoba_fts',
+                'managed': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='osoba',
+            name='indeks_fts',
+            field=models.ForeignObject(editable=False, from_fields=['id'], null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='osoby.indeksosobyfts', to_fields=['rowid']),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0005_indeks_osoby_fts'),
+    ]
+
+    operations = [
+        # "brzmi jak" w księgach – słowo frazy może być imieniem osoby
+        migrations.AddIndex(
+            model_name='osoba',
+            index=models.Index(fields=['imie_norm'], name='osoby_osoba_imie_no_67498f_idx'),
+        ),
+    ]
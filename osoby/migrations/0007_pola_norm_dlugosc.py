@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+def uzupelnij_kolumny_norm(apps, schema_editor):
+    # wartości przycięte do poprzedniej długości kolumn – liczymy od nowa
+    uzupelnij_pola_norm(apps.get_model("osoby", "Osoba"), {
+        "nazwisko_norm": ("nazwisko",),
+        "imie_norm": ("imie_pierwsze",),
+        "nazwisko_rodowe_norm": ("nazwisko_rodowe",),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0006_osoba_imie_norm_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='osoba',
+            name='imie_norm',
+            field=models.CharField(blank=True, editable=False, max_length=60),
+        ),
+        migrations.AlterField(
+            model_name='osoba',
+            name='nazwisko_norm',
+            field=models.CharField(blank=True, editable=False, max_length=60),
+        ),
+        migrations.AlterField(
+            model_name='osoba',
+            name='nazwisko_rodowe_norm',
+            field=models.CharField(blank=True, editable=False, max_length=60),
+        ),
+        migrations.RunPython(uzupelnij_kolumny_norm, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,37 @@
 # osoby/models.py
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.urls import reverse
 from django.apps import apps
 
+from parafia.utils_tekst import klucz_fonetyczny, ustaw_pola_norm
+
+from .wyszukiwarka import FTS_TABELA, KolumnaFTS
+
+
+class OsobaQuerySet(models.QuerySet):
+    def with_sakrament_flags(self):
+        """
+        Dokłada adnotacje flaga_chrzest, flaga_komunia, flaga_bierzmowanie,
+        flaga_malzenstwo, flaga_namaszczenie, flaga_zgon (podzapytania EXISTS)
+        – wszystkie w jednym SELECT zamiast sześciu zapytań na osobę.
+        Metody ma_…() korzystają z nich, jeśli są obecne.
+        """
+        def istnieje(model, warunek):
+            return Exists(apps.get_model("sakramenty", model).objects.filter(warunek))
+
+        osoba = OuterRef("pk")
+        return self.annotate(
+            flaga_chrzest=istnieje("Chrzest", Q(ochrzczony=osoba)),
+            flaga_komunia=istnieje("PierwszaKomunia", Q(osoba=osoba)),
+            flaga_bierzmowanie=istnieje("Bierzmowanie", Q(osoba=osoba)),
+            flaga_malzenstwo=istnieje(
+                "Malzenstwo", Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
+            ),
+            flaga_namaszczenie=istnieje("NamaszczenieChorych", Q(osoba=osoba)),
+            flaga_zgon=istnieje("Zgon", Q(osoba=osoba)),
+        )
+
 
 class Osoba(models.Model):
     nazwisko = models.CharField(max_length=30)
@@ -58,11 +87,50 @@ class Osoba(models.Model):
 
     uwagi = models.TextField(blank=True)
 
+    # Kolumny-cienie do wyszukiwania (bez polskich znaków, małymi literami).
+    # Uzupełniane automatycznie w save(). Dwa razy dłuższe niż pola źródłowe,
+    # bo normalizacja może wydłużyć tekst (ß -> ss).
+    nazwisko_norm = models.CharField(max_length=60, blank=True, editable=False)
+    imie_norm = models.CharField(max_length=60, blank=True, editable=False)
+    nazwisko_rodowe_norm = models.CharField(max_length=60, blank=True, editable=False)
+
+    # Klucze fonetyczne nazwisk (wyszukiwanie "brzmi jak", np. Kowalski/Kovalski)
+    nazwisko_fonet = models.CharField(max_length=6, blank=True, editable=False)
+    nazwisko_rodowe_fonet = models.CharField(max_length=6, blank=True, editable=False)
+
+    # wiersz indeksu pełnotekstowego (rowid = pk) – tylko do złączeń w szukaj_osob
+    indeks_fts = models.ForeignObject(
+        "IndeksOsobyFTS",
+        on_delete=models.DO_NOTHING,
+        from_fields=["id"],
+        to_fields=["rowid"],
+        related_name="+",
+        null=True,
+        editable=False,
+    )
+
+    POLA_NORM = {
+        "nazwisko_norm": ("nazwisko",),
+        "imie_norm": ("imie_pierwsze",),
+        "nazwisko_rodowe_norm": ("nazwisko_rodowe",),
+    }
+    POLA_FONET = {
+        "nazwisko_fonet": ("nazwisko",),
+        "nazwisko_rodowe_fonet": ("nazwisko_rodowe",),
+    }
+
+    objects = OsobaQuerySet.as_manager()
+
     class Meta:
         ordering = ["nazwisko", "imie_pierwsze", "data_urodzenia"]
         indexes = [
             models.Index(fields=["nazwisko"]),
             models.Index(fields=["data_urodzenia"]),
+            models.Index(fields=["nazwisko_norm", "imie_norm"]),
+            models.Index(fields=["nazwisko_rodowe_norm"]),
+            models.Index(fields=["nazwisko_fonet"]),
+            models.Index(fields=["nazwisko_rodowe_fonet"]),
+            models.Index(fields=["imie_norm"]),
         ]
         verbose_name = "Osoba"
         verbose_name_plural = "Osoby"
@@ -70,12 +138,25 @@ class Osoba(models.Model):
     # ==========================
     #  METODY POMOCNICZE "ma_…"
     # ==========================
+    # Jeśli osoba pochodzi z Osoba.objects.with_sakrament_flags(),
+    # odpowiedź bierzemy z adnotacji (bez dodatkowego zapytania).
+
+    def ma_chrzest(self) -> bool:
+        """
+        Czy osoba ma wpis chrztu?
+        Korzysta z related_name='chrzty' w Chrzest.
+        """
+        if hasattr(self, "flaga_chrzest"):
+            return self.flaga_chrzest
+        return self.chrzty.exists()
 
     def ma_komunie(self) -> bool:
         """
         Czy osoba ma wpis I Komunii Świętej?
         Korzysta z related_name='komunie' w PierwszaKomunia.
         """
+        if hasattr(self, "flaga_komunia"):
+            return self.flaga_komunia
         return self.komunie.exists()
 
     def ma_bierzmowanie(self) -> bool:
@@ -83,6 +164,8 @@ class Osoba(models.Model):
         Czy osoba ma wpis bierzmowania?
         Korzysta z related_name='bierzmowania' w Bierzmowanie.
         """
+        if hasattr(self, "flaga_bierzmowanie"):
+            return self.flaga_bierzmowanie
         return self.bierzmowania.exists()
 
     def ma_malzenstwo(self) -> bool:
@@ -93,6 +176,8 @@ class Osoba(models.Model):
           - malzenstwa_jako_a
           - malzenstwa_jako_b
         """
+        if hasattr(self, "flaga_malzenstwo"):
+            return self.flaga_malzenstwo
         return (
             self.malzenstwa_jako_a.exists()
             or self.malzenstwa_jako_b.exists()
@@ -103,6 +188,8 @@ class Osoba(models.Model):
         Czy osoba ma jakąkolwiek posługę / namaszczenie chorych?
         Korzysta z related_name='namaszczenia' w NamaszczenieChorych.
         """
+        if hasattr(self, "flaga_namaszczenie"):
+            return self.flaga_namaszczenie
         return self.namaszczenia.exists()
 
     def ma_zgon(self) -> bool:
@@ -116,6 +203,8 @@ class Osoba(models.Model):
         """
         if self.data_zgonu:
             return True
+        if hasattr(self, "flaga_zgon"):
+            return self.flaga_zgon
 
         Zgon = apps.get_model("sakramenty", "Zgon")
         return Zgon.objects.filter(osoba=self).exists()
@@ -124,8 +213,31 @@ class Osoba(models.Model):
     #  INNE
     # ==========================
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self, self.POLA_NORM, kwargs.get("update_fields")
+        )
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self, self.POLA_FONET, kwargs["update_fields"], funkcja=klucz_fonetyczny
+        )
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.nazwisko} {self.imie_pierwsze}"
 
     def get_absolute_url(self):
         return reverse("osoba_szczegoly", args=[self.pk])
+
+
+class IndeksOsobyFTS(models.Model):
+    """
+    Wiersz indeksu pełnotekstowego osób (tabela wirtualna FTS5, tylko SQLite).
+    Tabelę tworzy i wypełnia osoby/wyszukiwarka.py – model służy wyłącznie
+    do złączenia z Osobą w zapytaniach.
+    """
+    rowid = models.IntegerField(primary_key=True, db_column="rowid")
+    dopasowanie = KolumnaFTS(db_column=FTS_TABELA)
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABELA
@@ -0,0 +1,82 @@
+# osoby/profil.py
+"""
+Kartoteka osoby razem ze wszystkimi wpisami sakramentów – wspólne źródło
+danych dla strony szczegółów i wydruku PDF.
+
+Liczba zapytań jest stała (niezależna od liczby wpisów):
+  1. osoba + zgon (select_related),
+  2–6. chrzty, komunie, bierzmowania, namaszczenia, przynależności
+       do rodzin (prefetch, z parafiami / szafarzami przez select_related),
+  7. małżeństwa (jedno zapytanie po obu FK, z małżonkami, parafią i świadkiem).
+"""
+from __future__ import annotations
+
+from django.db.models import Prefetch, Q
+from django.shortcuts import get_object_or_404
+
+from rodziny.models import CzlonkostwoRodziny
+from sakramenty.models import (
+    Bierzmowanie,
+    Chrzest,
+    Malzenstwo,
+    NamaszczenieChorych,
+    PierwszaKomunia,
+)
+
+from .models import Osoba
+
+
+def profil_osoby(pk) -> dict:
+    """
+    Zwraca słownik:
+        osoba, chrzty, komunie, bierzmowania, malzenstwa,
+        namaszczenia, zgon, rodziny
+    (listy już pobrane – szablony nie robią dodatkowych zapytań).
+    Brak osoby -> Http404.
+    """
+    osoba = get_object_or_404(
+        Osoba.objects
+        .select_related("zgon")
+        .prefetch_related(
+            Prefetch(
+                "chrzty",
+                queryset=Chrzest.objects.select_related("parafia").order_by("rok", "akt_nr"),
+            ),
+            Prefetch(
+                "komunie",
+                queryset=PierwszaKomunia.objects.select_related("parafia").order_by("rok"),
+            ),
+            Prefetch(
+                "bierzmowania",
+                queryset=Bierzmowanie.objects.select_related("parafia", "szafarz").order_by("rok", "akt_nr"),
+            ),
+            Prefetch(
+                "namaszczenia",
+                queryset=NamaszczenieChorych.objects.select_related("szafarz").order_by("-data"),
+            ),
+            Prefetch(
+                "przynaleznosci_rodzinne",
+                queryset=CzlonkostwoRodziny.objects.select_related("rodzina"),
+            ),
+        ),
+        pk=pk,
+    )
+
+    malzenstwa = list(
+        Malzenstwo.objects
+        .filter(Q(malzonek_a=osoba) | Q(malzonek_b=osoba))
+        .select_related("malzonek_a", "malzonek_b", "parafia", "swiadek_urzedowy")
+        .order_by("rok", "akt_nr")
+    )
+
+    return {
+        "osoba": osoba,
+        "chrzty": list(osoba.chrzty.all()),
+        "komunie": list(osoba.komunie.all()),
+        "bierzmowania": list(osoba.bierzmowania.all()),
+        "malzenstwa": malzenstwa,
+        "namaszczenia": list(osoba.namaszczenia.all()),
+        # OneToOne – brak wpisu jest zapamiętany przez select_related
+        "zgon": getattr(osoba, "zgon", None),
+        "rodziny": list(osoba.przynaleznosci_rodzinne.all()),
+    }
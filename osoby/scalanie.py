@@ -0,0 +1,151 @@
+# osoby/scalanie.py
+"""
+Scalanie zdublowanych kartotek osób.
+
+Wszystkie odwołania do osoby źródłowej są przepinane na osobę docelową
+zbiorczymi UPDATE-ami w jednej transakcji, po czym osoba źródłowa jest
+usuwana. Puste pola osoby docelowej są uzupełniane danymi ze źródłowej.
+"""
+from __future__ import annotations
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from konta.utils import zapisz_log
+
+from .models import Osoba
+
+# Tryby powiązań
+WIELE = "wiele"              # zwykły FK – przepinamy wszystko
+JEDEN_NA_OSOBE = "jeden"     # maks. jeden wpis na osobę (chrzest, komunia...)
+RAZ_W_RODZINIE = "rodzina"   # unique_together (rodzina, osoba)
+
+# (model, pole FK do Osoby, tryb, etykieta do logu)
+POWIAZANIA = [
+    ("sakramenty.Chrzest", "ochrzczony", JEDEN_NA_OSOBE, "chrzest"),
+    ("sakramenty.PierwszaKomunia", "osoba", JEDEN_NA_OSOBE, "I komunia"),
+    ("sakramenty.Bierzmowanie", "osoba", JEDEN_NA_OSOBE, "bierzmowanie"),
+    ("sakramenty.Zgon", "osoba", JEDEN_NA_OSOBE, "zgon"),
+    ("sakramenty.Malzenstwo", "malzonek_a", WIELE, "małżeństwa (A)"),
+    ("sakramenty.Malzenstwo", "malzonek_b", WIELE, "małżeństwa (B)"),
+    ("sakramenty.NamaszczenieChorych", "osoba", WIELE, "namaszczenia"),
+    ("rodziny.CzlonkostwoRodziny", "osoba", RAZ_W_RODZINIE, "członkostwa w rodzinach"),
+    ("cmentarz.Pochowany", "osoba", WIELE, "pochówki"),
+    ("cmentarz.Grob", "dysponent", WIELE, "groby (dysponent)"),
+]
+
+# Pola uzupełniane w osobie docelowej, jeśli są puste
+POLA_DO_UZUPELNIENIA = [
+    "imie_drugie",
+    "nazwisko_rodowe",
+    "imie_ojca",
+    "imie_matki",
+    "nazwisko_ojca",
+    "nazwisko_matki",
+    "nazwisko_matki_rodowe",
+    "imie_bierzmowanie",
+    "miejsce_urodzenia",
+    "data_zgonu",
+    "ulica",
+    "nr_domu",
+    "nr_mieszkania",
+    "kod_pocztowy",
+    "miejscowosc",
+    "poczta",
+    "telefon",
+    "email",
+    "wyznanie",
+]
+
+
+def konflikty_scalania(docelowa: Osoba, zrodlowa: Osoba) -> list[str]:
+    """
+    Wpisy "jeden na osobę", które istnieją u obu osób – scalenie
+    naruszyłoby ograniczenie unikalności, więc trzeba je najpierw
+    rozstrzygnąć ręcznie.
+    """
+    konflikty = []
+    for etykieta_modelu, pole, tryb, etykieta in POWIAZANIA:
+        if tryb != JEDEN_NA_OSOBE:
+            continue
+        model = apps.get_model(etykieta_modelu)
+        if (
+            model.objects.filter(**{pole: docelowa}).exists()
+            and model.objects.filter(**{pole: zrodlowa}).exists()
+        ):
+            konflikty.append(etykieta)
+    return konflikty
+
+
+def podglad_scalania(zrodlowa: Osoba) -> dict[str, int]:
+    """Ile wpisów zostanie przepiętych (do potwierdzenia w formularzu)."""
+    liczniki = {}
+    for etykieta_modelu, pole, _tryb, etykieta in POWIAZANIA:
+        model = apps.get_model(etykieta_modelu)
+        liczniki[etykieta] = model.objects.filter(**{pole: zrodlowa}).count()
+    return liczniki
+
+
+def scal_osoby(docelowa: Osoba, zrodlowa: Osoba, request=None) -> dict[str, int]:
+    """
+    Przenosi wszystkie powiązania z `zrodlowa` na `docelowa` i usuwa `zrodlowa`.
+    Zwraca liczniki przepiętych wpisów. Rzuca ValidationError przy konflikcie.
+    """
+    if docelowa.pk == zrodlowa.pk:
+        raise ValidationError("Nie można scalić osoby z nią samą.")
+
+    with transaction.atomic():
+        # blokada obu wierszy na czas scalania (na bazach, które to wspierają)
+        osoby = Osoba.objects.select_for_update().in_bulk([docelowa.pk, zrodlowa.pk])
+        if len(osoby) != 2:
+            raise ValidationError("Jedna ze scalanych osób już nie istnieje.")
+        docelowa, zrodlowa = osoby[docelowa.pk], osoby[zrodlowa.pk]
+
+        konflikty = konflikty_scalania(docelowa, zrodlowa)
+        if konflikty:
+            raise ValidationError(
+                "Obie osoby mają wpisy, które mogą wystąpić tylko raz: "
+                + ", ".join(konflikty)
+                + ". Usuń lub popraw zbędny wpis przed scaleniem."
+            )
+
+        liczniki = {}
+        for etykieta_modelu, pole, tryb, etykieta in POWIAZANIA:
+            model = apps.get_model(etykieta_modelu)
+            wpisy = model.objects.filter(**{pole: zrodlowa})
+
+            if tryb == RAZ_W_RODZINIE:
+                # członkostwo w rodzinie, do której docelowa już należy – zbędne
+                wpisy.filter(
+                    rodzina__in=model.objects.filter(**{pole: docelowa}).values("rodzina")
+                ).delete()
+
+            liczniki[etykieta] = wpisy.update(**{pole: docelowa})
+
+        uzupelnione = []
+        for nazwa in POLA_DO_UZUPELNIENIA:
+            pole = Osoba._meta.get_field(nazwa)
+            if not pole.value_from_object(docelowa) and pole.value_from_object(zrodlowa):
+                setattr(docelowa, pole.attname, pole.value_from_object(zrodlowa))
+                uzupelnione.append(nazwa)
+        if uzupelnione:
+            docelowa.save()
+
+        opis_zrodlowej = f"{zrodlowa.imie_pierwsze} {zrodlowa.nazwisko} (ID={zrodlowa.pk})"
+        zrodlowa.delete()
+
+        przepiete = ", ".join(f"{k}: {v}" for k, v in liczniki.items() if v) or "brak"
+        zapisz_log(
+            request,
+            "SCALENIE_OSOB",
+            docelowa,
+            opis=(
+                f"Scalono osobę {opis_zrodlowej} z "
+                f"{docelowa.imie_pierwsze} {docelowa.nazwisko} (ID={docelowa.pk}). "
+                f"Przepięto – {przepiete}. "
+                f"Uzupełnione pola: {', '.join(uzupelnione) or 'brak'}."
+            ),
+        )
+
+    return liczniki
@@ -0,0 +1,37 @@
+# osoby/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Osoba
+from .statystyki import MODELE_STATYSTYK, wyczysc_statystyki_panelu
+from .wyszukiwarka import usun_z_indeksu, zaindeksuj_osobe
+
+
+# =============================================================================
+#  INDEKS PEŁNOTEKSTOWY OSÓB
+# =============================================================================
+@receiver(post_save, sender=Osoba)
+def osoba_zapisana(sender, instance, raw=False, **kwargs):
+    if raw:
+        # loaddata – indeks przebuduje komenda przebuduj_indeks_osob
+        return
+    zaindeksuj_osobe(instance)
+
+
+@receiver(post_delete, sender=Osoba)
+def osoba_usunieta(sender, instance, **kwargs):
+    usun_z_indeksu(instance.pk)
+
+
+# =============================================================================
+#  LICZNIKI PANELU STARTOWEGO
+# =============================================================================
+for _model in MODELE_STATYSTYK.values():
+    post_save.connect(
+        wyczysc_statystyki_panelu, sender=_model,
+        dispatch_uid=f"statystyki_panelu_zapis_{_model._meta.label}",
+    )
+    post_delete.connect(
+        wyczysc_statystyki_panelu, sender=_model,
+        dispatch_uid=f"statystyki_panelu_usuniecie_{_model._meta.label}",
+    )
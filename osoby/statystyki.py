@@ -0,0 +1,82 @@
+# osoby/statystyki.py
+"""
+Liczniki panelu startowego.
+
+Wszystkie liczby liczone są dwoma zapytaniami:
+  1. jedno SELECT z podzapytaniami COUNT(*) dla każdej kartoteki,
+  2. jedna agregacja grobów z warunkowymi Count (po terminie / do 6 miesięcy).
+Wynik trzymamy w cache przez krótki czas; sygnały zapisu / usunięcia
+liczonych modeli czyszczą go od razu (osoby/signals.py).
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from cmentarz.models import Grob
+from rodziny.models import Rodzina
+from sakramenty.models import Bierzmowanie, Chrzest, Malzenstwo
+
+from .models import Osoba
+
+KLUCZ_CACHE = "panel:statystyki"
+CZAS_CACHE = 120  # sekundy
+
+DNI_OSTRZEZENIA_GROBY = 180
+
+# klucz w słowniku statystyk -> model
+MODELE_STATYSTYK = {
+    "osoby": Osoba,
+    "rodziny": Rodzina,
+    "chrzty": Chrzest,
+    "bierzmowania": Bierzmowanie,
+    "sluby": Malzenstwo,
+    "groby": Grob,
+}
+
+
+def _liczby_wierszy() -> dict[str, int]:
+    podzapytania = ", ".join(
+        f"(SELECT COUNT(*) FROM {connection.ops.quote_name(model._meta.db_table)})"
+        for model in MODELE_STATYSTYK.values()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {podzapytania}")
+        wiersz = cursor.fetchone()
+    return dict(zip(MODELE_STATYSTYK, wiersz))
+
+
+def _liczby_grobow(dzis) -> dict[str, int]:
+    granica = dzis + timedelta(days=DNI_OSTRZEZENIA_GROBY)
+    wynik = Grob.objects.aggregate(
+        po_terminie=Count("pk", filter=Q(wazny_do__lt=dzis)),
+        do_6_miesiecy=Count("pk", filter=Q(wazny_do__gte=dzis, wazny_do__lte=granica)),
+    )
+    wynik["lacznie"] = wynik["po_terminie"] + wynik["do_6_miesiecy"]
+    return wynik
+
+
+def statystyki_panelu() -> dict:
+    """
+    {"stats": {...liczby kartotek...},
+     "cmentarz_alert": {"po_terminie", "do_6_miesiecy", "lacznie"}}
+    """
+    dzis = timezone.localdate()
+    wynik = cache.get(KLUCZ_CACHE)
+    # po północy terminy grobów liczymy od nowa
+    if wynik is None or wynik["dzien"] != dzis:
+        wynik = {
+            "dzien": dzis,
+            "stats": _liczby_wierszy(),
+            "cmentarz_alert": _liczby_grobow(dzis),
+        }
+        cache.set(KLUCZ_CACHE, wynik, CZAS_CACHE)
+    return wynik
+
+
+def wyczysc_statystyki_panelu(**kwargs) -> None:
+    cache.delete(KLUCZ_CACHE)
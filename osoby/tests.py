@@ -1,11 +1,23 @@
 # osoby/tests.py
-from datetime import date
+from datetime import date, timedelta
+from io import StringIO
 
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from osoby.duplikaty import znajdz_duplikaty
 from osoby.models import Osoba
+from osoby.profil import profil_osoby
+from osoby.scalanie import POWIAZANIA, scal_osoby
+from osoby.statystyki import statystyki_panelu, wyczysc_statystyki_panelu
+from osoby.wyszukiwarka import przebuduj_indeks, szukaj_osob
+from parafia.utils_tekst import uzupelnij_pola_norm
 
 
 class OsobaModelTest(TestCase):
@@ -43,3 +55,413 @@ class OsobaListaViewSearchTest(TestCase):
         osoby = resp.context["osoby"]
         self.assertEqual(osoby.count(), 1)
         self.assertEqual(osoby.first().nazwisko, "Kowalski")
+
+
+class OsobaPodpowiedziTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        self.kowal = Osoba.objects.create(nazwisko="Kowal", imie_pierwsze="Piotr", data_urodzenia=date(1970, 3, 3))
+        self.kowalski = Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(2001, 1, 1))
+        Osoba.objects.create(nazwisko="Nowak", imie_pierwsze="Anna", data_urodzenia=date(2002, 2, 2))
+
+    def test_wyniki_uszeregowane_wg_trafnosci(self):
+        resp = self.client.get(reverse("osoba_podpowiedzi"), {"q": "kowal"})
+        self.assertEqual(resp.status_code, 200)
+
+        dane = resp.json()
+        self.assertEqual(
+            [w["value"] for w in dane["results"]],
+            [self.kowal.pk, self.kowalski.pk],
+        )
+        self.assertIsNone(dane["next"])
+
+    def test_za_krotkie_zapytanie_zwraca_pusto(self):
+        resp = self.client.get(reverse("osoba_podpowiedzi"), {"q": "k"})
+        self.assertEqual(resp.json()["results"], [])
+
+    def test_formularz_renderuje_tylko_wybrana_osobe(self):
+        from rodziny.forms import DodajCzlonkaForm
+
+        form = DodajCzlonkaForm(initial={"osoba": self.kowalski.pk})
+        html = str(form["osoba"])
+
+        self.assertIn(f'value="{self.kowalski.pk}"', html)
+        self.assertNotIn("Nowak", html)
+        self.assertIn(reverse("osoba_podpowiedzi"), html)
+
+    def test_etykieta_jak_w_polu_formularza(self):
+        from cmentarz.forms import OsobaChoiceField as PoleCmentarz
+        from rodziny.forms import OsobaChoiceField as PoleRodziny
+        from sakramenty.forms import OsobaChoiceField as PoleSakramenty
+
+        Osoba.objects.filter(pk=self.kowal.pk).update(imie_ojca="Adam", imie_matki="Maria")
+        self.kowal.refresh_from_db()
+
+        tekst = self.client.get(reverse("osoba_podpowiedzi"), {"q": "kowal"}).json()["results"][0]["text"]
+        self.assertEqual(tekst, "Kowal Piotr (ur. 1970-03-03, o. Adam, m. Maria)")
+        for pole in (PoleCmentarz, PoleRodziny, PoleSakramenty):
+            self.assertEqual(pole(queryset=Osoba.objects.all()).label_from_instance(self.kowal), tekst)
+
+
+class OsobaIndeksFTSTest(TestCase):
+    def setUp(self):
+        self.zolkiewski = Osoba.objects.create(
+            nazwisko="Żółkiewski",
+            imie_pierwsze="Stanisław",
+            imie_ojca="Łukasz",
+            miejsce_urodzenia="Turynka",
+            data_urodzenia=date(1947, 5, 1),
+        )
+        self.nowak = Osoba.objects.create(
+            nazwisko="Nowak",
+            imie_pierwsze="Zofia",
+            nazwisko_rodowe="Żółkiewska",
+            data_urodzenia=date(1950, 1, 1),
+        )
+
+    def test_prefiks_bez_polskich_znakow(self):
+        wyniki = list(szukaj_osob("zolk"))
+        # trafienie w nazwisku wyżej niż w nazwisku rodowym
+        self.assertEqual(wyniki, [self.zolkiewski, self.nowak])
+
+    def test_rodzice_miejsce_i_rok(self):
+        self.assertEqual(list(szukaj_osob("lukasz")), [self.zolkiewski])
+        self.assertEqual(list(szukaj_osob("turyn 1947")), [self.zolkiewski])
+        self.assertEqual(list(szukaj_osob("1950")), [self.nowak])
+
+    def test_indeks_aktualizowany_przy_zapisie_i_usunieciu(self):
+        self.nowak.nazwisko = "Wiśniewska"
+        self.nowak.save()
+        self.assertEqual(list(szukaj_osob("wisn")), [self.nowak])
+        self.assertEqual(list(szukaj_osob("nowak")), [])
+
+        self.nowak.delete()
+        self.assertEqual(list(szukaj_osob("wisn")), [])
+
+    def test_jedno_zlaczenie_z_indeksem(self):
+        # MATCH i bm25 w jednym przejściu po indeksie – bez podzapytania na każdy wiersz
+        qs = szukaj_osob("zolk")[:21]
+        with self.assertNumQueries(1):
+            self.assertEqual(list(qs), [self.zolkiewski, self.nowak])
+
+        sql, params = qs.query.sql_with_params()
+        self.assertEqual(sql.count("MATCH"), 1)
+        with connection.cursor() as kursor:
+            kursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = " | ".join(wiersz[-1] for wiersz in kursor.fetchall())
+        self.assertIn("VIRTUAL TABLE", plan)
+        self.assertIn("USING INTEGER PRIMARY KEY", plan)
+        self.assertNotIn("CORRELATED", plan)
+
+    def test_przebudowa_indeksu(self):
+        Osoba.objects.filter(pk=self.nowak.pk).update(nazwisko="Zielińska")
+        self.assertEqual(przebuduj_indeks(), 2)
+        self.assertEqual(list(szukaj_osob("zielin")), [self.nowak])
+
+
+class OsobaPolaNormTest(TestCase):
+    def test_save_uzupelnia_kolumny_norm(self):
+        osoba = Osoba.objects.create(
+            nazwisko="Żółkiewski",
+            imie_pierwsze="Łucja",
+            nazwisko_rodowe="Ćwik",
+            data_urodzenia=date(1980, 1, 1),
+        )
+        self.assertEqual(osoba.nazwisko_norm, "zolkiewski")
+        self.assertEqual(osoba.imie_norm, "lucja")
+        self.assertEqual(osoba.nazwisko_rodowe_norm, "cwik")
+
+    def test_save_z_update_fields(self):
+        osoba = Osoba.objects.create(
+            nazwisko="Nowak", imie_pierwsze="Anna", data_urodzenia=date(1980, 1, 1)
+        )
+        osoba.nazwisko = "Śliwińska"
+        osoba.save(update_fields=["nazwisko"])
+
+        osoba.refresh_from_db()
+        self.assertEqual(osoba.nazwisko_norm, "sliwinska")
+
+    def test_dluzszy_po_normalizacji_miesci_sie_w_kolumnie(self):
+        # 30 znaków źródła, 60 po normalizacji (ß -> ss)
+        osoba = Osoba.objects.create(
+            nazwisko="ß" * 30, imie_pierwsze="ﬃ" * 30, data_urodzenia=date(1980, 1, 1)
+        )
+        osoba.refresh_from_db()
+        self.assertEqual(osoba.nazwisko_norm, "ss" * 30)
+        # ligatura rozkłada się na trzy litery – nadmiar jest przycinany do długości kolumny
+        self.assertEqual(osoba.imie_norm, "ffi" * 20)
+
+    def test_uzupelnienie_porcjami(self):
+        Osoba.objects.bulk_create(
+            Osoba(nazwisko=f"Żak{i}", imie_pierwsze="Łucja", data_urodzenia=date(1980, 1, 1))
+            for i in range(5)
+        )
+        self.assertFalse(Osoba.objects.exclude(nazwisko_norm="").exists())
+
+        with CaptureQueriesContext(connection) as zapytania:
+            uzupelnij_pola_norm(Osoba, Osoba.POLA_NORM, porcja=2)
+
+        self.assertEqual(
+            sorted(Osoba.objects.values_list("nazwisko_norm", flat=True)),
+            [f"zak{i}" for i in range(5)],
+        )
+        # odczyt iteratorem + trzy zapisy porcjami (2 + 2 + 1), nie wiersz po wierszu
+        zapisy = [z for z in zapytania.captured_queries if z["sql"].startswith("UPDATE")]
+        self.assertEqual(len(zapisy), 3)
+
+
+class DuplikatyOsobTest(TestCase):
+    def setUp(self):
+        self.a = Osoba.objects.create(
+            nazwisko="Wiśniewski", imie_pierwsze="Józef", data_urodzenia=date(1930, 6, 1),
+            imie_ojca="Jan", imie_matki="Maria", miejsce_urodzenia="Kłomnice",
+        )
+        self.b = Osoba.objects.create(
+            nazwisko="Wisniewski", imie_pierwsze="Jozef", data_urodzenia=date(1930, 6, 1),
+            imie_ojca="Jan", miejsce_urodzenia="Klomnice",
+        )
+        # ten sam blok, ale inna data i inni rodzice – poniżej progu
+        Osoba.objects.create(
+            nazwisko="Wiśniewski", imie_pierwsze="Jan", data_urodzenia=date(1930, 1, 1),
+            imie_ojca="Piotr",
+        )
+        # inny rok – inny blok
+        Osoba.objects.create(nazwisko="Wiśniewski", imie_pierwsze="Józef", data_urodzenia=date(1950, 6, 1))
+
+    def test_znajduje_pare_z_tego_samego_bloku(self):
+        pary = znajdz_duplikaty()
+
+        self.assertEqual(len(pary), 1)
+        self.assertEqual((pary[0]["a_id"], pary[0]["b_id"]), (self.a.pk, self.b.pk))
+        self.assertGreaterEqual(pary[0]["wynik"], 80)
+
+    def test_komenda(self):
+        out = StringIO()
+        call_command("znajdz_duplikaty_osob", stdout=out)
+        self.assertIn("Znaleziono par: 1", out.getvalue())
+
+    def test_strona_tylko_dla_administratora(self):
+        User.objects.create_user(username="sekretariat", password="haslo123")
+        self.client.login(username="sekretariat", password="haslo123")
+        self.assertEqual(self.client.get(reverse("osoba_duplikaty")).status_code, 403)
+
+        User.objects.create_superuser(username="admin", password="haslo123")
+        self.client.login(username="admin", password="haslo123")
+        resp = self.client.get(reverse("osoba_duplikaty"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["liczba_par"], 1)
+
+
+class ScalanieOsobTest(TestCase):
+    def setUp(self):
+        from cmentarz.models import Grob, Pochowany, Sektor
+        from rodziny.models import CzlonkostwoRodziny, Rodzina
+        from sakramenty.models import Chrzest, Malzenstwo
+
+        self.docelowa = Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(1940, 1, 1))
+        self.zrodlowa = Osoba.objects.create(
+            nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(1940, 1, 1), imie_ojca="Piotr",
+        )
+        zona = Osoba.objects.create(nazwisko="Kowalska", imie_pierwsze="Anna", data_urodzenia=date(1942, 1, 1))
+
+        Chrzest.objects.create(rok=1940, akt_nr="1", ochrzczony=self.zrodlowa)
+        Malzenstwo.objects.create(rok="1965", akt_nr="3", malzonek_a=self.zrodlowa, malzonek_b=zona)
+        grob = Grob.objects.create(sektor=Sektor.objects.create(nazwa="A"), numer="1", dysponent=self.zrodlowa)
+        Pochowany.objects.create(grob=grob, osoba=self.zrodlowa)
+
+        rodzina = Rodzina.objects.create(nazwa="Kowalscy")
+        CzlonkostwoRodziny.objects.create(rodzina=rodzina, osoba=self.docelowa)
+        CzlonkostwoRodziny.objects.create(rodzina=rodzina, osoba=self.zrodlowa)
+
+    def test_przepina_wszystkie_powiazania(self):
+        from konta.models import LogAkcji
+
+        liczniki = scal_osoby(self.docelowa, self.zrodlowa)
+
+        self.assertFalse(Osoba.objects.filter(pk=self.zrodlowa.pk).exists())
+        self.assertEqual(liczniki["chrzest"], 1)
+        self.assertEqual(liczniki["małżeństwa (A)"], 1)
+        self.assertEqual(liczniki["pochówki"], 1)
+        self.assertEqual(liczniki["groby (dysponent)"], 1)
+        self.assertEqual(self.docelowa.chrzty.count(), 1)
+        self.assertEqual(self.docelowa.przynaleznosci_rodzinne.count(), 1)
+        self.assertEqual(self.docelowa.groby_dysponowane.count(), 1)
+
+        self.docelowa.refresh_from_db()
+        self.assertEqual(self.docelowa.imie_ojca, "Piotr")
+        self.assertEqual(LogAkcji.objects.filter(akcja="SCALENIE_OSOB").count(), 1)
+
+    def test_konflikt_jeden_na_osobe(self):
+        from sakramenty.models import Chrzest
+
+        Chrzest.objects.create(rok=1940, akt_nr="2", ochrzczony=self.docelowa)
+
+        with self.assertRaises(ValidationError):
+            scal_osoby(self.docelowa, self.zrodlowa)
+        # nic się nie zmieniło
+        self.assertTrue(Osoba.objects.filter(pk=self.zrodlowa.pk).exists())
+        self.assertEqual(self.zrodlowa.chrzty.count(), 1)
+
+    def test_wszystkie_powiazania_osoby_sa_obslugiwane(self):
+        obslugiwane = {(model.lower(), pole) for model, pole, _tryb, _etykieta in POWIAZANIA}
+        for rel in Osoba._meta.related_objects:
+            klucz = (rel.related_model._meta.label_lower, rel.field.name)
+            self.assertIn(klucz, obslugiwane)
+
+    def test_widok_scalania(self):
+        User.objects.create_superuser(username="admin", password="haslo123")
+        self.client.login(username="admin", password="haslo123")
+        url = reverse("osoba_scal", args=[self.docelowa.pk])
+
+        resp = self.client.get(url, {"zrodlowa": self.zrodlowa.pk})
+        self.assertEqual(resp.context["podglad"]["chrzest"], 1)
+
+        resp = self.client.post(url, {"zrodlowa": self.zrodlowa.pk})
+        self.assertRedirects(resp, reverse("osoba_szczegoly", args=[self.docelowa.pk]))
+        self.assertFalse(Osoba.objects.filter(pk=self.zrodlowa.pk).exists())
+
+    def test_scalanie_bez_uprawnien(self):
+        User.objects.create_user(username="sekretariat", password="haslo123")
+        self.client.login(username="sekretariat", password="haslo123")
+        # brak roli – 403 także dla nieistniejącej osoby (bez zdradzania, czy istnieje)
+        self.assertEqual(self.client.get(reverse("osoba_scal", args=[self.docelowa.pk])).status_code, 403)
+        self.assertEqual(self.client.post(reverse("osoba_scal", args=[999999])).status_code, 403)
+        self.assertTrue(Osoba.objects.filter(pk=self.zrodlowa.pk).exists())
+
+
+class ProfilOsobyTest(TestCase):
+    def setUp(self):
+        from sakramenty.models import Bierzmowanie, Chrzest, Malzenstwo, NamaszczenieChorych, Zgon
+        from slowniki.models import Duchowny, Parafia
+
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        parafia = Parafia.objects.create(nazwa="św. Jana", miejscowosc="Mykanów")
+        ksiadz = Duchowny.objects.create(imie_nazwisko="Piotr Nowak")
+
+        self.osoba = Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(1950, 1, 1))
+        Chrzest.objects.create(rok=1950, akt_nr="1", ochrzczony=self.osoba, parafia=parafia)
+        Bierzmowanie.objects.create(rok=1965, akt_nr="1", osoba=self.osoba, parafia=parafia, szafarz=ksiadz)
+        for i in range(3):
+            zona = Osoba.objects.create(nazwisko="Nowak", imie_pierwsze=f"Anna{i}", data_urodzenia=date(1952, 1, 1))
+            Malzenstwo.objects.create(
+                rok=str(1975 + i), akt_nr="1", malzonek_a=self.osoba, malzonek_b=zona,
+                parafia=parafia, swiadek_urzedowy=ksiadz,
+            )
+            NamaszczenieChorych.objects.create(osoba=self.osoba, data=date(2010 + i, 1, 1), szafarz=ksiadz)
+        Zgon.objects.create(rok=2020, akt_nr="1", osoba=self.osoba, data_zgonu=date(2020, 1, 1))
+
+    def test_stala_liczba_zapytan(self):
+        with self.assertNumQueries(7):
+            profil = profil_osoby(self.osoba.pk)
+            # dostęp do relacji, których używają szablony – bez dodatkowych zapytań
+            for m in profil["malzenstwa"]:
+                str(m.malzonek_b), str(m.parafia), str(m.swiadek_urzedowy)
+            for b in profil["bierzmowania"]:
+                str(b.parafia), str(b.szafarz)
+            for n in profil["namaszczenia"]:
+                str(n.szafarz)
+            str(profil["chrzty"][0].parafia)
+
+        self.assertEqual(len(profil["malzenstwa"]), 3)
+        self.assertEqual(len(profil["namaszczenia"]), 3)
+        self.assertEqual(profil["zgon"].data_zgonu, date(2020, 1, 1))
+
+    def test_szczegoly_i_pdf_nie_rosna_z_liczba_wpisow(self):
+        from sakramenty.models import NamaszczenieChorych
+
+        def liczba_zapytan(nazwa_url):
+            with CaptureQueriesContext(connection) as zapytania:
+                resp = self.client.get(reverse(nazwa_url, args=[self.osoba.pk]))
+            self.assertEqual(resp.status_code, 200)
+            return len(zapytania)
+
+        # rozgrzanie sesji / ustawień parafii
+        liczba_zapytan("osoba_szczegoly")
+        liczba_zapytan("osoba_pdf")
+        przed = {nazwa: liczba_zapytan(nazwa) for nazwa in ("osoba_szczegoly", "osoba_pdf")}
+        for i in range(5):
+            NamaszczenieChorych.objects.create(osoba=self.osoba, data=date(2015, 1, 1 + i))
+        po = {nazwa: liczba_zapytan(nazwa) for nazwa in ("osoba_szczegoly", "osoba_pdf")}
+
+        self.assertEqual(przed, po)
+
+
+class StatystykiPaneluTest(TestCase):
+    def setUp(self):
+        from cmentarz.models import Grob, Sektor
+
+        wyczysc_statystyki_panelu()
+        self.addCleanup(wyczysc_statystyki_panelu)
+
+        Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(1950, 1, 1))
+        sektor = Sektor.objects.create(nazwa="A")
+        dzis = timezone.localdate()
+        Grob.objects.create(sektor=sektor, numer="1", wazny_do=dzis - timedelta(days=1))
+        Grob.objects.create(sektor=sektor, numer="2", wazny_do=dzis + timedelta(days=30))
+        Grob.objects.create(sektor=sektor, numer="3", wazny_do=dzis + timedelta(days=400))
+        wyczysc_statystyki_panelu()
+
+    def test_dwa_zapytania_potem_cache(self):
+        with self.assertNumQueries(2):
+            wynik = statystyki_panelu()
+        self.assertEqual(wynik["stats"]["osoby"], 1)
+        self.assertEqual(wynik["stats"]["groby"], 3)
+        self.assertEqual(
+            wynik["cmentarz_alert"],
+            {"po_terminie": 1, "do_6_miesiecy": 1, "lacznie": 2},
+        )
+
+        with self.assertNumQueries(0):
+            statystyki_panelu()
+
+    def test_zapis_i_usuniecie_czyszcza_cache(self):
+        statystyki_panelu()
+        osoba = Osoba.objects.create(nazwisko="Nowak", imie_pierwsze="Anna", data_urodzenia=date(1960, 1, 1))
+        self.assertEqual(statystyki_panelu()["stats"]["osoby"], 2)
+
+        osoba.delete()
+        self.assertEqual(statystyki_panelu()["stats"]["osoby"], 1)
+
+
+class PanelMiniKalendarzTest(TestCase):
+    def setUp(self):
+        from msze.models import IntencjaMszy, Msza
+
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        zajeta = Msza.objects.create(data=date(2030, 5, 6), godzina="7:00", miejsce="Kościół")
+        IntencjaMszy.objects.create(msza=zajeta, tresc="Za + Jana")
+        IntencjaMszy.objects.create(msza=zajeta, tresc="Za + Annę")
+        Msza.objects.create(data=date(2030, 5, 6), godzina="18:00", miejsce="Kościół")
+
+    def _dzien(self, resp, dzien):
+        for tydzien in resp.context["mini_kalendarz"]["weeks"]:
+            for d in tydzien:
+                if d["date"] == dzien:
+                    return d
+
+    def test_liczniki_dnia(self):
+        resp = self.client.get(reverse("panel_start"), {"year": 2030, "month": 5})
+        d = self._dzien(resp, date(2030, 5, 6))
+        self.assertEqual((d["all"], d["busy"]), (2, 1))
+
+    def test_liczba_zapytan_nie_zalezy_od_liczby_mszy(self):
+        from msze.models import IntencjaMszy, Msza
+
+        def liczba_zapytan():
+            with CaptureQueriesContext(connection) as zapytania:
+                self.client.get(reverse("panel_start"), {"year": 2030, "month": 5})
+            return len(zapytania)
+
+        liczba_zapytan()  # rozgrzanie sesji / cache statystyk
+        przed = liczba_zapytan()
+        for dzien in range(10, 20):
+            msza = Msza.objects.create(data=date(2030, 5, dzien), godzina="7:00", miejsce="Kościół")
+            IntencjaMszy.objects.create(msza=msza, tresc="Intencja")
+        liczba_zapytan()
+        self.assertEqual(liczba_zapytan(), przed)
@@ -6,9 +6,12 @@ urlpatterns = [
     path("", views.PanelStartView.as_view(), name="panel_start"),
 
     path("osoby/", views.OsobaListaView.as_view(), name="osoba_lista"),
+    path("osoby/podpowiedzi/", views.osoba_podpowiedzi, name="osoba_podpowiedzi"),
+    path("osoby/duplikaty/", views.OsobaDuplikatyView.as_view(), name="osoba_duplikaty"),
     path("osoby/nowa/", views.OsobaNowaView.as_view(), name="osoba_nowa"),
     path("osoby/<int:pk>/", views.OsobaSzczegolyView.as_view(), name="osoba_szczegoly"),
     path("osoby/<int:pk>/edytuj/", views.OsobaEdycjaView.as_view(), name="osoba_edytuj"),
+    path("osoby/<int:pk>/scal/", views.OsobaScalView.as_view(), name="osoba_scal"),
     path("osoby/<int:pk>/usun/", views.OsobaUsunView.as_view(), name="osoba_usun"),
     path('osoby/<int:pk>/pdf/', views.OsobaPDFView.as_view(), name='osoba_pdf'),
     path("szukaj/", views.GlobalSearchView.as_view(), name="global_search"),
@@ -5,12 +5,15 @@
 # =============================================================================
 import calendar
 from datetime import date, timedelta
+from urllib.parse import urlencode
 
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Count, IntegerField, Q, Value, When
 from django.db.models.deletion import ProtectedError
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -24,6 +27,8 @@ from django.views.generic import (
 )
 
 from parafia.utils_pdf import render_to_pdf
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import normalizuj
 
 from cmentarz.models import Grob, Pochowany
 from konta.mixins import RolaWymaganaMixin
@@ -32,17 +37,14 @@ from konta.utils import zapisz_log
 from konta.utils_backup import czy_backup_jest_nalezny, wykonaj_backup_bazy
 from msze.models import Msza
 from rodziny.models import Rodzina
-from sakramenty.models import (
-    Chrzest,
-    PierwszaKomunia,
-    Bierzmowanie,
-    Malzenstwo,
-    NamaszczenieChorych,
-    Zgon,
-)
 
-from .forms import OsobaForm
+from .duplikaty import PROG_DOMYSLNY, znajdz_duplikaty
+from .forms import OsobaForm, ScalOsobyForm, etykieta_osoby
 from .models import Osoba
+from .profil import profil_osoby
+from .scalanie import konflikty_scalania, podglad_scalania, scal_osoby
+from .statystyki import DNI_OSTRZEZENIA_GROBY, statystyki_panelu
+from .wyszukiwarka import pk_osob_pasujacych, szukaj_osob
 
 
 # =============================================================================
@@ -55,21 +57,10 @@ class PanelStartView(LoginRequiredMixin, TemplateView):
         ctx = super().get_context_data(**kwargs)
         today_real = timezone.localdate()
 
-        # --- Statystyki ogólne ---
-        ctx["stats"] = {
-            "osoby": Osoba.objects.count(),
-            "rodziny": Rodzina.objects.count(),
-            "chrzty": Chrzest.objects.count(),
-            "bierzmowania": Bierzmowanie.objects.count(),
-            "sluby": Malzenstwo.objects.count(),
-            "groby": Grob.objects.count(),
-        }
-
-        # --- Groby po terminie (liczba) ---
-        ctx["groby_po_terminie"] = Grob.objects.filter(
-            wazny_do__isnull=False,
-            wazny_do__lt=today_real,
-        ).count()
+        # --- Statystyki ogólne + liczniki grobów (2 zapytania, cache) ---
+        statystyki = statystyki_panelu()
+        ctx["stats"] = statystyki["stats"]
+        ctx["cmentarz_alert"] = statystyki["cmentarz_alert"]
 
         # --- Najbliższe msze (do 8) ---
         ctx["msze_najblizsze"] = (
@@ -79,28 +70,18 @@ class PanelStartView(LoginRequiredMixin, TemplateView):
         )
 
         # === ALERTY CMENTARZA (po terminie / do 6 miesięcy) ===
-        today = timezone.localdate()
-        six_months = today + timedelta(days=180)
+        six_months = today_real + timedelta(days=DNI_OSTRZEZENIA_GROBY)
 
-        groby_po_terminie = Grob.objects.filter(
+        ctx["groby_po_terminie"] = Grob.objects.filter(
             wazny_do__isnull=False,
-            wazny_do__lt=today,
-        ).order_by("wazny_do")
+            wazny_do__lt=today_real,
+        ).order_by("wazny_do")[:5]
 
-        groby_6_miesiecy = Grob.objects.filter(
+        ctx["groby_6_miesiecy"] = Grob.objects.filter(
             wazny_do__isnull=False,
-            wazny_do__gte=today,
+            wazny_do__gte=today_real,
             wazny_do__lte=six_months,
-        ).order_by("wazny_do")
-
-        ctx["groby_po_terminie"] = groby_po_terminie[:5]
-        ctx["groby_6_miesiecy"] = groby_6_miesiecy[:5]
-
-        ctx["cmentarz_alert"] = {
-            "po_terminie": groby_po_terminie.count(),
-            "do_6_miesiecy": groby_6_miesiecy.count(),
-            "lacznie": groby_po_terminie.count() + groby_6_miesiecy.count(),
-        }
+        ).order_by("wazny_do")[:5]
 
         # === MINI KALENDARZ MSZY ===
         # 1. Parametry (rok / miesiąc)
@@ -138,18 +119,20 @@ class PanelStartView(LoginRequiredMixin, TemplateView):
         next_month_first = date(next_year, next_month, 1)
         last_day = next_month_first - timedelta(days=1)
 
-        # 4. Zliczanie mszy danego dnia
-        msze = (
+        # 4. Zliczanie mszy danego dnia – jedno zapytanie GROUP BY data
+        #    (msza z kilkoma intencjami liczona raz – stąd distinct)
+        dni = (
             Msza.objects.filter(data__gte=first_day, data__lte=last_day)
-            .order_by("data", "godzina")
-            .prefetch_related("intencje")
+            .order_by()
+            .values("data")
+            .annotate(
+                wszystkie=Count("pk", distinct=True),
+                zajete=Count("pk", filter=Q(intencje__isnull=False), distinct=True),
+            )
         )
-        counts: dict[date, dict] = {}
-        for m in msze:
-            rec = counts.setdefault(m.data, {"all": 0, "busy": 0})
-            rec["all"] += 1
-            if m.intencje.exists():
-                rec["busy"] += 1
+        counts: dict[date, dict] = {
+            d["data"]: {"all": d["wszystkie"], "busy": d["zajete"]} for d in dni
+        }
 
         # 5. Budowa struktury kalendarza
         cal = calendar.Calendar(firstweekday=calendar.MONDAY)
@@ -199,24 +182,26 @@ class PanelStartView(LoginRequiredMixin, TemplateView):
 # =============================================================================
 #  LISTA / SZCZEGÓŁY OSOBY
 # =============================================================================
-class OsobaListaView(LoginRequiredMixin, ListView):
+class OsobaListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Osoba
     template_name = "osoby/lista.html"
     context_object_name = "osoby"
     paginate_by = 20
+    klucz_stronicowania = ("nazwisko", "imie_pierwsze", "pk")
+
+    def get_klucz_stronicowania(self):
+        # wyniki wyszukiwania są sortowane wg trafności – zwykłe stronicowanie
+        if (self.request.GET.get("q") or "").strip():
+            return None
+        return super().get_klucz_stronicowania()
 
     def get_queryset(self):
-        qs = Osoba.objects.all().order_by("nazwisko", "imie_pierwsze", "pk")
         q = (self.request.GET.get("q") or "").strip()
 
         if q:
-            for slowo in q.split():
-                qs = qs.filter(
-                    Q(nazwisko__icontains=slowo)
-                    | Q(imie_pierwsze__icontains=slowo)
-                    | Q(nazwisko_rodowe__icontains=slowo)
-                )
-        return qs
+            # indeks FTS – wyniki od najtrafniejszych
+            return szukaj_osob(q)
+        return Osoba.objects.all().order_by("nazwisko", "imie_pierwsze", "pk")
 
 
 class OsobaSzczegolyView(LoginRequiredMixin, DetailView):
@@ -224,44 +209,22 @@ class OsobaSzczegolyView(LoginRequiredMixin, DetailView):
     template_name = "osoby/szczegoly.html"
     context_object_name = "osoba"
 
+    def get_object(self, queryset=None):
+        # osoba + wszystkie wpisy sakramentów w stałej liczbie zapytań
+        self.profil = profil_osoby(self.kwargs["pk"])
+        return self.profil["osoba"]
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        osoba = self.object
+        profil = self.profil
 
-        # 1. Chrzest (0 lub 1)
-        ctx["chrzty_osoby"] = (
-            Chrzest.objects.filter(ochrzczony=osoba)
-            .order_by("rok", "akt_nr")
-        )
-
-        # 2. I Komunia
-        ctx["komunia_osoby"] = PierwszaKomunia.objects.filter(osoba=osoba).first()
-
-        # 3. Bierzmowanie
-        ctx["bierzmowanie_osoby"] = (
-            Bierzmowanie.objects.filter(osoba=osoba)
-            .order_by("rok", "akt_nr")
-            .first()
-        )
-
-        # 4. Małżeństwa (jako A lub B)
-        ctx["malzenstwa_osoby"] = (
-            Malzenstwo.objects.filter(
-                Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
-            ).order_by("rok", "akt_nr")
-        )
-
-        # 5. Namaszczenia chorych
-        ctx["namaszczenia_osoby"] = (
-            NamaszczenieChorych.objects.filter(osoba=osoba)
-            .order_by("-data")
-        )
-
-        # 6. Zgon (OneToOne – przez atrybut zgon)
-        ctx["zgon_osoby"] = getattr(osoba, "zgon", None)
-
-        # 7. Rodziny (przynależności)
-        ctx["rodziny"] = osoba.przynaleznosci_rodzinne.all()
+        ctx["chrzty_osoby"] = profil["chrzty"]
+        ctx["komunia_osoby"] = profil["komunie"][0] if profil["komunie"] else None
+        ctx["bierzmowanie_osoby"] = profil["bierzmowania"][0] if profil["bierzmowania"] else None
+        ctx["malzenstwa_osoby"] = profil["malzenstwa"]
+        ctx["namaszczenia_osoby"] = profil["namaszczenia"]
+        ctx["zgon_osoby"] = profil["zgon"]
+        ctx["rodziny"] = profil["rodziny"]
 
         return ctx
 
@@ -354,6 +317,89 @@ class OsobaUsunView(RolaWymaganaMixin, View):
         messages.success(request, "Osoba została usunięta.")
         return redirect("osoba_lista")
     
+# =============================================================================
+#  SCALANIE OSÓB
+# =============================================================================
+class OsobaScalView(RolaWymaganaMixin, View):
+    """
+    Scala duplikat (zrodlowa) z bieżącą osobą (pk z adresu).
+    GET  – wybór duplikatu i podgląd, co zostanie przeniesione,
+    POST – scalenie (osoby/scalanie.py).
+    """
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    template_name = "osoby/scal.html"
+
+    def _kontekst(self, form):
+        ctx = {"osoba": self.osoba, "form": form}
+        if form.is_bound and form.is_valid():
+            zrodlowa = form.cleaned_data["zrodlowa"]
+            ctx["zrodlowa"] = zrodlowa
+            ctx["podglad"] = podglad_scalania(zrodlowa)
+            ctx["konflikty"] = konflikty_scalania(self.osoba, zrodlowa)
+        return ctx
+
+    # osoba wczytywana dopiero po sprawdzeniu roli (dispatch) – bez uprawnień 403, nie 404
+    def get(self, request, *args, **kwargs):
+        self.osoba = get_object_or_404(Osoba, pk=kwargs["pk"])
+        dane = request.GET if request.GET.get("zrodlowa") else None
+        form = ScalOsobyForm(dane, docelowa=self.osoba)
+        return render(request, self.template_name, self._kontekst(form))
+
+    def post(self, request, *args, **kwargs):
+        self.osoba = get_object_or_404(Osoba, pk=kwargs["pk"])
+        form = ScalOsobyForm(request.POST, docelowa=self.osoba)
+        if not form.is_valid():
+            return render(request, self.template_name, self._kontekst(form))
+
+        try:
+            liczniki = scal_osoby(self.osoba, form.cleaned_data["zrodlowa"], request=request)
+        except ValidationError as e:
+            messages.error(request, " ".join(e.messages))
+            return render(request, self.template_name, self._kontekst(form))
+
+        messages.success(
+            request,
+            f"Scalono kartoteki – przeniesiono wpisów: {sum(liczniki.values())}.",
+        )
+        return redirect("osoba_szczegoly", pk=self.osoba.pk)
+
+
+# =============================================================================
+#  DUPLIKATY OSÓB
+# =============================================================================
+class OsobaDuplikatyView(RolaWymaganaMixin, TemplateView):
+    """
+    Lista par prawdopodobnych duplikatów (osoby/duplikaty.py).
+    Ta sama logika co komenda `manage.py znajdz_duplikaty_osob`.
+    """
+    dozwolone_role = [Rola.ADMIN]
+    template_name = "osoby/duplikaty.html"
+    limit_par = 200
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+
+        try:
+            prog = int(self.request.GET.get("prog", PROG_DOMYSLNY))
+        except (TypeError, ValueError):
+            prog = PROG_DOMYSLNY
+
+        pary = znajdz_duplikaty(prog=prog)
+        pokazane = pary[:self.limit_par]
+        osoby = Osoba.objects.in_bulk(
+            {p["a_id"] for p in pokazane} | {p["b_id"] for p in pokazane}
+        )
+        for para in pokazane:
+            para["a"] = osoby[para["a_id"]]
+            para["b"] = osoby[para["b_id"]]
+
+        ctx["pary"] = pokazane
+        ctx["liczba_par"] = len(pary)
+        ctx["prog"] = prog
+        ctx["limit_par"] = self.limit_par
+        return ctx
+
+
 # =============================================================================
 #  WYSZUKIWARKA GLOBALNA
 # =============================================================================
@@ -372,26 +418,17 @@ class GlobalSearchView(TemplateView):
             return ctx
 
         # Osoby
-        ctx["wyniki_osoby"] = (
-            Osoba.objects.filter(
-                Q(imie_pierwsze__icontains=q)
-                | Q(nazwisko__icontains=q)
-            )
-            .order_by("nazwisko", "imie_pierwsze")
-        )
+        ctx["wyniki_osoby"] = szukaj_osob(q)
 
         # Rodziny
         ctx["wyniki_rodziny"] = (
-            Rodzina.objects.filter(Q(nazwa__icontains=q))
+            Rodzina.objects.filter(Q(nazwa_norm__contains=normalizuj(q)))
             .order_by("nazwa")
         )
 
         # Pochowani na cmentarzu
         ctx["wyniki_pochowani"] = (
-            Pochowany.objects.filter(
-                Q(osoba__nazwisko__icontains=q)
-                | Q(osoba__imie_pierwsze__icontains=q)
-            )
+            Pochowany.objects.filter(osoba_id__in=pk_osob_pasujacych(q))
             .select_related("osoba", "grob", "grob__sektor")
             .order_by("osoba__nazwisko", "osoba__imie_pierwsze")
         )
@@ -399,30 +436,85 @@ class GlobalSearchView(TemplateView):
         return ctx
 
 
+# =============================================================================
+#  PODPOWIEDZI OSÓB (Tom Select – pola wyboru osoby)
+# =============================================================================
+PODPOWIEDZI_MIN_DLUGOSC = 2
+PODPOWIEDZI_NA_STRONE = 20
+PODPOWIEDZI_MAKS_STRON = 10  # razem maks. 200 pierwszych trafień
+
+
+@login_required
+def osoba_podpowiedzi(request):
+    """
+    Zwraca JSON dla Tom Select (plugin virtual_scroll):
+        {"results": [{"value": pk, "text": "..."}], "next": url | null}
+
+    - kandydaci pochodzą z indeksu pełnotekstowego (osoby/wyszukiwarka.py),
+    - wyniki są rankowane (dokładne nazwisko > początek nazwiska > początek imienia),
+      a w obrębie grupy wg trafności bm25,
+    - stronicowanie bez COUNT(*) – pobieramy jeden wiersz więcej niż strona.
+    """
+    q = (request.GET.get("q") or "").strip()
+    try:
+        strona = max(int(request.GET.get("page", 1)), 1)
+    except (TypeError, ValueError):
+        strona = 1
+
+    if len(q) < PODPOWIEDZI_MIN_DLUGOSC or strona > PODPOWIEDZI_MAKS_STRON:
+        return JsonResponse({"results": [], "next": None})
+
+    # kandydaci z indeksu FTS (prefiksowo, z rokiem urodzenia), potem własny ranking
+    qs = szukaj_osob(q)
+    slowa = q.split()
+    pierwsze = normalizuj(slowa[0])
+    qs = (
+        qs.annotate(
+            dopasowanie=Case(
+                When(nazwisko_norm=pierwsze, then=Value(0)),
+                When(nazwisko_norm__startswith=pierwsze, then=Value(1)),
+                When(imie_norm__startswith=pierwsze, then=Value(2)),
+                When(nazwisko_rodowe_norm__startswith=pierwsze, then=Value(3)),
+                default=Value(4),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("dopasowanie", "trafnosc", "nazwisko", "imie_pierwsze", "data_urodzenia", "pk")
+        .only("pk", "nazwisko", "imie_pierwsze", "data_urodzenia", "imie_ojca", "imie_matki")
+    )
+
+    start = (strona - 1) * PODPOWIEDZI_NA_STRONE
+    wiersze = list(qs[start:start + PODPOWIEDZI_NA_STRONE + 1])
+    ma_wiecej = len(wiersze) > PODPOWIEDZI_NA_STRONE
+
+    wyniki = [
+        {"value": o.pk, "text": etykieta_osoby(o)}
+        for o in wiersze[:PODPOWIEDZI_NA_STRONE]
+    ]
+
+    nastepna = None
+    if ma_wiecej and strona < PODPOWIEDZI_MAKS_STRON:
+        nastepna = f"{request.path}?{urlencode({'q': q, 'page': strona + 1})}"
+
+    return JsonResponse({"results": wyniki, "next": nastepna})
+
+
 # =============================================================================
 #  PDF – KARTOTEKA OSOBY
 # =============================================================================
 class OsobaPDFView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
-        osoba = get_object_or_404(Osoba, pk=kwargs["pk"])
-
-        chrzty = Chrzest.objects.filter(ochrzczony=osoba)
-        komunie = PierwszaKomunia.objects.filter(osoba=osoba)
-        bierzmowania = Bierzmowanie.objects.filter(osoba=osoba)
-        malzenstwa = Malzenstwo.objects.filter(
-            Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
-        ).select_related("malzonek_a", "malzonek_b", "parafia")
-        namaszczenia = NamaszczenieChorych.objects.filter(osoba=osoba).order_by("-data")
-        zgon = Zgon.objects.filter(osoba=osoba).first()
+        profil = profil_osoby(kwargs["pk"])
+        osoba = profil["osoba"]
 
         context = {
             "osoba": osoba,
-            "chrzty": chrzty,
-            "komunie": komunie,
-            "bierzmowania": bierzmowania,
-            "malzenstwa": malzenstwa,
-            "namaszczenia": namaszczenia,
-            "zgon_osoby": zgon,
+            "chrzty": profil["chrzty"],
+            "komunie": profil["komunie"],
+            "bierzmowania": profil["bierzmowania"],
+            "malzenstwa": profil["malzenstwa"],
+            "namaszczenia": profil["namaszczenia"],
+            "zgon_osoby": profil["zgon"],
             "today": timezone.now(),  # data + czas do stopki PDF
         }
 
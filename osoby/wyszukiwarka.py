@@ -0,0 +1,210 @@
+# osoby/wyszukiwarka.py
+"""
+Indeks pełnotekstowy osób (SQLite FTS5).
+
+Tabela wirtualna `osoby_osoba_fts` trzyma znormalizowane (bez polskich znaków,
+małymi literami) nazwiska, imiona, nazwisko rodowe, dane rodziców, miejsce
+i rok urodzenia. rowid wiersza = pk osoby.
+
+- synchronizacja: sygnały post_save / post_delete (osoby/signals.py),
+- operacje masowe (queryset.update, bulk_create) → przebuduj_indeks()
+  albo komenda `manage.py przebuduj_indeks_osob`,
+- szukaj_osob złącza Osobę z indeksem po rowid (Osoba.indeks_fts →
+  niezarządzany model IndeksOsobyFTS); MATCH i bm25 liczone raz na trafienie,
+- na bazach innych niż SQLite wyszukiwanie wraca do kolumn *_norm.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import FloatField, Func, Lookup, Q, QuerySet, TextField, Value
+
+from parafia.utils_tekst import normalizuj
+
+FTS_TABELA = "osoby_osoba_fts"
+
+# Kolumny indeksu i ich wagi w rankingu bm25 (wyższa waga = ważniejsze trafienie)
+FTS_KOLUMNY = [
+    ("nazwisko", 10.0),
+    ("imiona", 5.0),
+    ("nazwisko_rodowe", 4.0),
+    ("rodzice", 1.0),
+    ("miejsce_urodzenia", 1.0),
+    ("rok_urodzenia", 2.0),
+]
+
+
+class KolumnaFTS(TextField):
+    """
+    Ukryta kolumna tabeli FTS5 o nazwie tabeli – lewa strona MATCH
+    i pierwszy argument bm25() (model IndeksOsobyFTS).
+    """
+
+
+@KolumnaFTS.register_lookup
+class Dopasowanie(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class Bm25(Func):
+    """bm25(indeks, wagi kolumn…) – mniejsza wartość = lepsze trafienie."""
+    function = "bm25"
+    output_field = FloatField()
+
+    def __init__(self, kolumna):
+        super().__init__(kolumna, *(Value(waga) for _, waga in FTS_KOLUMNY))
+
+
+def fts_dostepne() -> bool:
+    return connection.vendor == "sqlite"
+
+
+# =============================================================================
+#  BUDOWA / AKTUALIZACJA INDEKSU
+# =============================================================================
+def sql_utworz_indeks() -> str:
+    kolumny = ", ".join(nazwa for nazwa, _ in FTS_KOLUMNY)
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABELA} "
+        f"USING fts5({kolumny}, tokenize='unicode61')"
+    )
+
+
+def wiersz_indeksu(osoba) -> list[str]:
+    """
+    Wartości kolumn indeksu dla osoby (w kolejności FTS_KOLUMNY).
+    Działa też na modelach historycznych z migracji.
+    """
+    return [
+        normalizuj(osoba.nazwisko),
+        normalizuj(f"{osoba.imie_pierwsze} {osoba.imie_drugie} {osoba.imie_bierzmowanie}"),
+        normalizuj(osoba.nazwisko_rodowe),
+        normalizuj(
+            f"{osoba.imie_ojca} {osoba.nazwisko_ojca} "
+            f"{osoba.imie_matki} {osoba.nazwisko_matki} {osoba.nazwisko_matki_rodowe}"
+        ),
+        normalizuj(osoba.miejsce_urodzenia),
+        str(osoba.data_urodzenia.year) if osoba.data_urodzenia else "",
+    ]
+
+
+def _sql_wstaw() -> str:
+    kolumny = ", ".join(nazwa for nazwa, _ in FTS_KOLUMNY)
+    znaczniki = ", ".join(["%s"] * (len(FTS_KOLUMNY) + 1))
+    return f"INSERT INTO {FTS_TABELA} (rowid, {kolumny}) VALUES ({znaczniki})"
+
+
+def zaindeksuj_osobe(osoba) -> None:
+    if not fts_dostepne():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABELA} WHERE rowid = %s", [osoba.pk])
+        cursor.execute(_sql_wstaw(), [osoba.pk, *wiersz_indeksu(osoba)])
+
+
+def usun_z_indeksu(pk) -> None:
+    if not fts_dostepne():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABELA} WHERE rowid = %s", [pk])
+
+
+def przebuduj_indeks(osoby=None, paczka: int = 2000) -> int:
+    """
+    Buduje indeks od zera. `osoby` – queryset/iterowalne osób
+    (domyślnie wszystkie). Zwraca liczbę zaindeksowanych osób.
+    """
+    if not fts_dostepne():
+        return 0
+
+    if osoby is None:
+        from .models import Osoba
+        osoby = Osoba.objects.all()
+    if isinstance(osoby, QuerySet):
+        osoby = osoby.order_by("pk").iterator(chunk_size=paczka)
+
+    licznik = 0
+    # jedna transakcja – w trybie autocommit każdy INSERT byłby osobnym zapisem na dysk
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABELA}")
+        wiersze = []
+        for osoba in osoby:
+            wiersze.append([osoba.pk, *wiersz_indeksu(osoba)])
+            if len(wiersze) >= paczka:
+                cursor.executemany(_sql_wstaw(), wiersze)
+                licznik += len(wiersze)
+                wiersze = []
+        if wiersze:
+            cursor.executemany(_sql_wstaw(), wiersze)
+            licznik += len(wiersze)
+    return licznik
+
+
+# =============================================================================
+#  WYSZUKIWANIE
+# =============================================================================
+def zapytanie_fts(fraza: str) -> str:
+    """
+    'Kowal Jan 1950' -> '"kowal"* AND "jan"* AND "1950"*'
+    Każde słowo dopasowywane prefiksowo, wszystkie muszą wystąpić.
+    """
+    slowa = re.findall(r"\w+", normalizuj(fraza))
+    return " AND ".join(f'"{slowo}"*' for slowo in slowa)
+
+
+def _filtr_norm(qs: QuerySet, fraza: str) -> QuerySet:
+    for slowo in normalizuj(fraza).split():
+        qs = qs.filter(
+            Q(nazwisko_norm__contains=slowo)
+            | Q(imie_norm__contains=slowo)
+            | Q(nazwisko_rodowe_norm__contains=slowo)
+        )
+    return qs
+
+
+def szukaj_osob(fraza: str, qs: QuerySet | None = None) -> QuerySet:
+    """
+    Zwraca osoby pasujące do frazy, posortowane wg trafności
+    (adnotacja `trafnosc`, mniejsza = lepsza), potem alfabetycznie.
+    """
+    from .models import Osoba
+
+    if qs is None:
+        qs = Osoba.objects.all()
+
+    fraza = (fraza or "").strip()
+    if not fraza:
+        return qs
+
+    if not fts_dostepne():
+        return (
+            _filtr_norm(qs, fraza)
+            .annotate(trafnosc=Value(0.0, output_field=FloatField()))
+            .order_by("nazwisko", "imie_pierwsze", "pk")
+        )
+
+    zapytanie = zapytanie_fts(fraza)
+    if not zapytanie:
+        return qs.none().annotate(trafnosc=Value(0.0, output_field=FloatField()))
+
+    # złączenie z tabelą FTS po rowid (Osoba.indeks_fts): MATCH i bm25
+    # liczone w jednym przejściu po trafieniach indeksu
+    return (
+        qs.filter(indeks_fts__dopasowanie__match=zapytanie)
+        .annotate(trafnosc=Bm25("indeks_fts__dopasowanie"))
+        .order_by("trafnosc", "nazwisko", "imie_pierwsze", "pk")
+    )
+
+
+def pk_osob_pasujacych(fraza: str):
+    """
+    Podzapytanie z pk osób pasujących do frazy – do filtrów typu
+    `osoba_id__in=...` w innych modelach (np. Pochowany).
+    """
+    return szukaj_osob(fraza).values("pk")
@@ -135,6 +135,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# pliki z danymi osobowymi (wydruki ksiąg) – poza MEDIA_ROOT, bez publicznego URL;
+# wydawane tylko przez widoki sprawdzające uprawnienia (parafia/utils_pliki.py)
+PLIKI_PRYWATNE_ROOT = config("PLIKI_PRYWATNE_ROOT", default=str(BASE_DIR / "prywatne"))
+
 
 # ======================================
 #  LOGOWANIE / UWIERZYTELNIANIE
@@ -0,0 +1,29 @@
+# parafia/utils_cache.py
+"""
+Cache wyników "z wersją": obok wartości zapamiętujemy znacznik stanu danych
+(np. skrót liczb i daty ostatniej zmiany), z którego ją wyliczono.
+Dopóki znacznik się nie zmieni, wartość jest brana z cache; po zmianie
+danych jest liczona od nowa – bez ręcznego czyszczenia przy każdym zapisie.
+"""
+from __future__ import annotations
+
+from typing import Callable, TypeVar
+
+from django.core.cache import cache
+
+T = TypeVar("T")
+
+CZAS_CACHE_WERSJI = 24 * 3600  # sekundy; nieaktualną wersję i tak wykrywa znacznik
+
+
+def z_cache_wersji(klucz: str, wersja: str, generuj: Callable[[], T], timeout: int = CZAS_CACHE_WERSJI) -> T:
+    """
+    Wartość spod `klucz`, jeśli powstała dla tej samej `wersja`;
+    w przeciwnym razie wywołuje `generuj()` i zapamiętuje wynik.
+    """
+    wpis = cache.get(klucz)
+    if wpis is not None and wpis[0] == wersja:
+        return wpis[1]
+    wartosc = generuj()
+    cache.set(klucz, (wersja, wartosc), timeout)
+    return wartosc
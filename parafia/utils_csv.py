@@ -0,0 +1,44 @@
+# parafia/utils_csv.py
+"""
+Eksport CSV strumieniowo: wiersze są zapisywane do odpowiedzi w miarę
+czytania z bazy (queryset.iterator()), więc pamięć nie rośnie z liczbą
+wierszy, a pierwsze bajty idą do przeglądarki od razu.
+
+Format pod polskiego Excela: separator ";", BOM UTF-8 na początku.
+"""
+from __future__ import annotations
+
+import csv
+from typing import Iterable, Sequence
+
+from django.http import StreamingHttpResponse
+
+ROZMIAR_PORCJI = 2000
+
+
+class _Echo:
+    """"Plik", który zamiast zapisywać zwraca zapisany tekst (dla csv.writer)."""
+
+    def write(self, wartosc):
+        return wartosc
+
+
+def strumien_csv(
+    naglowek: Sequence[str],
+    wiersze: Iterable[Sequence],
+    filename: str = "eksport.csv",
+) -> StreamingHttpResponse:
+    """
+    StreamingHttpResponse z plikiem CSV. `wiersze` powinny być leniwe,
+    np. qs.values_list(...).iterator(chunk_size=ROZMIAR_PORCJI).
+    """
+    writer = csv.writer(_Echo(), delimiter=";")
+
+    def generuj():
+        yield "\ufeff" + writer.writerow(naglowek)
+        for wiersz in wiersze:
+            yield writer.writerow(wiersz)
+
+    response = StreamingHttpResponse(generuj(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
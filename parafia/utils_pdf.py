@@ -1,49 +1,103 @@
 # sakramenty/utils_pdf.py
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from contextlib import ExitStack
+from io import BytesIO
+from tempfile import TemporaryFile
+from typing import Any, Dict, Iterable, Optional
 
 from django.apps import apps
 from django.conf import settings
 from django.http import HttpResponse
 from django.template.loader import render_to_string
+from pypdf import PdfWriter
 from weasyprint import HTML
 
 
-def render_to_pdf(
-    template_name: str,
-    context: Optional[Dict[str, Any]] = None,
-    filename: str = "dokument.pdf",
-) -> HttpResponse:
+def html_do_pdf(template_name: str, context: Optional[Dict[str, Any]] = None) -> bytes:
     """
-    Renderuje szablon HTML do PDF przy użyciu WeasyPrint i zwraca HttpResponse.
+    Renderuje szablon HTML do PDF (WeasyPrint) i zwraca bajty dokumentu.
 
     - Automatycznie dołącza do kontekstu obiekt UstawieniaParafii jako 'parafia'
       (o ile klucz 'parafia' nie został już podany).
-    - `template_name` – ścieżka do szablonu (np. 'sakramenty/chrzest_pdf.html')
-    - `context` – słownik kontekstu przekazywany do render_to_string
-    - `filename` – nazwa pliku proponowana przy pobieraniu / otwieraniu PDF-a
     """
+    context = _z_parafia(context)
+
+    # Render HTML z szablonu
+    html_string = render_to_string(template_name, context)
 
+    # Generowanie PDF z HTML
+    html = HTML(string=html_string, base_url=str(settings.BASE_DIR))
+    return html.write_pdf()
+
+
+def _z_parafia(context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if context is None:
         context = {}
 
-    # Dynamiczne pobranie modelu, aby uniknąć problemów z cyklicznymi importami
-    UstawieniaParafii = apps.get_model("konfiguracja", "UstawieniaParafii")
-    parafia_obj = UstawieniaParafii.load()
-
     # Jeśli w kontekście nie ma jeszcze klucza 'parafia', wstrzykujemy z ustawień
-    context.setdefault("parafia", parafia_obj)
+    # (load() korzysta z cache procesu – bez zapytania przy każdym wydruku)
+    if "parafia" not in context:
+        # Dynamiczne pobranie modelu, aby uniknąć problemów z cyklicznymi importami
+        UstawieniaParafii = apps.get_model("konfiguracja", "UstawieniaParafii")
+        context["parafia"] = UstawieniaParafii.load()
+    return context
 
-    # Render HTML z szablonu
-    html_string = render_to_string(template_name, context)
 
-    # Generowanie PDF z HTML
-    html = HTML(string=html_string, base_url=str(settings.BASE_DIR))
-    pdf_file = html.write_pdf()
+def pdf_z_sekcji(
+    template_name: str,
+    sekcje: Iterable[Dict[str, Any]],
+    context: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """
+    Długi dokument (np. roczny wykaz) renderowany sekcjami i scalany w jeden PDF.
+
+    - `sekcje` – iterator kontekstów kolejnych sekcji (najlepiej generator,
+      który pobiera dane z bazy dopiero, gdy sekcja jest potrzebna),
+    - `context` – wspólna część kontekstu (dołączana do każdej sekcji).
+
+    Każda sekcja jest renderowana i od razu zapisywana jako osobny PDF
+    w pliku tymczasowym – układ stron WeasyPrint istnieje naraz tylko dla
+    jednej sekcji. Na końcu pliki sekcji są scalane (pypdf) w jeden dokument.
+    """
+    context = _z_parafia(context)
+    base_url = str(settings.BASE_DIR)
+
+    with ExitStack() as pliki:
+        scalony = PdfWriter()
+        for sekcja in sekcje:
+            html_string = render_to_string(template_name, {**context, **sekcja})
+            # pypdf czyta strony leniwie – pliki sekcji otwarte do końca zapisu
+            plik = pliki.enter_context(TemporaryFile())
+            HTML(string=html_string, base_url=base_url).write_pdf(plik)
+            plik.seek(0)
+            scalony.append(plik)
+
+        if not scalony.pages:
+            return html_do_pdf(template_name, context)
+        wynik = BytesIO()
+        scalony.write(wynik)
+        return wynik.getvalue()
 
-    # Odpowiedź HTTP z PDF-em
+
+def odpowiedz_pdf(pdf_file: bytes, filename: str = "dokument.pdf") -> HttpResponse:
+    """HttpResponse z gotowym PDF-em (otwierany w przeglądarce)."""
     response = HttpResponse(pdf_file, content_type="application/pdf")
     response["Content-Disposition"] = f'inline; filename="{filename}"'
-
     return response
+
+
+def render_to_pdf(
+    template_name: str,
+    context: Optional[Dict[str, Any]] = None,
+    filename: str = "dokument.pdf",
+) -> HttpResponse:
+    """
+    Renderuje szablon HTML do PDF przy użyciu WeasyPrint i zwraca HttpResponse.
+
+    - `template_name` – ścieżka do szablonu (np. 'sakramenty/chrzest_pdf.html')
+    - `context` – słownik kontekstu przekazywany do render_to_string
+      ('parafia' dołączana automatycznie – patrz html_do_pdf)
+    - `filename` – nazwa pliku proponowana przy pobieraniu / otwieraniu PDF-a
+    """
+    return odpowiedz_pdf(html_do_pdf(template_name, context), filename)
@@ -0,0 +1,40 @@
+# parafia/utils_pliki.py
+"""
+Magazyn plików z danymi osobowymi (np. roczne wydruki ksiąg).
+
+Pliki leżą poza MEDIA_ROOT (settings.PLIKI_PRYWATNE_ROOT), więc nie obsługuje
+ich ani serwer WWW, ani `static()` w trybie DEBUG. Magazyn nie ma publicznego
+URL – plik wydaje wyłącznie widok, który sprawdził uprawnienia (FileResponse).
+"""
+from __future__ import annotations
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+@deconstructible
+class MagazynPrywatny(FileSystemStorage):
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PLIKI_PRYWATNE_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "PLIKI_PRYWATNE_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+    def url(self, name):
+        raise ValueError("Pliki prywatne nie mają publicznego adresu – pobieranie tylko przez widok.")
+
+
+magazyn_prywatny = MagazynPrywatny()
+
+
+def nazwa_losowa(katalog: str, rozszerzenie: str) -> str:
+    """Nieodgadywalna nazwa pliku, np. "ksiegi/3f2c….pdf"."""
+    return f"{katalog}/{uuid4().hex}{rozszerzenie}"
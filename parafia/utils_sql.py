@@ -0,0 +1,49 @@
+# parafia/utils_sql.py
+from __future__ import annotations
+
+from django.db.models import Aggregate, CharField, Value
+from django.db.models.functions import Collate
+
+from parafia.utils_tekst import porownaj_pl
+
+KOLACJA_PL = "pl"                        # SQLite – rejestrowana przy połączeniu
+KOLACJA_PL_POSTGRESQL = "pl-PL-x-icu"
+
+
+class GroupConcat(Aggregate):
+    """
+    Sklejenie wartości z grupy w jeden tekst:
+        GROUP_CONCAT(x, sep)  – SQLite
+        STRING_AGG(x, sep)    – PostgreSQL
+    Kolejność elementów nie jest gwarantowana przez bazę.
+    """
+
+    function = "GROUP_CONCAT"
+    output_field = CharField()
+
+    def __init__(self, expression, separator: str = ", ", **extra):
+        super().__init__(expression, Value(separator), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function="STRING_AGG", **extra_context)
+
+
+class PolskieSortowanie(Collate):
+    """
+    Kolumna tekstowa z polską kolacją – do order_by():
+        COLLATE "pl"           – SQLite (porownaj_pl, zarejestruj_kolacje_pl)
+        COLLATE "pl-PL-x-icu"  – PostgreSQL (ICU)
+    """
+
+    def __init__(self, expression):
+        super().__init__(expression, KOLACJA_PL)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        extra_context.setdefault("collation", connection.ops.quote_name(KOLACJA_PL_POSTGRESQL))
+        return self.as_sql(compiler, connection, **extra_context)
+
+
+def zarejestruj_kolacje_pl(sender, connection, **kwargs):
+    """Odbiornik connection_created – SQLite nie zna polskiej kolacji."""
+    if connection.vendor == "sqlite":
+        connection.connection.create_collation(KOLACJA_PL, porownaj_pl)
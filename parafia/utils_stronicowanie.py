@@ -0,0 +1,298 @@
+# parafia/utils_stronicowanie.py
+"""
+Stronicowanie "kluczowe" (keyset) dla długich list.
+
+Zamiast OFFSET-u (który przy dalekich stronach każe bazie przejść przez
+wszystkie wcześniejsze wiersze) zapamiętujemy w linku wartości klucza
+sortowania ostatniego / pierwszego wiersza strony i pobieramy następną
+porcję warunkiem "za tym kluczem". Każda strona kosztuje tyle co pierwsza.
+
+- `?po=<kursor>`    – strona następna (wiersze za kursorem),
+- `?przed=<kursor>` – strona poprzednia (wiersze przed kursorem).
+
+Łączna liczba wpisów jest liczona raz i trzymana w cache przez kilka minut.
+Pola klucza muszą być razem jednoznaczne (na końcu zawsze "pk"). Pola
+dopuszczające NULL są dozwolone – puste wartości trafiają zawsze na koniec
+listy (niezależnie od kierunku sortowania i bazy danych).
+"""
+from __future__ import annotations
+
+import base64
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+PARAM_PO = "po"
+PARAM_PRZED = "przed"
+
+CZAS_CACHE_LICZBY = 300  # sekundy
+
+
+# =============================================================================
+#  LICZBA WPISÓW (CACHE)
+# =============================================================================
+def policz_z_cache(qs, timeout: int = CZAS_CACHE_LICZBY) -> int:
+    """
+    COUNT(*) dla querysetu, zapamiętany w cache pod kluczem z treści zapytania.
+    Wynik może być nieaktualny o kilka minut – wystarcza do "Wpisów: N".
+    """
+    try:
+        sql, params = qs.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+
+    klucz = "stronicowanie:liczba:" + hashlib.md5(
+        f"{sql}|{params!r}".encode("utf-8")
+    ).hexdigest()
+
+    liczba = cache.get(klucz)
+    if liczba is None:
+        liczba = qs.count()
+        cache.set(klucz, liczba, timeout)
+    return liczba
+
+
+# =============================================================================
+#  KURSORY
+# =============================================================================
+def _pole_modelu(model, sciezka: str):
+    """'osoba__nazwisko' -> pole Osoba.nazwisko; 'pk' -> klucz główny."""
+    pole = None
+    for czesc in sciezka.split("__"):
+        pole = model._meta.pk if czesc == "pk" else model._meta.get_field(czesc)
+        if pole.is_relation:
+            model = pole.related_model
+    return pole
+
+
+def _wartosc_z_obiektu(obj, sciezka: str):
+    for czesc in sciezka.split("__"):
+        obj = getattr(obj, czesc)
+    return obj
+
+
+def zakoduj_kursor(wartosci) -> str:
+    dane = [
+        w.isoformat() if isinstance(w, (datetime.date, datetime.time)) else w
+        for w in wartosci
+    ]
+    tekst = json.dumps(dane, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(tekst.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def odkoduj_kursor(kursor: str, model, klucz) -> list:
+    """Odwrotność zakoduj_kursor; błędny kursor -> Http404 (jak zły numer strony)."""
+    try:
+        tekst = base64.urlsafe_b64decode(kursor + "=" * (-len(kursor) % 4)).decode("utf-8")
+        dane = json.loads(tekst)
+        if not isinstance(dane, list) or len(dane) != len(klucz):
+            raise ValueError
+        return [
+            _pole_modelu(model, pole.lstrip("-")).to_python(wartosc)
+            for pole, wartosc in zip(klucz, dane)
+        ]
+    except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+        raise Http404("Nieprawidłowa strona.")
+
+
+def _pola_null(model, klucz) -> set[str]:
+    return {
+        pole.lstrip("-") for pole in klucz
+        if model is not None and _pole_modelu(model, pole.lstrip("-")).null
+    }
+
+
+def warunek_za_kursorem(klucz, wartosci, wstecz: bool = False, model=None) -> Q:
+    """
+    Warunek "wiersz leży za kursorem" w porządku `klucz`
+    (lub przed nim, gdy wstecz=True), np. dla ("-rok", "akt_nr", "pk"):
+
+        rok < R  OR  (rok = R AND akt_nr > A)  OR  (rok = R AND akt_nr = A AND pk > P)
+
+    Dla pól z NULL (rozpoznawanych po `model`) puste wartości leżą za
+    wszystkimi niepustymi – patrz sortowanie().
+    """
+    null = _pola_null(model, klucz)
+    warunek = Q()
+    rowne = {}
+    for pole, wartosc in zip(klucz, wartosci):
+        nazwa = pole.lstrip("-")
+        malejaco = pole.startswith("-")
+        operator = "lt" if malejaco != wstecz else "gt"
+        if wartosc is None:
+            # za pustą wartością nie ma już niczego; przed nią – wszystkie niepuste
+            if wstecz:
+                warunek |= Q(**rowne, **{f"{nazwa}__isnull": False})
+            rowne[f"{nazwa}__isnull"] = True
+            continue
+        dalej = Q(**{f"{nazwa}__{operator}": wartosc})
+        if nazwa in null and not wstecz:
+            dalej |= Q(**{f"{nazwa}__isnull": True})
+        warunek |= Q(**rowne) & dalej
+        rowne[nazwa] = wartosc
+    return warunek
+
+
+def sortowanie(klucz, model=None, wstecz: bool = False) -> list:
+    """
+    Argumenty order_by() dla klucza (wstecz=True – w odwrotnym porządku).
+    Pola z NULL dostają jawne NULLS LAST, bo domyślne miejsce NULL-i zależy od bazy.
+    """
+    null = _pola_null(model, klucz)
+    wynik = []
+    for pole in (_odwroc(klucz) if wstecz else klucz):
+        nazwa = pole.lstrip("-")
+        if nazwa not in null:
+            wynik.append(pole)
+            continue
+        nulle = {"nulls_first": True} if wstecz else {"nulls_last": True}
+        wynik.append(F(nazwa).desc(**nulle) if pole.startswith("-") else F(nazwa).asc(**nulle))
+    return wynik
+
+
+def _url_strony(get_params, numer) -> str:
+    params = get_params.copy()
+    params.pop(PARAM_PO, None)
+    params.pop(PARAM_PRZED, None)
+    params["page"] = numer
+    return "?" + params.urlencode()
+
+
+def _odwroc(klucz):
+    return [pole[1:] if pole.startswith("-") else f"-{pole}" for pole in klucz]
+
+
+# =============================================================================
+#  STRONA / "PAGINATOR"
+# =============================================================================
+class LicznikWpisow:
+    """Zastępuje Paginator w kontekście – zna tylko (zapamiętaną) liczbę wpisów."""
+
+    def __init__(self, qs):
+        self._qs = qs
+
+    @cached_property
+    def count(self) -> int:
+        return policz_z_cache(self._qs)
+
+
+class StronaKluczowa:
+    """
+    Odpowiednik Page dla stronicowania kluczowego. W szablonie:
+        page_obj.has_previous / page_obj.url_poprzedniej
+        page_obj.has_next     / page_obj.url_nastepnej
+    (url_* to gotowe query stringi z zachowanymi filtrami, np. "?q=...&po=...").
+    """
+
+    def __init__(self, object_list, klucz, get_params, ma_poprzednia, ma_nastepna):
+        self.object_list = object_list
+        self._klucz = klucz
+        self._get = get_params
+        # pusta strona (np. wpisy usunięte w międzyczasie) nie ma od czego liczyć kursora
+        self._ma_poprzednia = ma_poprzednia and bool(object_list)
+        self._ma_nastepna = ma_nastepna and bool(object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self) -> bool:
+        return self._ma_poprzednia
+
+    def has_next(self) -> bool:
+        return self._ma_nastepna
+
+    def has_other_pages(self) -> bool:
+        return self._ma_poprzednia or self._ma_nastepna
+
+    def _url(self, parametr, obj) -> str:
+        params = self._get.copy()
+        params.pop(PARAM_PO, None)
+        params.pop(PARAM_PRZED, None)
+        params.pop("page", None)
+        params[parametr] = zakoduj_kursor(
+            [_wartosc_z_obiektu(obj, pole.lstrip("-")) for pole in self._klucz]
+        )
+        return "?" + params.urlencode()
+
+    @property
+    def url_nastepnej(self) -> str:
+        return self._url(PARAM_PO, self.object_list[-1]) if self._ma_nastepna else ""
+
+    @property
+    def url_poprzedniej(self) -> str:
+        return self._url(PARAM_PRZED, self.object_list[0]) if self._ma_poprzednia else ""
+
+
+# =============================================================================
+#  MIXIN DO ListView
+# =============================================================================
+class StronicowanieKluczoweMixin:
+    """
+    Mixin dla ListView: zamienia stronicowanie OFFSET na kluczowe.
+
+        class ChrzestListaView(StronicowanieKluczoweMixin, LoginRequiredMixin, ListView):
+            paginate_by = 50
+            klucz_stronicowania = ("-rok", "akt_nr", "pk")
+
+    Klucz powinien odpowiadać dotychczasowemu sortowaniu widoku (queryset
+    jest sortowany właśnie po nim); domyślnie to `ordering` widoku + "pk".
+    get_klucz_stronicowania() może zwrócić None – wtedy działa zwykłe
+    stronicowanie Django (np. wyniki wyszukiwania sortowane wg trafności).
+    """
+
+    klucz_stronicowania: tuple[str, ...] | None = None
+
+    def get_klucz_stronicowania(self):
+        if self.klucz_stronicowania is not None:
+            return self.klucz_stronicowania
+        ordering = self.get_ordering()
+        if not ordering:
+            return None
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return (*ordering, "pk")
+
+    def paginate_queryset(self, queryset, page_size):
+        klucz = self.get_klucz_stronicowania()
+        get = self.request.GET
+        if not klucz:
+            paginator, strona, wiersze, jest_stronicowane = super().paginate_queryset(queryset, page_size)
+            # te same nazwy linków co przy stronicowaniu kluczowym – jeden szablon dla obu trybów
+            strona.url_nastepnej = _url_strony(get, strona.next_page_number()) if strona.has_next() else ""
+            strona.url_poprzedniej = _url_strony(get, strona.previous_page_number()) if strona.has_previous() else ""
+            return paginator, strona, wiersze, jest_stronicowane
+
+        kursor_po = get.get(PARAM_PO)
+        kursor_przed = get.get(PARAM_PRZED)
+
+        model = queryset.model
+        qs = queryset.order_by(*sortowanie(klucz, model))
+        if kursor_przed:
+            wartosci = odkoduj_kursor(kursor_przed, model, klucz)
+            wiersze = list(
+                qs.filter(warunek_za_kursorem(klucz, wartosci, wstecz=True, model=model))
+                .order_by(*sortowanie(klucz, model, wstecz=True))[: page_size + 1]
+            )
+            ma_poprzednia = len(wiersze) > page_size
+            wiersze = wiersze[:page_size][::-1]
+            ma_nastepna = True
+        else:
+            if kursor_po:
+                wartosci = odkoduj_kursor(kursor_po, model, klucz)
+                qs = qs.filter(warunek_za_kursorem(klucz, wartosci, model=model))
+            wiersze = list(qs[: page_size + 1])
+            ma_nastepna = len(wiersze) > page_size
+            wiersze = wiersze[:page_size]
+            ma_poprzednia = bool(kursor_po)
+
+        strona = StronaKluczowa(wiersze, klucz, get, ma_poprzednia, ma_nastepna)
+        return LicznikWpisow(queryset), strona, wiersze, strona.has_other_pages()
@@ -0,0 +1,187 @@
+# parafia/utils_tekst.py
+from __future__ import annotations
+
+import unicodedata
+from functools import lru_cache
+
+# Litery, których NFKD nie rozkłada na "literę + znak diakrytyczny"
+_ZNAKI_SPECJALNE = str.maketrans({
+    "ł": "l",
+    "Ł": "L",
+    "ß": "ss",
+    "ø": "o",
+    "Ø": "O",
+})
+
+
+def normalizuj(tekst: str | None) -> str:
+    """
+    Sprowadza tekst do postaci porównywalnej: bez polskich znaków,
+    małymi literami, z pojedynczymi spacjami.
+
+    'Żółkiewski  Łukasz' -> 'zolkiewski lukasz'
+    """
+    if not tekst:
+        return ""
+
+    tekst = str(tekst).translate(_ZNAKI_SPECJALNE)
+    tekst = unicodedata.normalize("NFKD", tekst)
+    tekst = "".join(znak for znak in tekst if not unicodedata.combining(znak))
+    return " ".join(tekst.lower().split())
+
+
+def ustaw_pola_norm(obj, pola: dict[str, tuple[str, ...]], update_fields=None, funkcja=None):
+    """
+    Uzupełnia kolumny-cienie (np. 'nazwisko_norm') na podstawie pól źródłowych.
+    Wywoływane w Model.save(); zwraca update_fields poszerzone o kolumny
+    zależne od zapisywanych pól (albo None, gdy zapisujemy cały obiekt).
+
+    pola = {"nazwisko_norm": ("nazwisko",), "adres_norm": ("ulica", "miejscowosc")}
+    funkcja – przekształcenie tekstu (domyślnie normalizuj)
+
+    Wynik jest przycinany do max_length kolumny – normalizacja potrafi
+    wydłużyć tekst (ß -> ss, ligatury), a baza nie może odrzucić zapisu.
+    """
+    funkcja = funkcja or normalizuj
+    dodatkowe = []
+    for cel, zrodla in pola.items():
+        wartosc = funkcja(" ".join(getattr(obj, z) or "" for z in zrodla))
+        max_length = obj._meta.get_field(cel).max_length
+        setattr(obj, cel, wartosc[:max_length] if max_length else wartosc)
+        if update_fields is not None and set(zrodla) & set(update_fields):
+            dodatkowe.append(cel)
+
+    if update_fields is None:
+        return None
+    return list(update_fields) + [p for p in dodatkowe if p not in update_fields]
+
+
+def uzupelnij_pola_norm(model, pola: dict[str, tuple[str, ...]], funkcja=None, porcja: int = 1000):
+    """
+    Wypełnia kolumny-cienie dla wszystkich istniejących wierszy (migracje danych).
+    Wiersze są czytane iteratorem i zapisywane porcjami przez bulk_update,
+    więc pamięć nie rośnie z wielkością tabeli.
+    """
+    zrodla = {z for grupa in pola.values() for z in grupa}
+    wiersze = model._default_manager.only("pk", *zrodla).order_by("pk")
+    bufor = []
+    for obj in wiersze.iterator(chunk_size=porcja):
+        ustaw_pola_norm(obj, pola, funkcja=funkcja)
+        bufor.append(obj)
+        if len(bufor) >= porcja:
+            model._default_manager.bulk_update(bufor, list(pola))
+            bufor = []
+    if bufor:
+        model._default_manager.bulk_update(bufor, list(pola))
+
+
+# =============================================================================
+#  KLUCZ FONETYCZNY NAZWISK ("brzmi jak")
+# =============================================================================
+# Uproszczony wariant Daitcha–Mokotoffa dostosowany do polskiej pisowni:
+# jeden 6-cyfrowy kod na nazwisko (żeby wyszukiwanie było jednym lookupem
+# po indeksie), sz/ż/rz/s/z oraz cz/c/dz/ć zlewają się w jedną grupę,
+# w/v/f/p/b w drugą, ch/h/k/g w trzecią. Kowalski = Kovalski = Kowalska.
+
+_FONET_SAMOGLOSKI = set("aeiouy")
+
+# najdłuższe dopasowania najpierw
+_FONET_KODY = [
+    ("dzs", "4"), ("tsz", "4"), ("sch", "4"), ("szcz", "4"),
+    ("cz", "4"), ("cs", "4"), ("dz", "4"), ("ts", "4"), ("tz", "4"),
+    ("sz", "4"), ("rz", "4"), ("zs", "4"), ("zh", "4"),
+    ("ch", "5"), ("kh", "5"), ("ck", "5"),
+    ("ph", "7"), ("pf", "7"),
+    ("th", "3"), ("dt", "3"),
+    ("mn", "66"), ("nm", "66"),
+    ("c", "4"), ("s", "4"), ("z", "4"),
+    ("g", "5"), ("h", "5"), ("k", "5"), ("q", "5"), ("x", "54"),
+    ("b", "7"), ("f", "7"), ("p", "7"), ("v", "7"), ("w", "7"),
+    ("d", "3"), ("t", "3"),
+    ("l", "8"),
+    ("m", "6"), ("n", "6"),
+    ("r", "9"),
+    ("j", "1"),
+]
+
+FONET_DLUGOSC = 6
+
+
+def klucz_fonetyczny(nazwisko: str | None) -> str:
+    """
+    Zwraca 6-cyfrowy kod fonetyczny nazwiska ('' dla pustego).
+
+    'Kowalski' / 'Kovalski' / 'Kowalska'   -> '578450'
+    'Szymański' / 'Szymanski' / 'Symanski' -> '466450'
+    """
+    tekst = (nazwisko or "").lower().replace("ó", "u")
+    tekst = "".join(z for z in normalizuj(tekst) if z.isalpha())
+    if not tekst:
+        return ""
+
+    kod = []
+    poprzedni = None
+    i = 0
+    if tekst[0] in _FONET_SAMOGLOSKI:
+        kod.append("0")
+
+    while i < len(tekst):
+        if tekst[i] in _FONET_SAMOGLOSKI:
+            # samogłoski w środku nie są kodowane, ale rozdzielają powtórzenia
+            poprzedni = None
+            i += 1
+            continue
+
+        for litery, cyfry in _FONET_KODY:
+            if tekst.startswith(litery, i):
+                if cyfry != poprzedni:
+                    kod.append(cyfry)
+                poprzedni = cyfry
+                i += len(litery)
+                break
+        else:
+            i += 1
+
+    return "".join(kod)[:FONET_DLUGOSC].ljust(FONET_DLUGOSC, "0")
+
+
+def klucz_fonetyczny_nazwiska(opis: str | None) -> str:
+    """
+    Kod fonetyczny nazwiska z pola typu "imię i nazwisko" (ostatni wyraz).
+    'Jan Kowalski' -> klucz_fonetyczny('Kowalski')
+    """
+    wyrazy = (opis or "").split()
+    return klucz_fonetyczny(wyrazy[-1]) if wyrazy else ""
+
+
+# =============================================================================
+#  SORTOWANIE WG POLSKIEGO ALFABETU
+# =============================================================================
+_ALFABET_PL = "aąbcćdeęfghijklłmnńoópqrsśtuvwxyzźż"
+_POZYCJA_PL = {litera: chr(0x100 + i) for i, litera in enumerate(_ALFABET_PL)}
+
+
+@lru_cache(maxsize=8192)
+def klucz_sortowania(tekst: str | None) -> str:
+    """
+    Klucz porządku alfabetycznego wg polskich zasad: ą po a, ł po l,
+    ś po s, ź i ż po z; wielkość liter bez znaczenia, obce znaki
+    diakrytyczne jak litera bazowa (é = e).
+
+    sorted(["Żak", "Zając", "Łoś", "Lis"], key=klucz_sortowania)
+        -> ['Lis', 'Łoś', 'Zając', 'Żak']
+    """
+    klucz = []
+    for znak in " ".join((tekst or "").lower().split()):
+        if znak not in _POZYCJA_PL:
+            znak = normalizuj(znak) or znak
+        klucz.append(_POZYCJA_PL.get(znak, znak))
+    return "".join(klucz)
+
+
+def porownaj_pl(a: str | None, b: str | None) -> int:
+    """Porównanie (-1 / 0 / 1) wg klucz_sortowania – np. jako kolacja SQLite."""
+    ka, kb = klucz_sortowania(a), klucz_sortowania(b)
+    if ka == kb:
+        ka, kb = a or "", b or ""
+    return (ka > kb) - (ka < kb)
@@ -5,6 +5,7 @@ from django import forms
 
 from .models import Rodzina, CzlonkostwoRodziny, WizytaDuszpasterska
 from osoby.models import Osoba
+from osoby.forms import OsobaAutocompleteWidget, etykieta_osoby
 from slowniki.models import Duchowny
 
 
@@ -34,14 +35,14 @@ class BootstrapFormMixin:
 
 class OsobaChoiceField(forms.ModelChoiceField):
     """
-    Pole ModelChoiceField z ładniejszą etykietą:
-    'Kowalski Jan (dd.mm.rrrr)'.
+    Pole ModelChoiceField z etykietą jak w podpowiedziach (etykieta_osoby).
+    Opcje dociąga Tom Select z endpointu podpowiedzi (OsobaAutocompleteWidget).
     """
 
+    widget = OsobaAutocompleteWidget
+
     def label_from_instance(self, obj: Osoba) -> str:
-        if obj.data_urodzenia:
-            return f"{obj.nazwisko} {obj.imie_pierwsze} ({obj.data_urodzenia:%d.%m.%Y})"
-        return f"{obj.nazwisko} {obj.imie_pierwsze}"
+        return etykieta_osoby(obj)
 
 
 class RodzinaForm(BootstrapFormMixin, forms.ModelForm):
@@ -121,7 +122,7 @@ class DodajCzlonkaForm(BootstrapFormMixin, forms.ModelForm):
     osoba = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by("nazwisko", "imie_pierwsze"),
         label="Wybierz osobę",
-        widget=forms.Select(attrs={"class": "js-osoba-select"}),
+        widget=OsobaAutocompleteWidget(attrs={"class": "js-osoba-select"}),
     )
 
     class Meta:
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+def uzupelnij_kolumny_norm(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("rodziny", "Rodzina"), {
+        "nazwa_norm": ("nazwa",),
+        "adres_norm": ("ulica", "miejscowosc"),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rodziny', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rodzina',
+            name='adres_norm',
+            field=models.CharField(blank=True, editable=False, max_length=61),
+        ),
+        migrations.AddField(
+            model_name='rodzina',
+            name='nazwa_norm',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='rodzina',
+            index=models.Index(fields=['nazwa_norm'], name='rodziny_rod_nazwa_n_b04de3_idx'),
+        ),
+        migrations.RunPython(uzupelnij_kolumny_norm, migrations.RunPython.noop),
+    ]
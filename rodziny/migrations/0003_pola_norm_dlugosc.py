@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+def uzupelnij_kolumny_norm(apps, schema_editor):
+    # wartości przycięte do poprzedniej długości kolumn – liczymy od nowa
+    uzupelnij_pola_norm(apps.get_model("rodziny", "Rodzina"), {
+        "nazwa_norm": ("nazwa",),
+        "adres_norm": ("ulica", "miejscowosc"),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rodziny', '0002_rodzina_pola_norm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rodzina',
+            name='adres_norm',
+            field=models.CharField(blank=True, editable=False, max_length=122),
+        ),
+        migrations.AlterField(
+            model_name='rodzina',
+            name='nazwa_norm',
+            field=models.CharField(blank=True, editable=False, max_length=60),
+        ),
+        migrations.RunPython(uzupelnij_kolumny_norm, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,7 @@ from django.urls import reverse
 from django.utils import timezone  # (na razie niewykorzystane, ale zostawiam)
 from osoby.models import Osoba
 from slowniki.models import Duchowny
+from parafia.utils_tekst import ustaw_pola_norm
 
 
 class Rodzina(models.Model):
@@ -24,12 +25,23 @@ class Rodzina(models.Model):
 
     uwagi = models.TextField(blank=True)
 
+    # Kolumny-cienie do wyszukiwania (bez polskich znaków, małymi literami)
+    # (dwa razy dłuższe niż źródła – normalizacja może wydłużyć tekst: ß -> ss)
+    nazwa_norm = models.CharField(max_length=60, blank=True, editable=False)
+    adres_norm = models.CharField(max_length=122, blank=True, editable=False)
+
+    POLA_NORM = {
+        "nazwa_norm": ("nazwa",),
+        "adres_norm": ("ulica", "miejscowosc"),
+    }
+
     class Meta:
         verbose_name = "Rodzina / kartoteka"
         verbose_name_plural = "Rodziny / kartoteki"
         ordering = ["miejscowosc", "ulica", "nr_domu", "nr_mieszkania", "nazwa"]
         indexes = [
             models.Index(fields=["miejscowosc", "ulica", "nr_domu"]),
+            models.Index(fields=["nazwa_norm"]),
         ]
 
     def __str__(self) -> str:
@@ -50,6 +62,12 @@ class Rodzina(models.Model):
 
         return f"{self.nazwa} ({adres})" if adres else self.nazwa
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self, self.POLA_NORM, kwargs.get("update_fields")
+        )
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("rodzina_szczegoly", args=[self.pk])
 
@@ -1,11 +1,15 @@
 # rodziny/tests.py
 from datetime import date
 
+from django.contrib.auth.models import User
 from django.db.utils import IntegrityError
 from django.test import TestCase
+from django.urls import reverse
 
 from osoby.models import Osoba
 from rodziny.models import Rodzina, CzlonkostwoRodziny
+from rodziny.views import czlonkowie_z_sakramentami
+from sakramenty.models import Chrzest, Malzenstwo
 
 
 class RodzinyRelacjeTest(TestCase):
@@ -28,3 +32,66 @@ class RodzinyRelacjeTest(TestCase):
         # Ponowne przypisanie tej samej osoby do tej samej rodziny powinno zostać zablokowane
         with self.assertRaises(IntegrityError):
             CzlonkostwoRodziny.objects.create(rodzina=self.rodzina, osoba=self.osoba)
+
+
+class RodzinaWyszukiwanieTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        self.rodzina = Rodzina.objects.create(nazwa="Żółkiewscy", ulica="Łąkowa", miejscowosc="Kłomnice")
+        Rodzina.objects.create(nazwa="Nowakowie", ulica="Polna", miejscowosc="Mykanów")
+
+    def test_szukanie_bez_polskich_znakow(self):
+        url = reverse("rodzina_lista")
+
+        for fraza in ["zolkiewscy", "ŻÓŁKIEWSCY", "lakowa klomnice"]:
+            resp = self.client.get(url, {"q": fraza})
+            self.assertEqual(list(resp.context["rodziny"]), [self.rodzina], fraza)
+
+
+class RodzinaSakramentyTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        self.rodzina = Rodzina.objects.create(nazwa="Kowalscy")
+        self.maz = Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze="Jan", data_urodzenia=date(1970, 1, 1))
+        self.zona = Osoba.objects.create(nazwisko="Kowalska", imie_pierwsze="Anna", data_urodzenia=date(1972, 2, 2))
+        CzlonkostwoRodziny.objects.create(rodzina=self.rodzina, osoba=self.zona, rola="ZONA")
+        CzlonkostwoRodziny.objects.create(rodzina=self.rodzina, osoba=self.maz, rola="MAZ")
+        for i in range(5):
+            dziecko = Osoba.objects.create(nazwisko="Kowalski", imie_pierwsze=f"Dziecko{i}", data_urodzenia=date(2000 + i, 1, 1))
+            CzlonkostwoRodziny.objects.create(rodzina=self.rodzina, osoba=dziecko, rola="DZIECKO")
+
+        Chrzest.objects.create(rok=1970, akt_nr="1", ochrzczony=self.maz)
+        Malzenstwo.objects.create(rok="1995", akt_nr="1", malzonek_a=self.maz, malzonek_b=self.zona)
+
+    def test_flagi_bez_zapytan_na_osobe(self):
+        # członkostwa + osoby z adnotacjami – niezależnie od liczby członków
+        with self.assertNumQueries(2):
+            wynik = czlonkowie_z_sakramentami(self.rodzina)
+
+        self.assertEqual(len(wynik), 7)
+        self.assertEqual([w["osoba"] for w in wynik[:2]], [self.maz, self.zona])
+        self.assertTrue(wynik[0]["sakramenty"]["chrzest"])
+        self.assertTrue(wynik[0]["sakramenty"]["malzenstwo"])
+        self.assertFalse(wynik[1]["sakramenty"]["chrzest"])
+        self.assertTrue(wynik[1]["sakramenty"]["malzenstwo"])
+        self.assertFalse(wynik[2]["sakramenty"]["malzenstwo"])
+
+    def test_metody_ma_korzystaja_z_adnotacji(self):
+        maz = Osoba.objects.with_sakrament_flags().get(pk=self.maz.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(maz.ma_chrzest())
+            self.assertTrue(maz.ma_malzenstwo())
+            self.assertFalse(maz.ma_komunie())
+            self.assertFalse(maz.ma_zgon())
+
+        # bez adnotacji – zwykłe zapytanie
+        self.assertTrue(Osoba.objects.get(pk=self.maz.pk).ma_chrzest())
+
+    def test_szczegoly_rodziny(self):
+        resp = self.client.get(reverse("rodzina_szczegoly", args=[self.rodzina.pk]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context["czlonkowie_posortowani"]), 7)
@@ -2,7 +2,7 @@
 from django.conf import settings  # (obecnie niewykorzystywane, ale zostawiam jeśli planujesz użyć)
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.db.models.deletion import ProtectedError
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse_lazy
@@ -18,20 +18,15 @@ from django.views.generic import (
 )
 
 from parafia.utils_pdf import render_to_pdf
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import normalizuj
 
 # Importy ról / logowania akcji
 from konta.mixins import RolaWymaganaMixin
 from konta.models import Rola
 from konta.utils import zapisz_log
 
-from sakramenty.models import (
-    Chrzest,
-    PierwszaKomunia,
-    Bierzmowanie,
-    Malzenstwo,
-    NamaszczenieChorych,
-    Zgon,
-)
+from osoby.models import Osoba
 from .forms import RodzinaForm, DodajCzlonkaForm, WizytaForm
 from .models import Rodzina, CzlonkostwoRodziny, WizytaDuszpasterska
 
@@ -40,7 +35,53 @@ from .models import Rodzina, CzlonkostwoRodziny, WizytaDuszpasterska
 # LISTA / SZCZEGÓŁY RODZINY
 # =============================================================================
 
-class RodzinaListaView(LoginRequiredMixin, ListView):
+# priorytet ról do sortowania członków rodziny
+PRIORYTET_ROLI = {
+    "MAZ": 1,
+    "ZONA": 2,
+    "DZIECKO": 3,
+    "INNA": 4,
+}
+
+
+def czlonkowie_z_sakramentami(rodzina: Rodzina) -> list[dict]:
+    """
+    Członkowie rodziny (posortowani wg roli) z informacją o sakramentach.
+    Flagi sakramentów przychodzą jako adnotacje EXISTS – całość to
+    2 zapytania niezależnie od liczby członków.
+    """
+    czlonkowie = (
+        CzlonkostwoRodziny.objects
+        .filter(rodzina=rodzina)
+        .prefetch_related(
+            Prefetch("osoba", queryset=Osoba.objects.with_sakrament_flags())
+        )
+    )
+
+    def kolejnosc(czlonkostwo: CzlonkostwoRodziny) -> int:
+        return PRIORYTET_ROLI.get(czlonkostwo.rola, 99)
+
+    wynik = []
+    for wpis in sorted(czlonkowie, key=kolejnosc):
+        osoba = wpis.osoba
+        wynik.append({
+            "relacja": wpis,
+            "osoba": osoba,
+            "rola_display": wpis.get_rola_display(),
+            "status_display": wpis.get_status_display() if wpis.status else "",
+            "sakramenty": {
+                "chrzest": osoba.flaga_chrzest,
+                "komunia": osoba.flaga_komunia,
+                "bierzmowanie": osoba.flaga_bierzmowanie,
+                "malzenstwo": osoba.flaga_malzenstwo,
+                "namaszczenie": osoba.flaga_namaszczenie,
+                "zgon": osoba.flaga_zgon,
+            },
+        })
+    return wynik
+
+
+class RodzinaListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     """
     Lista rodzin / kartotek z prostą wyszukiwarką (po nazwie i adresie).
     """
@@ -48,6 +89,7 @@ class RodzinaListaView(LoginRequiredMixin, ListView):
     template_name = "rodziny/lista.html"
     context_object_name = "rodziny"
     paginate_by = 20
+    klucz_stronicowania = ("nazwa", "miejscowosc", "ulica", "nr_domu", "nr_mieszkania", "pk")
 
     def get_queryset(self):
         qs = Rodzina.objects.all()
@@ -55,10 +97,10 @@ class RodzinaListaView(LoginRequiredMixin, ListView):
 
         if q:
             for slowo in q.split():
+                slowo_norm = normalizuj(slowo)
                 qs = qs.filter(
-                    Q(nazwa__icontains=slowo) |
-                    Q(ulica__icontains=slowo) |
-                    Q(miejscowosc__icontains=slowo)
+                    Q(nazwa_norm__contains=slowo_norm) |
+                    Q(adres_norm__contains=slowo_norm)
                 )
 
         return qs.order_by(
@@ -80,58 +122,7 @@ class RodzinaSzczegolyView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        rodzina = self.object
-
-        # członkowie rodziny
-        czlonkowie = (
-            CzlonkostwoRodziny.objects
-            .select_related("osoba")
-            .filter(rodzina=rodzina)
-        )
-
-        # priorytet ról do sortowania
-        PRIORYTET_ROLI = {
-            "MAZ": 1,
-            "ZONA": 2,
-            "DZIECKO": 3,
-            "INNA": 4,
-        }
-
-        def kolejnosc(czlonkostwo: CzlonkostwoRodziny) -> int:
-            return PRIORYTET_ROLI.get(czlonkostwo.rola, 99)
-
-        posortowani = sorted(czlonkowie, key=kolejnosc)
-
-        # budujemy listę zawierającą też info o sakramentach
-        wynik = []
-        for wpis in posortowani:
-            osoba = wpis.osoba
-
-            ma_chrzest = Chrzest.objects.filter(ochrzczony=osoba).exists()
-            ma_komunia = PierwszaKomunia.objects.filter(osoba=osoba).exists()
-            ma_bierzmowanie = Bierzmowanie.objects.filter(osoba=osoba).exists()
-            ma_malzenstwo = Malzenstwo.objects.filter(
-                Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
-            ).exists()
-            ma_namaszczenie = NamaszczenieChorych.objects.filter(osoba=osoba).exists()
-            ma_zgon = Zgon.objects.filter(osoba=osoba).exists()
-
-            wynik.append({
-                "relacja": wpis,
-                "osoba": osoba,
-                "rola_display": wpis.get_rola_display(),
-                "status_display": wpis.get_status_display() if wpis.status else "",
-                "sakramenty": {
-                    "chrzest": ma_chrzest,
-                    "komunia": ma_komunia,
-                    "bierzmowanie": ma_bierzmowanie,
-                    "malzenstwo": ma_malzenstwo,
-                    "namaszczenie": ma_namaszczenie,
-                    "zgon": ma_zgon,
-                },
-            })
-
-        ctx["czlonkowie_posortowani"] = wynik
+        ctx["czlonkowie_posortowani"] = czlonkowie_z_sakramentami(self.object)
         return ctx
 
 
@@ -242,35 +233,7 @@ class RodzinaPDFView(LoginRequiredMixin, View):
         rodzina = get_object_or_404(Rodzina, pk=kwargs["pk"])
 
         # --- 1. Członkowie rodziny ---
-        czlonkowie = (
-            CzlonkostwoRodziny.objects
-            .select_related("osoba")
-            .filter(rodzina=rodzina)
-        )
-
-        PRIORYTET_ROLI = {"MAZ": 1, "ZONA": 2, "DZIECKO": 3, "INNA": 4}
-        posortowani = sorted(
-            czlonkowie,
-            key=lambda cz: PRIORYTET_ROLI.get(cz.rola, 99),
-        )
-
-        wynik_czlonkowie = []
-        for wpis in posortowani:
-            osoba = wpis.osoba
-            wynik_czlonkowie.append({
-                "relacja": wpis,
-                "osoba": osoba,
-                "sakramenty": {
-                    "chrzest": Chrzest.objects.filter(ochrzczony=osoba).exists(),
-                    "komunia": PierwszaKomunia.objects.filter(osoba=osoba).exists(),
-                    "bierzmowanie": Bierzmowanie.objects.filter(osoba=osoba).exists(),
-                    "malzenstwo": Malzenstwo.objects.filter(
-                        Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
-                    ).exists(),
-                    "namaszczenie": NamaszczenieChorych.objects.filter(osoba=osoba).exists(),
-                    "zgon": Zgon.objects.filter(osoba=osoba).exists(),
-                },
-            })
+        wynik_czlonkowie = czlonkowie_z_sakramentami(rodzina)
 
         # --- 2. Wizyty duszpasterskie (najnowsze na górze) ---
         wizyty = (
@@ -305,44 +268,7 @@ class RodzinaDrukView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        rodzina = self.object
-
-        czlonkowie = (
-            CzlonkostwoRodziny.objects
-            .select_related("osoba")
-            .filter(rodzina=rodzina)
-        )
-
-        PRIORYTET_ROLI = {"MAZ": 1, "ZONA": 2, "DZIECKO": 3, "INNA": 4}
-
-        def kolejnosc(cz):
-            return PRIORYTET_ROLI.get(cz.rola, 99)
-
-        posortowani = sorted(czlonkowie, key=kolejnosc)
-
-        wynik = []
-        for wpis in posortowani:
-            osoba = wpis.osoba
-
-            ma_chrzest = Chrzest.objects.filter(ochrzczony=osoba).exists()
-            ma_komunia = PierwszaKomunia.objects.filter(osoba=osoba).exists()
-            ma_bierzmowanie = Bierzmowanie.objects.filter(osoba=osoba).exists()
-            ma_malzenstwo = Malzenstwo.objects.filter(
-                Q(malzonek_a=osoba) | Q(malzonek_b=osoba)
-            ).exists()
-
-            wynik.append({
-                "relacja": wpis,
-                "osoba": osoba,
-                "sakramenty": {
-                    "chrzest": ma_chrzest,
-                    "komunia": ma_komunia,
-                    "bierzmowanie": ma_bierzmowanie,
-                    "malzenstwo": ma_malzenstwo,
-                },
-            })
-
-        ctx["czlonkowie_posortowani"] = wynik
+        ctx["czlonkowie_posortowani"] = czlonkowie_z_sakramentami(self.object)
         ctx["today"] = timezone.localdate()
         return ctx
 
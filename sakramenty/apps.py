@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
 
 class SakramentyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sakramenty'
+
+    def ready(self):
+        from parafia.utils_sql import zarejestruj_kolacje_pl
+
+        # polska kolacja dla SQLite (skorowidze ksiąg)
+        connection_created.connect(zarejestruj_kolacje_pl, dispatch_uid="kolacja_pl")
+        # unieważnianie skorowidzów po zmianach aktów i osób
+        from . import signals  # noqa: F401
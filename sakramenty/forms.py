@@ -2,8 +2,9 @@
 from django.utils import timezone
 from django import forms
 from django.db import transaction   
-from .models import Chrzest, PierwszaKomunia, Bierzmowanie, Malzenstwo, NamaszczenieChorych, Zgon
+from .models import Chrzest, PierwszaKomunia, Bierzmowanie, Malzenstwo, NamaszczenieChorych, Zgon, WydrukKsiegi, Ksiega
 from osoby.models import Osoba
+from osoby.forms import OsobaAutocompleteWidget, etykieta_osoby
 from slowniki.models import Parafia, Duchowny 
 from django.db.models import Q, Max
 
@@ -28,17 +29,12 @@ class DateInput(forms.DateInput):
 # === SPECJALNE POLE LISTY (Z DATĄ URODZENIA) ===
 # =============================================================================
 class OsobaChoiceField(forms.ModelChoiceField):
+    # Opcje dociąga Tom Select z endpointu podpowiedzi – nie renderujemy całej parafii
+    widget = OsobaAutocompleteWidget
+
     def label_from_instance(self, obj):
-        # Etykieta: "Kowalski Jan (ur. 1990-01-01, s. Adama)"
-        opis = f"{obj.nazwisko} {obj.imie_pierwsze}"
-        szczegoly = []
-        
-        if obj.data_urodzenia:
-            szczegoly.append(f"ur. {obj.data_urodzenia}")
-             
-        if szczegoly:
-            opis += f" ({', '.join(szczegoly)})"
-        return opis
+        # ta sama etykieta co w podpowiedziach (osoby/forms.py)
+        return etykieta_osoby(obj)
 
 # =============================================================================
 # === POMOCNICZA FUNKCJA WALIDACJI NUMERACJI ===
@@ -46,16 +42,16 @@ class OsobaChoiceField(forms.ModelChoiceField):
 def ustal_numer_aktu(model_class, rok, podany_nr, instance_pk=None):
     """
     Zwraca: (czy_sukces, wynik_lub_blad)
+
+    Numer ręczny – sprawdzamy tylko, czy nie jest zajęty. Brak numeru
+    zwraca pusty wynik: numer nada licznik księgi przy zapisie
+    (NumeracjaAktowMixin w models.py), w tej samej transakcji co wpis.
     """
     if not rok:
         return False, "Brak roku - nie można zweryfikować numeru aktu."
 
     if podany_nr:
         # A) RĘCZNY: Sprawdzamy czy numer nie jest zajęty
-        # Opcjonalnie: sprawdzamy czy to cyfra (jeśli wymagasz tylko cyfr)
-        # if not str(podany_nr).isdigit():
-        #      return False, "Numer aktu może składać się tylko z cyfr."
-        
         qs = model_class.objects.filter(rok=rok, akt_nr=podany_nr)
         if instance_pk:
             qs = qs.exclude(pk=instance_pk)
@@ -65,15 +61,8 @@ def ustal_numer_aktu(model_class, rok, podany_nr, instance_pk=None):
         
         return True, podany_nr
     else:
-        # B) AUTOMAT: Szukamy najwyższego numeru i dodajemy 1
-        istniejace = model_class.objects.filter(rok=rok).values_list('akt_nr', flat=True)
-        max_nr = 0
-        for numer_str in istniejace:
-            if numer_str and numer_str.isdigit():
-                n = int(numer_str)
-                if n > max_nr:
-                    max_nr = n
-        return True, str(max_nr + 1)
+        # B) AUTOMAT: numer z licznika przy zapisie
+        return True, ""
 
 
 # =============================================================================
@@ -83,7 +72,7 @@ class ChrzestForm(BootstrapFormMixin, forms.ModelForm):
     ochrzczony = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by('nazwisko', 'imie_pierwsze'),
         label="Osoba ochrzczona",
-        widget=forms.Select(attrs={'class': 'form-select'})
+        widget=OsobaAutocompleteWidget(attrs={'class': 'form-select'})
     )
     class Meta:
         model = Chrzest
@@ -233,7 +222,7 @@ class PierwszaKomuniaForm(BootstrapFormMixin, forms.ModelForm):
     osoba = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by('nazwisko', 'imie_pierwsze'),
         label="Osoba",
-        widget=forms.Select(attrs={'class': 'form-select'})
+        widget=OsobaAutocompleteWidget(attrs={'class': 'form-select'})
     )
     class Meta:
         model = PierwszaKomunia
@@ -301,7 +290,7 @@ class BierzmowanieForm(BootstrapFormMixin, forms.ModelForm):
     osoba = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by('nazwisko', 'imie_pierwsze'),
         label="Kandydat do bierzmowania",
-        widget=forms.Select(attrs={'class': 'form-select'})
+        widget=OsobaAutocompleteWidget(attrs={'class': 'form-select'})
     )
     
     szafarz = forms.ModelChoiceField(
@@ -485,12 +474,12 @@ class MalzenstwoForm(BootstrapFormMixin, forms.ModelForm):
     malzonek_a = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by("nazwisko", "imie_pierwsze"),
         label="Małżonek A (mąż)",
-        widget=forms.Select(attrs={"class": "form-select js-tom-osoba"}),
+        widget=OsobaAutocompleteWidget(attrs={"class": "form-select js-tom-osoba"}),
     )
     malzonek_b = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by("nazwisko", "imie_pierwsze"),
         label="Małżonek B (żona)",
-        widget=forms.Select(attrs={"class": "form-select js-tom-osoba"}),
+        widget=OsobaAutocompleteWidget(attrs={"class": "form-select js-tom-osoba"}),
     )
 
     parafia = forms.ModelChoiceField(
@@ -670,7 +659,7 @@ class NamaszczenieChorychForm(BootstrapFormMixin, forms.ModelForm):
     osoba = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by("nazwisko", "imie_pierwsze"),
         label="Chory / osoba",
-        widget=forms.Select(attrs={"class": "js-osoba-select form-select"}),
+        widget=OsobaAutocompleteWidget(attrs={"class": "js-osoba-select form-select"}),
     )
 
     szafarz = forms.ModelChoiceField(
@@ -744,7 +733,7 @@ class ZgonForm(BootstrapFormMixin, forms.ModelForm):
     osoba = OsobaChoiceField(
         queryset=Osoba.objects.all().order_by('nazwisko'),
         label="Osoba zmarła",
-        widget=forms.Select(attrs={'class': 'form-select'})
+        widget=OsobaAutocompleteWidget(attrs={'class': 'form-select'})
     )
 
     class Meta:
@@ -868,4 +857,26 @@ class ZgonForm(BootstrapFormMixin, forms.ModelForm):
 
         if commit:
             instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+# =============================================================================
+# === KSIĘGA ROCZNA (wydruk w tle) ===
+# =============================================================================
+class WydrukKsiegiForm(BootstrapFormMixin, forms.ModelForm):
+    class Meta:
+        model = WydrukKsiegi
+        fields = ["ksiega", "rok"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["ksiega"].widget.attrs["class"] = "form-select"
+        self.fields["rok"].widget.attrs.update({"min": 1800, "max": 2200})
+
+
+class SkorowidzForm(BootstrapFormMixin, forms.Form):
+    ksiega = forms.ChoiceField(label="Księga", choices=Ksiega.choices)
+    rok = forms.IntegerField(label="Rok", min_value=1800, max_value=2200)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["ksiega"].widget.attrs["class"] = "form-select"
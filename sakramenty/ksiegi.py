@@ -0,0 +1,226 @@
+# sakramenty/ksiegi.py
+"""
+Księga roczna – cały rocznik księgi (chrztów, bierzmowanych, małżeństw,
+zmarłych) jako jeden PDF.
+
+Rocznik może mieć kilkaset aktów, więc PDF nigdy nie powstaje w żądaniu
+HTTP: widok zapisuje zlecenie (WydrukKsiegi), a komenda
+`manage.py generuj_ksiegi` pobiera zlecenia z kolejki i renderuje je
+sekcjami po ROZMIAR_SEKCJI aktów (parafia/utils_pdf.pdf_z_sekcji – każda
+sekcja od razu trafia do pliku tymczasowego, pliki są na końcu scalane),
+zapisując postęp po każdej sekcji. Gotowy plik trafia do MEDIA
+i można go pobrać później.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import islice
+from typing import Callable
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from parafia.utils_pdf import pdf_z_sekcji
+
+from .models import Bierzmowanie, Chrzest, Ksiega, Malzenstwo, StatusWydruku, WydrukKsiegi, Zgon
+
+logger = logging.getLogger(__name__)
+
+SZABLON_PDF = "sakramenty/druki/ksiega_roku_pdf.html"
+ROZMIAR_SEKCJI = 100
+# zlecenie "w toku" dłużej niż to uznajemy za porzucone (np. restart procesu)
+MAKS_CZAS_GENEROWANIA = timedelta(hours=1)
+
+
+def _osoba(osoba) -> str:
+    return f"{osoba.nazwisko} {osoba.imie_pierwsze}" if osoba else ""
+
+
+def _data(dzien) -> str:
+    return f"{dzien:%d.%m.%Y}" if dzien else ""
+
+
+def _wiersz_chrztu(c: Chrzest) -> list[str]:
+    matka = c.matka
+    if c.nazwisko_matki_rodowe:
+        matka = f"{matka} z d. {c.nazwisko_matki_rodowe}"
+    return [
+        _osoba(c.ochrzczony),
+        _data(c.data_urodzenia or c.ochrzczony.data_urodzenia) or str(c.rok_urodzenia or ""),
+        _data(c.data_chrztu) or str(c.rok_chrztu or ""),
+        " / ".join(r for r in (c.ojciec, matka) if r),
+        c.parafia.nazwa if c.parafia else c.miejsce_chrztu,
+    ]
+
+
+def _wiersz_bierzmowania(b: Bierzmowanie) -> list[str]:
+    return [
+        _osoba(b.osoba),
+        b.imie_bierzmowania,
+        _data(b.data_bierzmowania),
+        b.swiadek,
+        str(b.szafarz) if b.szafarz else b.szafarz_opis_reczny,
+    ]
+
+
+def _wiersz_malzenstwa(m: Malzenstwo) -> list[str]:
+    return [
+        _osoba(m.malzonek_a),
+        _osoba(m.malzonek_b),
+        _data(m.data_slubu),
+        " / ".join(s for s in (m.swiadek_a, m.swiadek_b) if s),
+        m.parafia.nazwa if m.parafia else m.parafia_opis_reczny,
+    ]
+
+
+def _wiersz_zgonu(z: Zgon) -> list[str]:
+    return [
+        _osoba(z.osoba),
+        _data(z.data_zgonu),
+        z.miejsce_zgonu,
+        _data(z.data_pogrzebu),
+        z.cmentarz,
+    ]
+
+
+@dataclass(frozen=True)
+class OpisKsiegi:
+    model: type
+    tytul: str
+    kolumny: tuple[str, ...]      # bez kolumny z numerem aktu
+    powiazane: tuple[str, ...]    # select_related
+    wiersz: Callable[..., list[str]]
+
+
+KSIEGI = {
+    Ksiega.CHRZEST: OpisKsiegi(
+        Chrzest, "Księga Ochrzczonych",
+        ("Ochrzczony", "Urodzony", "Data chrztu", "Rodzice", "Parafia / miejsce"),
+        ("ochrzczony", "parafia"), _wiersz_chrztu,
+    ),
+    Ksiega.BIERZMOWANIE: OpisKsiegi(
+        Bierzmowanie, "Księga Bierzmowanych",
+        ("Bierzmowany", "Imię z bierzmowania", "Data", "Świadek", "Szafarz"),
+        ("osoba", "szafarz"), _wiersz_bierzmowania,
+    ),
+    Ksiega.MALZENSTWO: OpisKsiegi(
+        Malzenstwo, "Księga Małżeństw",
+        ("Małżonek", "Małżonka", "Data ślubu", "Świadkowie", "Parafia"),
+        ("malzonek_a", "malzonek_b", "parafia"), _wiersz_malzenstwa,
+    ),
+    Ksiega.ZGON: OpisKsiegi(
+        Zgon, "Księga Zmarłych",
+        ("Zmarły", "Data zgonu", "Miejsce zgonu", "Data pogrzebu", "Cmentarz"),
+        ("osoba",), _wiersz_zgonu,
+    ),
+}
+
+
+def akty_roku(ksiega: str, rok: int):
+    """Akty rocznika w kolejności numerów ("2" przed "10")."""
+    opis = KSIEGI[ksiega]
+    return (
+        opis.model.objects.filter(rok=rok)
+        .select_related(*opis.powiazane)
+        .order_by(Length("akt_nr"), "akt_nr", "pk")
+    )
+
+
+# =============================================================================
+#  KOLEJKA
+# =============================================================================
+def zlec_wydruk(ksiega: str, rok: int, uzytkownik=None) -> tuple[WydrukKsiegi, bool]:
+    """(zlecenie, czy_nowe) – ten sam rocznik nie trafia do kolejki dwa razy."""
+    zlecenie = WydrukKsiegi.objects.filter(
+        ksiega=ksiega,
+        rok=rok,
+        status__in=[StatusWydruku.OCZEKUJE, StatusWydruku.W_TOKU],
+    ).first()
+    if zlecenie:
+        return zlecenie, False
+    return WydrukKsiegi.objects.create(ksiega=ksiega, rok=rok, zlecil=uzytkownik), True
+
+
+def _do_wykonania(teraz) -> Q:
+    """Oczekujące oraz porzucone w trakcie generowania."""
+    return Q(status=StatusWydruku.OCZEKUJE) | Q(
+        status=StatusWydruku.W_TOKU, rozpoczeto__lt=teraz - MAKS_CZAS_GENEROWANIA
+    )
+
+
+def _przejmij(zlecenie: WydrukKsiegi) -> bool:
+    """Warunkowe UPDATE – zlecenie dostaje tylko jeden proces."""
+    teraz = timezone.now()
+    przejete = WydrukKsiegi.objects.filter(_do_wykonania(teraz), pk=zlecenie.pk).update(
+        status=StatusWydruku.W_TOKU, rozpoczeto=teraz, wykonano=0, blad=""
+    )
+    return bool(przejete)
+
+
+def _sekcje(zlecenie: WydrukKsiegi, akty):
+    """Konteksty sekcji; przed każdą kolejną zapisuje postęp poprzednich."""
+    opis = KSIEGI[zlecenie.ksiega]
+    czesci = max(1, -(-zlecenie.razem // ROZMIAR_SEKCJI))
+    wiersze = (
+        {"akt": f"{a.rok}/{a.akt_nr}", "pola": opis.wiersz(a)}
+        for a in akty.iterator(chunk_size=ROZMIAR_SEKCJI)
+    )
+    for czesc in range(1, czesci + 1):
+        wykonano = (czesc - 1) * ROZMIAR_SEKCJI
+        if wykonano:
+            WydrukKsiegi.objects.filter(pk=zlecenie.pk).update(wykonano=wykonano)
+        yield {
+            "wiersze": list(islice(wiersze, ROZMIAR_SEKCJI)),
+            "lp_od": wykonano,
+            "czesc": czesc,
+            "czesci": czesci,
+        }
+
+
+def generuj_wydruk(zlecenie: WydrukKsiegi) -> None:
+    """Renderuje przejęte zlecenie i zapisuje PDF (albo opis błędu)."""
+    opis = KSIEGI[zlecenie.ksiega]
+    akty = akty_roku(zlecenie.ksiega, zlecenie.rok)
+    zlecenie.razem = akty.count()
+    WydrukKsiegi.objects.filter(pk=zlecenie.pk).update(razem=zlecenie.razem)
+
+    try:
+        pdf = pdf_z_sekcji(SZABLON_PDF, _sekcje(zlecenie, akty), {
+            "tytul": opis.tytul,
+            "kolumny": opis.kolumny,
+            "rok": zlecenie.rok,
+            "razem": zlecenie.razem,
+            "today": timezone.now(),
+        })
+        # błąd zapisu pliku (np. brak miejsca) też kończy zlecenie jako BLAD –
+        # inaczej zostałoby W_TOKU i po godzinie wróciło do kolejki
+        # nazwę pliku nadaje sciezka_wydruku (losowa, magazyn prywatny)
+        zlecenie.plik.save("ksiega.pdf", ContentFile(pdf), save=False)
+    except Exception as e:
+        logger.exception("Wydruk księgi %s nie powiódł się", zlecenie.pk)
+        zlecenie.status = StatusWydruku.BLAD
+        zlecenie.blad = str(e)
+        zlecenie.zakonczono = timezone.now()
+        zlecenie.save(update_fields=["status", "blad", "zakonczono"])
+        return
+
+    zlecenie.status = StatusWydruku.GOTOWY
+    zlecenie.wykonano = zlecenie.razem
+    zlecenie.zakonczono = timezone.now()
+    zlecenie.save(update_fields=["plik", "status", "wykonano", "razem", "zakonczono"])
+
+
+def przetworz_kolejke(limit: int | None = None) -> int:
+    """Generuje oczekujące zlecenia (najstarsze pierwsze); zwraca liczbę wykonanych."""
+    wykonane = 0
+    kolejka = WydrukKsiegi.objects.filter(_do_wykonania(timezone.now())).order_by("utworzono", "pk")
+    for zlecenie in kolejka[:limit] if limit else kolejka:
+        if not _przejmij(zlecenie):
+            continue  # wziął je inny proces
+        generuj_wydruk(zlecenie)
+        wykonane += 1
+    return wykonane
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sakramenty.ksiegi import przetworz_kolejke
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje zlecone wydruki ksiąg rocznych (PDF) w tle. Domyślnie działa "
+        "w pętli i co --przerwa sekund sprawdza kolejkę; z --raz obsługuje "
+        "oczekujące zlecenia i kończy pracę (np. z crona)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--raz", action="store_true", help="Obsłuż kolejkę jeden raz i zakończ.")
+        parser.add_argument("--przerwa", type=int, default=10, help="Sekundy między sprawdzeniami kolejki.")
+
+    def handle(self, *args, **options):
+        while True:
+            wykonane = przetworz_kolejke()
+            if wykonane:
+                self.stdout.write(self.style.SUCCESS(f"Wygenerowano wydruków: {wykonane}"))
+            if options["raz"]:
+                return
+            time.sleep(options["przerwa"])
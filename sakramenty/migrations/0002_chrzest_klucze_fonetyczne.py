@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import klucz_fonetyczny, klucz_fonetyczny_nazwiska, uzupelnij_pola_norm
+
+
+def uzupelnij_klucze(apps, schema_editor):
+    Chrzest = apps.get_model("sakramenty", "Chrzest")
+    uzupelnij_pola_norm(
+        Chrzest,
+        {"ojciec_fonet": ("ojciec",), "matka_fonet": ("matka",)},
+        funkcja=klucz_fonetyczny_nazwiska,
+    )
+    uzupelnij_pola_norm(
+        Chrzest,
+        {"nazwisko_matki_rodowe_fonet": ("nazwisko_matki_rodowe",)},
+        funkcja=klucz_fonetyczny,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osoby', '0004_osoba_klucze_fonetyczne'),
+        ('sakramenty', '0001_initial'),
+        ('slowniki', '0002_pola_norm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chrzest',
+            name='matka_fonet',
+            field=models.CharField(blank=True, editable=False, max_length=6),
+        ),
+        migrations.AddField(
+            model_name='chrzest',
+            name='nazwisko_matki_rodowe_fonet',
+            field=models.CharField(blank=True, editable=False, max_length=6),
+        ),
+        migrations.AddField(
+            model_name='chrzest',
+            name='ojciec_fonet',
+            field=models.CharField(blank=True, editable=False, max_length=6),
+        ),
+        migrations.AddIndex(
+            model_name='chrzest',
+            index=models.Index(fields=['ojciec_fonet'], name='sakramenty__ojciec__261f6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chrzest',
+            index=models.Index(fields=['matka_fonet'], name='sakramenty__matka_f_3b4e11_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chrzest',
+            index=models.Index(fields=['nazwisko_matki_rodowe_fonet'], name='sakramenty__nazwisk_78e19f_idx'),
+        ),
+        migrations.RunPython(uzupelnij_klucze, migrations.RunPython.noop),
+    ]
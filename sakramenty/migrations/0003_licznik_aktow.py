@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+KSIEGI = {
+    'CHRZEST': 'Chrzest',
+    'BIERZMOWANIE': 'Bierzmowanie',
+    'MALZENSTWO': 'Malzenstwo',
+    'ZGON': 'Zgon',
+}
+
+
+def uzgodnij_liczniki(apps, schema_editor):
+    """Licznik każdej księgi i roku = najwyższy numer aktu już wpisany."""
+    LicznikAktow = apps.get_model('sakramenty', 'LicznikAktow')
+    liczniki = []
+    for ksiega, nazwa_modelu in KSIEGI.items():
+        Model = apps.get_model('sakramenty', nazwa_modelu)
+        najwyzsze = defaultdict(int)
+        for rok, akt_nr in Model.objects.values_list('rok', 'akt_nr').iterator():
+            try:
+                rok = int(str(rok).strip())
+            except (TypeError, ValueError):
+                continue
+            numer = int(akt_nr) if akt_nr and akt_nr.isdigit() else 0
+            najwyzsze[rok] = max(najwyzsze[rok], numer)
+        liczniki.extend(
+            LicznikAktow(ksiega=ksiega, rok=rok, ostatni_nr=nr) for rok, nr in najwyzsze.items()
+        )
+    LicznikAktow.objects.bulk_create(liczniki, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sakramenty', '0002_chrzest_klucze_fonetyczne'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicznikAktow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ksiega', models.CharField(choices=[('CHRZEST', 'Księga chrztów'), ('BIERZMOWANIE', 'Księga bierzmowanych'), ('MALZENSTWO', 'Księga małżeństw'), ('ZGON', 'Księga zmarłych')], max_length=20, verbose_name='Księga')),
+                ('rok', models.PositiveIntegerField(verbose_name='Rok')),
+                ('ostatni_nr', models.PositiveIntegerField(default=0, verbose_name='Ostatni numer aktu')),
+            ],
+            options={
+                'verbose_name': 'Licznik aktów',
+                'verbose_name_plural': 'Liczniki aktów',
+                'constraints': [models.UniqueConstraint(fields=('ksiega', 'rok'), name='unique_licznik_aktow')],
+            },
+        ),
+        migrations.RunPython(uzgodnij_liczniki, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sakramenty', '0003_licznik_aktow'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WydrukKsiegi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ksiega', models.CharField(choices=[('CHRZEST', 'Księga chrztów'), ('BIERZMOWANIE', 'Księga bierzmowanych'), ('MALZENSTWO', 'Księga małżeństw'), ('ZGON', 'Księga zmarłych')], max_length=20, verbose_name='Księga')),
+                ('rok', models.PositiveIntegerField(verbose_name='Rok')),
+                ('status', models.CharField(choices=[('OCZEKUJE', 'W kolejce'), ('W_TOKU', 'Generowanie'), ('GOTOWY', 'Gotowy'), ('BLAD', 'Błąd')], default='OCZEKUJE', max_length=10, verbose_name='Status')),
+                ('wykonano', models.PositiveIntegerField(default=0, verbose_name='Wydrukowane akty')),
+                ('razem', models.PositiveIntegerField(default=0, verbose_name='Akty w roczniku')),
+                ('plik', models.FileField(blank=True, upload_to='ksiegi/', verbose_name='Plik PDF')),
+                ('blad', models.TextField(blank=True, verbose_name='Opis błędu')),
+                ('utworzono', models.DateTimeField(auto_now_add=True, verbose_name='Zlecono')),
+                ('rozpoczeto', models.DateTimeField(blank=True, null=True, verbose_name='Rozpoczęto')),
+                ('zakonczono', models.DateTimeField(blank=True, null=True, verbose_name='Zakończono')),
+                ('zlecil', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='wydruki_ksiag', to=settings.AUTH_USER_MODEL, verbose_name='Zlecił')),
+            ],
+            options={
+                'verbose_name': 'Wydruk księgi',
+                'verbose_name_plural': 'Wydruki ksiąg',
+                'ordering': ['-utworzono'],
+                'indexes': [models.Index(fields=['status', 'utworzono'], name='sakramenty__status_2de662_idx')],
+            },
+        ),
+    ]
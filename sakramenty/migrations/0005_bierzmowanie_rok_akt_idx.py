@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sakramenty', '0004_wydruk_ksiegi'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bierzmowanie',
+            index=models.Index(fields=['rok', 'akt_nr'], name='bierzmowanie_rok_akt_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+import parafia.utils_pliki
+import sakramenty.models
+from parafia.utils_pliki import magazyn_prywatny, nazwa_losowa
+
+
+def przenies_wydruki(apps, schema_editor):
+    # gotowe wydruki z publicznego MEDIA do magazynu prywatnego, pod losową nazwą
+    WydrukKsiegi = apps.get_model("sakramenty", "WydrukKsiegi")
+    for zlecenie in WydrukKsiegi.objects.exclude(plik="").iterator():
+        stara = zlecenie.plik.name
+        if not default_storage.exists(stara):
+            continue
+        with default_storage.open(stara, "rb") as plik:
+            zlecenie.plik.name = magazyn_prywatny.save(nazwa_losowa("ksiegi", ".pdf"), plik)
+        zlecenie.save(update_fields=["plik"])
+        default_storage.delete(stara)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sakramenty', '0005_bierzmowanie_rok_akt_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='wydrukksiegi',
+            name='plik',
+            field=models.FileField(blank=True, storage=parafia.utils_pliki.MagazynPrywatny(), upload_to=sakramenty.models.sciezka_wydruku, verbose_name='Plik PDF'),
+        ),
+        migrations.RunPython(przenies_wydruki, migrations.RunPython.noop),
+    ]
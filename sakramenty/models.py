@@ -1,10 +1,119 @@
 # sakramenty/models.py
-from django.db import models
+from django.contrib.auth.models import User
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.urls import reverse
 
 from osoby.models import Osoba
 from slowniki.models import Parafia, Duchowny, Wyznanie
 from cmentarz.models import Grob
+from parafia.utils_pliki import magazyn_prywatny, nazwa_losowa
+from parafia.utils_tekst import klucz_fonetyczny, klucz_fonetyczny_nazwiska, ustaw_pola_norm
+
+
+# =============================================================================
+#  NUMERACJA AKTÓW (licznik na księgę i rok)
+# =============================================================================
+class Ksiega(models.TextChoices):
+    CHRZEST = "CHRZEST", "Księga chrztów"
+    BIERZMOWANIE = "BIERZMOWANIE", "Księga bierzmowanych"
+    MALZENSTWO = "MALZENSTWO", "Księga małżeństw"
+    ZGON = "ZGON", "Księga zmarłych"
+
+
+class LicznikAktow(models.Model):
+    """
+    Ostatni nadany numer aktu w danej księdze i roku.
+
+    Kolejny numer to jedno UPDATE … SET ostatni_nr = ostatni_nr + 1 w transakcji
+    zapisu aktu – równoległe zapisy czekają na blokadę wiersza, więc nie mogą
+    dostać tego samego numeru. Numery wpisane ręcznie podnoszą licznik
+    (nigdy go nie cofają).
+    """
+
+    ksiega = models.CharField("Księga", max_length=20, choices=Ksiega.choices)
+    rok = models.PositiveIntegerField("Rok")
+    ostatni_nr = models.PositiveIntegerField("Ostatni numer aktu", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ksiega", "rok"], name="unique_licznik_aktow"),
+        ]
+        verbose_name = "Licznik aktów"
+        verbose_name_plural = "Liczniki aktów"
+
+    def __str__(self) -> str:
+        return f"{self.get_ksiega_display()} {self.rok}: {self.ostatni_nr}"
+
+
+def najwyzszy_numer(numery) -> int:
+    """Najwyższy liczbowy numer aktu z listy (numery nieliczbowe pomijamy)."""
+    return max((int(n) for n in numery if n and str(n).isdigit()), default=0)
+
+
+def _rok_ksiegi(rok) -> int | None:
+    try:
+        return int(str(rok).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _zaloz_licznik(model_class, ksiega: str, rok: int) -> None:
+    """Pierwszy numer w roku: licznik startuje od najwyższego numeru już w księdze."""
+    numery = model_class.objects.filter(rok=rok).values_list("akt_nr", flat=True)
+    try:
+        with transaction.atomic():
+            LicznikAktow.objects.create(ksiega=ksiega, rok=rok, ostatni_nr=najwyzszy_numer(numery))
+    except IntegrityError:
+        pass  # licznik założył w międzyczasie równoległy zapis
+
+
+def przydziel_numer_aktu(model_class, ksiega: str, rok: int) -> str:
+    """Kolejny wolny numer aktu – wywoływać w transakcji zapisu aktu."""
+    licznik = LicznikAktow.objects.filter(ksiega=ksiega, rok=rok)
+    while True:
+        if not licznik.update(ostatni_nr=F("ostatni_nr") + 1):
+            _zaloz_licznik(model_class, ksiega, rok)
+            continue
+        numer = str(licznik.values_list("ostatni_nr", flat=True).get())
+        # numer mógł zostać zajęty z pominięciem licznika (np. import) – bierzemy kolejny
+        if not model_class.objects.filter(rok=rok, akt_nr=numer).exists():
+            return numer
+
+
+def zarejestruj_numer_aktu(model_class, ksiega: str, rok: int, numer) -> None:
+    """Numer wpisany ręcznie: licznik nie może zostać poniżej niego."""
+    if not str(numer).isdigit():
+        return
+    licznik = LicznikAktow.objects.filter(ksiega=ksiega, rok=rok)
+    if not licznik.update(ostatni_nr=Greatest(F("ostatni_nr"), int(numer))):
+        _zaloz_licznik(model_class, ksiega, rok)
+        licznik.update(ostatni_nr=Greatest(F("ostatni_nr"), int(numer)))
+
+
+class NumeracjaAktowMixin:
+    """
+    Dla modeli z polami `rok` i `akt_nr`: pusty numer aktu jest nadawany
+    z licznika przy zapisie, ręczny – zapamiętywany w liczniku. Licznik
+    i wpis zapisywane są w jednej transakcji (błąd zapisu cofa też licznik).
+    """
+
+    ksiega: str = ""
+
+    def save(self, *args, **kwargs):
+        rok = _rok_ksiegi(self.rok)
+        if rok is None:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            if not self.akt_nr:
+                self.akt_nr = przydziel_numer_aktu(type(self), self.ksiega, rok)
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "akt_nr"}
+            else:
+                zarejestruj_numer_aktu(type(self), self.ksiega, rok, self.akt_nr)
+            return super().save(*args, **kwargs)
 
 
 # =============================================================================
@@ -12,7 +121,7 @@ from cmentarz.models import Grob
 # =============================================================================
 
 
-class Chrzest(models.Model):
+class Chrzest(NumeracjaAktowMixin, models.Model):
     """
     Wpis w księdze chrztów.
 
@@ -20,6 +129,8 @@ class Chrzest(models.Model):
     Dodatkowo rok + numer aktu są unikalne.
     """
 
+    ksiega = Ksiega.CHRZEST
+
     # Identyfikacja w księdze
     rok = models.PositiveIntegerField(
         "Rok",
@@ -120,6 +231,11 @@ class Chrzest(models.Model):
         related_name="matki_przy_chrzcie",
     )
 
+    # Klucze fonetyczne nazwisk rodziców (wyszukiwanie "brzmi jak")
+    ojciec_fonet = models.CharField(max_length=6, blank=True, editable=False)
+    matka_fonet = models.CharField(max_length=6, blank=True, editable=False)
+    nazwisko_matki_rodowe_fonet = models.CharField(max_length=6, blank=True, editable=False)
+
     # Uwagi / załączniki
     uwagi_wew = models.TextField(
         "Uwagi kancelaryjne (wewnętrzne)",
@@ -149,10 +265,31 @@ class Chrzest(models.Model):
         ordering = ["-rok", "akt_nr"]
         # zostawione dla kompatybilności wstecznej (można usunąć po migracjach)
         unique_together = [("rok", "akt_nr")]
+        indexes = [
+            models.Index(fields=["ojciec_fonet"]),
+            models.Index(fields=["matka_fonet"]),
+            models.Index(fields=["nazwisko_matki_rodowe_fonet"]),
+        ]
 
     def __str__(self) -> str:
         return f"Chrzest {self.rok}/{self.akt_nr} – {self.ochrzczony}"
 
+    def save(self, *args, **kwargs):
+        # ojciec / matka to "imię i nazwisko" – klucz liczymy z ostatniego wyrazu
+        update_fields = ustaw_pola_norm(
+            self,
+            {"ojciec_fonet": ("ojciec",), "matka_fonet": ("matka",)},
+            kwargs.get("update_fields"),
+            funkcja=klucz_fonetyczny_nazwiska,
+        )
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self,
+            {"nazwisko_matki_rodowe_fonet": ("nazwisko_matki_rodowe",)},
+            update_fields,
+            funkcja=klucz_fonetyczny,
+        )
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("chrzest_szczegoly", args=[self.pk])
 
@@ -217,11 +354,13 @@ class PierwszaKomunia(models.Model):
 # =============================================================================
 
 
-class Bierzmowanie(models.Model):
+class Bierzmowanie(NumeracjaAktowMixin, models.Model):
     """
     Wpis bierzmowania – jedna osoba może mieć tylko jeden wpis.
     """
 
+    ksiega = Ksiega.BIERZMOWANIE
+
     osoba = models.ForeignKey(
         Osoba,
         on_delete=models.CASCADE,
@@ -317,6 +456,9 @@ class Bierzmowanie(models.Model):
                 name="unique_bierzmowanie_per_osoba",
             ),
         ]
+        # rocznik księgi (skorowidz, wydruk roczny) – pozostałe księgi mają
+        # indeks z ograniczenia unikalności (rok, akt_nr)
+        indexes = [models.Index(fields=["rok", "akt_nr"], name="bierzmowanie_rok_akt_idx")]
         verbose_name = "Bierzmowanie"
         verbose_name_plural = "Bierzmowania"
         ordering = ["rok", "osoba__nazwisko", "osoba__imie_pierwsze"]
@@ -333,11 +475,13 @@ class Bierzmowanie(models.Model):
 # =============================================================================
 
 
-class Malzenstwo(models.Model):
+class Malzenstwo(NumeracjaAktowMixin, models.Model):
     """
     Wpis w księdze małżeństw.
     """
 
+    ksiega = Ksiega.MALZENSTWO
+
     # Osoby
     malzonek_a = models.ForeignKey(
         Osoba,
@@ -519,12 +663,14 @@ class NamaszczenieChorych(models.Model):
 # =============================================================================
 
 
-class Zgon(models.Model):
+class Zgon(NumeracjaAktowMixin, models.Model):
     """
     Wpis w księdze zgonów.
     Jedna osoba może mieć tylko jeden wpis zgonu (OneToOne).
     """
 
+    ksiega = Ksiega.ZGON
+
     osoba = models.OneToOneField(
         Osoba,
         on_delete=models.CASCADE,
@@ -610,3 +756,69 @@ class Zgon(models.Model):
 
     def get_absolute_url(self):
         return reverse("osoba_szczegoly", args=[self.osoba.pk])
+
+
+# =============================================================================
+#  KSIĘGA ROCZNA – WYDRUK W TLE
+# =============================================================================
+class StatusWydruku(models.TextChoices):
+    OCZEKUJE = "OCZEKUJE", "W kolejce"
+    W_TOKU = "W_TOKU", "Generowanie"
+    GOTOWY = "GOTOWY", "Gotowy"
+    BLAD = "BLAD", "Błąd"
+
+
+def sciezka_wydruku(zlecenie, nazwa: str) -> str:
+    return nazwa_losowa("ksiegi", ".pdf")
+
+
+class WydrukKsiegi(models.Model):
+    """
+    Zlecenie wydruku całego rocznika księgi (jeden PDF).
+
+    Widok tylko zapisuje zlecenie; PDF generuje osobny proces
+    (manage.py generuj_ksiegi) – porcjami, z zapisem postępu w `wykonano`.
+    """
+
+    ksiega = models.CharField("Księga", max_length=20, choices=Ksiega.choices)
+    rok = models.PositiveIntegerField("Rok")
+    status = models.CharField(
+        "Status", max_length=10, choices=StatusWydruku.choices, default=StatusWydruku.OCZEKUJE
+    )
+    wykonano = models.PositiveIntegerField("Wydrukowane akty", default=0)
+    razem = models.PositiveIntegerField("Akty w roczniku", default=0)
+    # poza MEDIA, pod losową nazwą – pobieranie tylko przez WydrukKsiegiPobierzView
+    plik = models.FileField(
+        "Plik PDF", upload_to=sciezka_wydruku, storage=magazyn_prywatny, blank=True
+    )
+    blad = models.TextField("Opis błędu", blank=True)
+    zlecil = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="wydruki_ksiag",
+        verbose_name="Zlecił",
+    )
+    utworzono = models.DateTimeField("Zlecono", auto_now_add=True)
+    rozpoczeto = models.DateTimeField("Rozpoczęto", null=True, blank=True)
+    zakonczono = models.DateTimeField("Zakończono", null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "utworzono"])]
+        verbose_name = "Wydruk księgi"
+        verbose_name_plural = "Wydruki ksiąg"
+        ordering = ["-utworzono"]
+
+    def __str__(self) -> str:
+        return f"{self.get_ksiega_display()} {self.rok} ({self.get_status_display()})"
+
+    @property
+    def procent(self) -> int:
+        if self.status == StatusWydruku.GOTOWY:
+            return 100
+        return self.wykonano * 100 // self.razem if self.razem else 0
+
+    @property
+    def aktywny(self) -> bool:
+        return self.status in (StatusWydruku.OCZEKUJE, StatusWydruku.W_TOKU)
@@ -0,0 +1,47 @@
+# sakramenty/signals.py
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from osoby.models import Osoba
+
+from .skorowidz import SKOROWIDZE, zaznacz_zmiane, zaznacz_zmiane_osob
+
+
+# =============================================================================
+#  SKOROWIDZE – znaczniki zmian rocznika
+# =============================================================================
+def zapamietaj_rok(sender, instance, **kwargs):
+    # rok sprzed edycji – przeniesienie aktu do innego roku zmienia oba skorowidze
+    instance._rok_skorowidza = instance.__dict__.get("rok")
+
+
+def akt_zmieniony(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for rok in {instance.rok, getattr(instance, "_rok_skorowidza", None)} - {None, ""}:
+        zaznacz_zmiane(sender.ksiega, rok)
+    instance._rok_skorowidza = instance.rok
+
+
+for _model, _osoby, _tytul in SKOROWIDZE.values():
+    post_init.connect(
+        zapamietaj_rok, sender=_model,
+        dispatch_uid=f"skorowidz_rok_{_model._meta.label}",
+    )
+    post_save.connect(
+        akt_zmieniony, sender=_model,
+        dispatch_uid=f"skorowidz_zapis_{_model._meta.label}",
+    )
+    post_delete.connect(
+        akt_zmieniony, sender=_model,
+        dispatch_uid=f"skorowidz_usuniecie_{_model._meta.label}",
+    )
+
+
+@receiver(post_save, sender=Osoba)
+@receiver(post_delete, sender=Osoba)
+def osoba_zmieniona(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # nazwiska w skorowidzach pochodzą z Osoby – unieważniamy wszystkie
+    zaznacz_zmiane_osob()
@@ -0,0 +1,140 @@
+# sakramenty/skorowidz.py
+"""
+Skorowidz rocznika księgi – alfabetyczny spis nazwisk z numerami aktów
+(do zamknięcia roku w księdze papierowej).
+
+- wpisy to jedno zapytanie: filtr po roku (indeks rok + akt_nr),
+  sortowanie w bazie polską kolacją (parafia/utils_sql.PolskieSortowanie);
+  w księdze małżeństw oboje małżonkowie – UNION ALL dwóch gałęzi,
+- wpisy i PDF trzymane są w cache z wersją = znacznik zmian rocznika
+  i znacznik zmian osób (ustawiane przez sygnały w signals.py);
+  dopóki nic się nie zmieni, skorowidz nie jest liczony ponownie.
+"""
+from __future__ import annotations
+
+from uuid import uuid4
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from parafia.utils_cache import z_cache_wersji
+from parafia.utils_pdf import html_do_pdf
+from parafia.utils_sql import PolskieSortowanie
+
+from .models import Bierzmowanie, Chrzest, Ksiega, Malzenstwo, Zgon
+
+SZABLON_PDF = "sakramenty/druki/skorowidz_pdf.html"
+
+NAGLOWEK_CSV = ["Nazwisko", "Imiona", "Nazwisko rodowe", "Rok", "Nr aktu"]
+
+# księga -> (model, relacje do osób ujętych w skorowidzu, tytuł)
+SKOROWIDZE = {
+    Ksiega.CHRZEST: (Chrzest, ("ochrzczony",), "Skorowidz ochrzczonych"),
+    Ksiega.BIERZMOWANIE: (Bierzmowanie, ("osoba",), "Skorowidz bierzmowanych"),
+    Ksiega.MALZENSTWO: (Malzenstwo, ("malzonek_a", "malzonek_b"), "Skorowidz zaślubionych"),
+    Ksiega.ZGON: (Zgon, ("osoba",), "Skorowidz zmarłych"),
+}
+
+
+def _galaz(model_class, rok: int, osoba: str):
+    return (
+        model_class.objects.filter(rok=rok, **{f"{osoba}__isnull": False})
+        .order_by()
+        .values(
+            nazwisko=F(f"{osoba}__nazwisko"),
+            imie_pierwsze=F(f"{osoba}__imie_pierwsze"),
+            imie_drugie=F(f"{osoba}__imie_drugie"),
+            nazwisko_rodowe=F(f"{osoba}__nazwisko_rodowe"),
+            akt=F("akt_nr"),
+            klucz_nazwiska=PolskieSortowanie(f"{osoba}__nazwisko"),
+            klucz_imienia=PolskieSortowanie(f"{osoba}__imie_pierwsze"),
+            dlugosc_aktu=Length("akt_nr"),
+        )
+    )
+
+
+def wpisy_skorowidza(ksiega: str, rok: int) -> list[dict]:
+    """
+    [{"nazwisko", "imiona", "nazwisko_rodowe", "akt", "litera"}, ...]
+    w porządku alfabetycznym – jedno zapytanie.
+    """
+    model_class, osoby, _tytul = SKOROWIDZE[ksiega]
+    galezie = [_galaz(model_class, rok, osoba) for osoba in osoby]
+    qs = galezie[0].union(*galezie[1:], all=True) if len(galezie) > 1 else galezie[0]
+
+    wpisy = []
+    for w in qs.order_by("klucz_nazwiska", "klucz_imienia", "dlugosc_aktu", "akt"):
+        wpisy.append({
+            "nazwisko": w["nazwisko"],
+            "imiona": " ".join(i for i in (w["imie_pierwsze"], w["imie_drugie"]) if i),
+            "nazwisko_rodowe": w["nazwisko_rodowe"] if w["nazwisko_rodowe"] != w["nazwisko"] else "",
+            "akt": w["akt"],
+            "litera": w["nazwisko"][:1].upper(),
+        })
+    return wpisy
+
+
+# =============================================================================
+#  CACHE (unieważniany sygnałami)
+# =============================================================================
+def _klucz_zmian(ksiega: str, rok) -> str:
+    return f"sakramenty:skorowidz:zmiana:{ksiega}:{str(rok).strip()}"
+
+
+KLUCZ_ZMIAN_OSOB = "sakramenty:skorowidz:zmiana:osoby"
+
+
+def zaznacz_zmiane(ksiega: str, rok) -> None:
+    cache.set(_klucz_zmian(ksiega, rok), uuid4().hex, None)
+
+
+def zaznacz_zmiane_osob() -> None:
+    cache.set(KLUCZ_ZMIAN_OSOB, uuid4().hex, None)
+
+
+def _znacznik(klucz: str) -> str:
+    # brak znacznika (np. wyczyszczony cache) – nowy, żeby nie trafić w starą wersję
+    return cache.get_or_set(klucz, lambda: uuid4().hex, None)
+
+
+def wersja_skorowidza(ksiega: str, rok: int) -> str:
+    return f"{_znacznik(_klucz_zmian(ksiega, rok))}|{_znacznik(KLUCZ_ZMIAN_OSOB)}"
+
+
+def skorowidz(ksiega: str, rok: int) -> list[dict]:
+    """Wpisy skorowidza – z cache, jeśli rocznik i osoby się nie zmieniły."""
+    return z_cache_wersji(
+        f"sakramenty:skorowidz:{ksiega}:{rok}",
+        wersja_skorowidza(ksiega, rok),
+        lambda: wpisy_skorowidza(ksiega, rok),
+    )
+
+
+def pdf_skorowidza(ksiega: str, rok: int) -> bytes:
+    """PDF skorowidza – WeasyPrint rusza tylko po zmianie danych lub parafii."""
+    _model, _osoby, tytul = SKOROWIDZE[ksiega]
+    UstawieniaParafii = apps.get_model("konfiguracja", "UstawieniaParafii")
+    parafia = UstawieniaParafii.load()
+
+    def generuj() -> bytes:
+        return html_do_pdf(SZABLON_PDF, {
+            "parafia": parafia,
+            "tytul": tytul,
+            "rok": rok,
+            "wpisy": skorowidz(ksiega, rok),
+            "today": timezone.now(),
+        })
+
+    return z_cache_wersji(
+        f"sakramenty:skorowidz:pdf:{ksiega}:{rok}",
+        f"{wersja_skorowidza(ksiega, rok)}|{parafia.nazwa}|{parafia.miejscowosc}",
+        generuj,
+    )
+
+
+def wiersze_csv(ksiega: str, rok: int):
+    for w in skorowidz(ksiega, rok):
+        yield [w["nazwisko"], w["imiona"], w["nazwisko_rodowe"], rok, w["akt"]]
@@ -1,11 +1,30 @@
 # sakramenty/tests.py
+import tempfile
 from datetime import date
+from importlib import import_module
+from io import BytesIO
+from unittest.mock import patch
 
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pypdf import PdfReader, PdfWriter
 
+from konta.models import Profil, Rola
 from osoby.models import Osoba
-from sakramenty.models import Chrzest
+from parafia.utils_tekst import klucz_fonetyczny, klucz_sortowania
+from sakramenty.forms import ustal_numer_aktu
+from sakramenty.ksiegi import przetworz_kolejke, zlec_wydruk
+from sakramenty.skorowidz import skorowidz
+from sakramenty.models import (
+    Chrzest, Ksiega, LicznikAktow, Malzenstwo, NamaszczenieChorych, StatusWydruku, WydrukKsiegi, Zgon,
+)
 
 
 class ChrzestConstraintsTest(TestCase):
@@ -34,3 +53,391 @@ class ChrzestConstraintsTest(TestCase):
         # Ten sam (rok, akt_nr) nie może wystąpić ponownie
         with self.assertRaises(IntegrityError):
             Chrzest.objects.create(rok=2025, akt_nr="10", ochrzczony=inna_osoba)
+
+
+class KluczFonetycznyTest(TestCase):
+    def test_warianty_pisowni_maja_ten_sam_klucz(self):
+        for a, b in [
+            ("Kowalski", "Kovalski"),
+            ("Kowalski", "Kowalska"),
+            ("Szymański", "Szymanski"),
+            ("Schmidt", "Szmit"),
+            ("Górski", "Gurski"),
+        ]:
+            self.assertEqual(klucz_fonetyczny(a), klucz_fonetyczny(b), (a, b))
+
+        self.assertNotEqual(klucz_fonetyczny("Kowalski"), klucz_fonetyczny("Nowak"))
+        self.assertEqual(klucz_fonetyczny(""), "")
+
+
+class ChrzestBrzmiJakTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        dziecko = Osoba.objects.create(nazwisko="Nowak", imie_pierwsze="Ewa", data_urodzenia=date(1901, 1, 1))
+        self.chrzest = Chrzest.objects.create(
+            rok=1901, akt_nr="7", ochrzczony=dziecko, ojciec="Jan Nowak", matka="Maria Nowak",
+            nazwisko_matki_rodowe="Kovalska",
+        )
+        inne = Osoba.objects.create(nazwisko="Zieliński", imie_pierwsze="Adam", data_urodzenia=date(1902, 1, 1))
+        Chrzest.objects.create(rok=1902, akt_nr="1", ochrzczony=inne)
+
+    def test_klucze_zapisane_przy_save(self):
+        self.assertEqual(self.chrzest.ojciec_fonet, klucz_fonetyczny("Nowak"))
+        self.assertEqual(self.chrzest.nazwisko_matki_rodowe_fonet, klucz_fonetyczny("Kowalska"))
+
+    def test_wyszukiwanie_po_nazwisku_rodowym_matki(self):
+        resp = self.client.get(reverse("chrzest_lista"), {"q": "Kowalski", "brzmi": "1"})
+        self.assertEqual(list(resp.context["chrzty"]), [self.chrzest])
+
+        # bez trybu "brzmi jak" – zwykłe wyszukiwanie nic nie znajduje
+        resp = self.client.get(reverse("chrzest_lista"), {"q": "Kowalski"})
+        self.assertEqual(list(resp.context["chrzty"]), [])
+
+    def test_slowa_bez_liter_i_imiona(self):
+        # "1902" nie ma klucza – nie może pasować do pustych pól *_fonet
+        resp = self.client.get(reverse("chrzest_lista"), {"q": "1902", "brzmi": "1"})
+        self.assertEqual(list(resp.context["chrzty"]), [])
+        Zgon.objects.create(osoba=Osoba.objects.get(nazwisko="Zieliński"), rok="2020", akt_nr="1")
+        resp = self.client.get(reverse("zgon_lista"), {"q": "2020", "brzmi": "1"})
+        self.assertEqual(list(resp.context["object_list"]), [])
+
+        # imię + nazwisko – każde słowo musi pasować (imię dokładnie, nazwisko brzmieniem)
+        resp = self.client.get(reverse("chrzest_lista"), {"q": "Ewa Nowack", "brzmi": "1"})
+        self.assertEqual(list(resp.context["chrzty"]), [self.chrzest])
+        resp = self.client.get(reverse("chrzest_lista"), {"q": "Adam Kowalski", "brzmi": "1"})
+        self.assertEqual(list(resp.context["chrzty"]), [])
+        resp = self.client.get(reverse("zgon_lista"), {"q": "Adam Zielinsky", "brzmi": "1"})
+        self.assertEqual(len(resp.context["object_list"]), 1)
+
+    def test_brzmi_jak_po_indeksach(self):
+        from sakramenty.views import _filtr_brzmi_jak
+
+        qs = _filtr_brzmi_jak(
+            Chrzest.objects.all(), "Jan Kowalski", ["ochrzczony"],
+            ("ojciec_fonet", "matka_fonet", "nazwisko_matki_rodowe_fonet"),
+        )
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as kursor:
+            kursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = [wiersz[-1] for wiersz in kursor.fetchall()]
+        self.assertIn("MULTI-INDEX OR", plan)
+        self.assertFalse([krok for krok in plan if krok.startswith("SCAN")], plan)
+
+
+class ChrzestStronicowanieTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        osoby = Osoba.objects.bulk_create(
+            Osoba(
+                nazwisko="Kowalski", nazwisko_norm="kowalski",
+                imie_pierwsze=f"Jan{i}", data_urodzenia=date(1950, 1, 1),
+            )
+            for i in range(120)
+        )
+        # po kilka aktów w roku, żeby klucz (-rok, akt_nr) miał remisy na roku
+        Chrzest.objects.bulk_create(
+            Chrzest(rok=1950 + i // 7, akt_nr=str(i % 7 + 1), ochrzczony=osoba)
+            for i, osoba in enumerate(osoby)
+        )
+        self.oczekiwane = list(
+            Chrzest.objects.order_by("-rok", "akt_nr", "pk").values_list("pk", flat=True)
+        )
+
+    def _pobierz(self, url):
+        with CaptureQueriesContext(connection) as zapytania:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(zapytania)
+
+    def test_przejscie_w_przod_i_w_tyl(self):
+        url = reverse("chrzest_lista")
+        resp, _ = self._pobierz(url)
+        self.assertEqual(resp.context["paginator"].count, 120)
+        self.assertFalse(resp.context["page_obj"].has_previous())
+
+        strony = [[c.pk for c in resp.context["chrzty"]]]
+        while resp.context["page_obj"].has_next():
+            resp, _ = self._pobierz(url + resp.context["page_obj"].url_nastepnej)
+            strony.append([c.pk for c in resp.context["chrzty"]])
+
+        self.assertEqual([pk for strona in strony for pk in strona], self.oczekiwane)
+        self.assertEqual([len(s) for s in strony], [50, 50, 20])
+
+        # "Poprzednia" z ostatniej strony wraca dokładnie na środkową
+        resp, _ = self._pobierz(url + resp.context["page_obj"].url_poprzedniej)
+        self.assertEqual([c.pk for c in resp.context["chrzty"]], strony[1])
+        self.assertTrue(resp.context["page_obj"].has_previous())
+        self.assertTrue(resp.context["page_obj"].has_next())
+
+    def test_filtry_zachowane_a_koszt_strony_staly(self):
+        url = reverse("chrzest_lista")
+        _, pierwsza = self._pobierz(url + "?q=kowalski")
+        resp, _ = self._pobierz(url + "?q=kowalski")
+        link = resp.context["page_obj"].url_nastepnej
+        self.assertIn("q=kowalski", link)
+
+        # liczba wpisów już w cache – kolejne strony nie liczą COUNT(*) od nowa
+        _, druga = self._pobierz(url + link)
+        self.assertLessEqual(druga, pierwsza)
+
+    def test_bledny_kursor(self):
+        resp = self.client.get(reverse("chrzest_lista") + "?po=xyz")
+        self.assertEqual(resp.status_code, 404)
+
+
+class NamaszczenieStronicowanieTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="tester", password="haslo123")
+        self.client.login(username="tester", password="haslo123")
+
+        osoby = Osoba.objects.bulk_create(
+            Osoba(nazwisko=f"Nowak{i % 5}", imie_pierwsze="Anna", data_urodzenia=date(1940, 1, 1))
+            for i in range(50)
+        )
+        # co trzeci wpis bez daty – klucz (-data, ...) ma NULL-e w środku danych
+        NamaszczenieChorych.objects.bulk_create(
+            NamaszczenieChorych(osoba=osoba, data=None if i % 3 == 0 else date(2020, 1, 1 + i % 4))
+            for i, osoba in enumerate(osoby)
+        )
+
+    def test_wpisy_bez_daty_na_koncu_i_zadnych_nie_gubi(self):
+        url = reverse("namaszczenie_lista")
+        resp = self.client.get(url)
+        strony = [[n.pk for n in resp.context["namaszczenia"]]]
+        while resp.context["page_obj"].has_next():
+            resp = self.client.get(url + resp.context["page_obj"].url_nastepnej)
+            strony.append([n.pk for n in resp.context["namaszczenia"]])
+
+        wszystkie = [pk for strona in strony for pk in strona]
+        self.assertEqual([len(s) for s in strony], [20, 20, 10])
+        self.assertEqual(sorted(wszystkie), sorted(NamaszczenieChorych.objects.values_list("pk", flat=True)))
+        daty = list(
+            NamaszczenieChorych.objects.in_bulk(wszystkie)[pk].data for pk in wszystkie
+        )
+        niepuste = [d for d in daty if d is not None]
+        self.assertEqual(daty, niepuste + [None] * (len(daty) - len(niepuste)))
+        self.assertEqual(niepuste, sorted(niepuste, reverse=True))
+
+        # powrót z ostatniej strony (kursor z pustą datą) na środkową
+        resp = self.client.get(url + resp.context["page_obj"].url_poprzedniej)
+        self.assertEqual([n.pk for n in resp.context["namaszczenia"]], strony[1])
+
+
+class NumeracjaAktowTest(TestCase):
+    def setUp(self):
+        self.osoby = Osoba.objects.bulk_create(
+            Osoba(nazwisko="Wiśniewski", imie_pierwsze=f"Piotr{i}", data_urodzenia=date(1950, 1, 1))
+            for i in range(5)
+        )
+
+    def _licznik(self, ksiega, rok):
+        return LicznikAktow.objects.get(ksiega=ksiega, rok=rok).ostatni_nr
+
+    def test_kolejne_numery_z_licznika(self):
+        a = Chrzest.objects.create(rok=2025, akt_nr="", ochrzczony=self.osoby[0])
+        b = Chrzest.objects.create(rok=2025, akt_nr="", ochrzczony=self.osoby[1])
+        c = Chrzest.objects.create(rok=2026, akt_nr="", ochrzczony=self.osoby[2])
+        self.assertEqual((a.akt_nr, b.akt_nr, c.akt_nr), ("1", "2", "1"))
+        self.assertEqual(self._licznik(Ksiega.CHRZEST, 2025), 2)
+
+    def test_licznik_zakladany_od_istniejacych_aktow(self):
+        # wpisy sprzed licznika (np. import) – bulk_create omija save()
+        Chrzest.objects.bulk_create([
+            Chrzest(rok=2024, akt_nr="7", ochrzczony=self.osoby[0]),
+            Chrzest(rok=2024, akt_nr="7a", ochrzczony=self.osoby[1]),
+        ])
+        nowy = Chrzest.objects.create(rok=2024, akt_nr="", ochrzczony=self.osoby[2])
+        self.assertEqual(nowy.akt_nr, "8")
+
+    def test_numer_reczny_podnosi_licznik(self):
+        Zgon.objects.create(osoba=self.osoby[0], rok="2025", akt_nr="40")
+        Zgon.objects.create(osoba=self.osoby[1], rok="2025", akt_nr="3")
+        nastepny = Zgon.objects.create(osoba=self.osoby[2], rok="2025")
+        self.assertEqual(nastepny.akt_nr, "41")
+        # bez roku numeru nie nadajemy
+        self.assertEqual(Zgon.objects.create(osoba=self.osoby[3]).akt_nr, "")
+
+    def test_przydzial_bez_skanowania_roku(self):
+        Chrzest.objects.create(rok=2025, akt_nr="", ochrzczony=self.osoby[0])
+        with CaptureQueriesContext(connection) as zapytania:
+            Chrzest.objects.create(rok=2025, akt_nr="", ochrzczony=self.osoby[1])
+        sql = " ".join(z["sql"] for z in zapytania.captured_queries)
+        self.assertNotIn('"sakramenty_chrzest"."akt_nr" FROM', sql)
+
+    def test_formularz_zostawia_numer_licznikowi(self):
+        Chrzest.objects.create(rok=2025, akt_nr="5", ochrzczony=self.osoby[0])
+        self.assertEqual(ustal_numer_aktu(Chrzest, 2025, ""), (True, ""))
+        sukces, _blad = ustal_numer_aktu(Chrzest, 2025, "5")
+        self.assertFalse(sukces)
+
+    def test_migracja_uzgadnia_liczniki(self):
+        Chrzest.objects.bulk_create([
+            Chrzest(rok=2020, akt_nr="12", ochrzczony=self.osoby[0]),
+            Chrzest(rok=2020, akt_nr="3", ochrzczony=self.osoby[1]),
+        ])
+        Zgon.objects.bulk_create([Zgon(osoba=self.osoby[2], rok="2021", akt_nr="9")])
+        LicznikAktow.objects.all().delete()
+
+        migracja = import_module("sakramenty.migrations.0003_licznik_aktow")
+        migracja.uzgodnij_liczniki(apps, None)
+
+        self.assertEqual(self._licznik(Ksiega.CHRZEST, 2020), 12)
+        self.assertEqual(self._licznik(Ksiega.ZGON, 2021), 9)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), PLIKI_PRYWATNE_ROOT=tempfile.mkdtemp())
+class WydrukKsiegiTest(TestCase):
+    def setUp(self):
+        uzytkownik = User.objects.create_user(username="proboszcz", password="x")
+        Profil.objects.create(uzytkownik=uzytkownik, rola=Rola.KSIADZ)
+        self.client.login(username="proboszcz", password="x")
+        osoby = Osoba.objects.bulk_create(
+            Osoba(nazwisko="Zieliński", imie_pierwsze=f"Adam{i}", data_urodzenia=date(2024, 1, 1))
+            for i in range(5)
+        )
+        for i, osoba in enumerate(osoby):
+            Chrzest.objects.create(rok=2024, akt_nr=str(10 - i), ochrzczony=osoba)
+
+    def test_zlecenie_nie_renderuje_pdf_w_zadaniu(self):
+        with patch("parafia.utils_pdf.HTML") as html:
+            resp = self.client.post(reverse("wydruk_ksiegi_dodaj"), {"ksiega": Ksiega.CHRZEST, "rok": 2024})
+            self.client.post(reverse("wydruk_ksiegi_dodaj"), {"ksiega": Ksiega.CHRZEST, "rok": 2024})
+        self.assertRedirects(resp, reverse("wydruki_ksiag"))
+        html.assert_not_called()
+        # ten sam rocznik tylko raz w kolejce
+        self.assertEqual(WydrukKsiegi.objects.get().status, StatusWydruku.OCZEKUJE)
+        self.assertContains(self.client.get(reverse("wydruki_ksiag")), "data-status-url")
+
+    @patch("sakramenty.ksiegi.ROZMIAR_SEKCJI", 2)
+    @patch("parafia.utils_pdf.HTML")
+    def test_generowanie_sekcjami_z_postepem(self, html):
+        postep = []
+
+        def zapis_pdf(plik):
+            postep.append(WydrukKsiegi.objects.values_list("wykonano", flat=True).get())
+            strona = PdfWriter()
+            strona.add_blank_page(100, 100)
+            strona.write(plik)
+
+        html.return_value.write_pdf.side_effect = zapis_pdf
+        zlecenie, _nowe = zlec_wydruk(Ksiega.CHRZEST, 2024)
+
+        self.assertEqual(przetworz_kolejke(), 1)
+        sekcje = [wywolanie.kwargs["string"] for wywolanie in html.call_args_list]
+        self.assertEqual(len(sekcje), 3)
+        self.assertLess(sekcje[0].index("2024/6"), sekcje[0].index("2024/7"))
+        self.assertIn("2024/10", sekcje[2])
+        self.assertEqual(postep, [0, 2, 4])  # postęp zapisany przed każdą kolejną sekcją
+
+        zlecenie.refresh_from_db()
+        self.assertEqual((zlecenie.status, zlecenie.razem, zlecenie.procent), (StatusWydruku.GOTOWY, 5, 100))
+        # plik poza MEDIA, pod losową nazwą, bez publicznego adresu
+        self.assertTrue(zlecenie.plik.path.startswith(settings.PLIKI_PRYWATNE_ROOT))
+        self.assertRegex(zlecenie.plik.name, r"^ksiegi/[0-9a-f]{32}\.pdf$")
+        with self.assertRaises(ValueError):
+            zlecenie.plik.url
+        self.assertEqual(przetworz_kolejke(), 0)
+
+        resp = self.client.get(reverse("wydruk_ksiegi_status", args=[zlecenie.pk]))
+        self.assertEqual(resp.json()["pobierz"], reverse("wydruk_ksiegi_pobierz", args=[zlecenie.pk]))
+        resp = self.client.get(reverse("wydruk_ksiegi_pobierz", args=[zlecenie.pk]))
+        self.assertEqual(len(PdfReader(BytesIO(b"".join(resp.streaming_content))).pages), 3)
+
+    @patch("parafia.utils_pdf.HTML")
+    def test_blad_generowania_zapisany(self, html):
+        html.return_value.write_pdf.side_effect = RuntimeError("brak czcionki")
+        zlecenie, _nowe = zlec_wydruk(Ksiega.CHRZEST, 2024)
+        with self.assertLogs("sakramenty.ksiegi", "ERROR"):
+            przetworz_kolejke()
+        zlecenie.refresh_from_db()
+        self.assertEqual((zlecenie.status, zlecenie.blad), (StatusWydruku.BLAD, "brak czcionki"))
+        resp = self.client.get(reverse("wydruk_ksiegi_pobierz", args=[zlecenie.pk]))
+        self.assertEqual(resp.status_code, 404)
+
+    @patch("parafia.utils_pdf.HTML")
+    def test_blad_zapisu_pliku_konczy_zlecenie(self, html):
+        def zapis_pdf(plik):
+            strona = PdfWriter()
+            strona.add_blank_page(100, 100)
+            strona.write(plik)
+
+        html.return_value.write_pdf.side_effect = zapis_pdf
+        zlecenie, _nowe = zlec_wydruk(Ksiega.CHRZEST, 2024)
+        magazyn = WydrukKsiegi._meta.get_field("plik").storage
+        with patch.object(magazyn, "save", side_effect=OSError("brak miejsca")):
+            with self.assertLogs("sakramenty.ksiegi", "ERROR"):
+                przetworz_kolejke()
+        zlecenie.refresh_from_db()
+        self.assertEqual((zlecenie.status, zlecenie.blad), (StatusWydruku.BLAD, "brak miejsca"))
+        self.assertIsNotNone(zlecenie.zakonczono)
+
+
+class SkorowidzTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        uzytkownik = User.objects.create_user(username="proboszcz", password="x")
+        Profil.objects.create(uzytkownik=uzytkownik, rola=Rola.KSIADZ)
+        self.client.login(username="proboszcz", password="x")
+
+        def osoba(nazwisko, imie, rodowe=""):
+            return Osoba.objects.create(
+                nazwisko=nazwisko, imie_pierwsze=imie, nazwisko_rodowe=rodowe,
+                data_urodzenia=date(1990, 1, 1),
+            )
+
+        self.zak = osoba("Żak", "Anna", rodowe="Łoś")
+        self.zajac = osoba("Zając", "Piotr")
+        self.lis = osoba("Lis", "Ewa")
+        self.los = osoba("Łoś", "Jan")
+        Malzenstwo.objects.create(malzonek_a=self.zajac, malzonek_b=self.zak, rok="2023", akt_nr="2")
+        Malzenstwo.objects.create(malzonek_a=self.los, malzonek_b=self.lis, rok="2023", akt_nr="10")
+
+    def test_polski_porzadek_alfabetyczny(self):
+        self.assertEqual(
+            sorted(["Żak", "zając", "Łoś", "Lis", "Źródło", "Sowa", "Ślusarz"], key=klucz_sortowania),
+            ["Lis", "Łoś", "Sowa", "Ślusarz", "zając", "Źródło", "Żak"],
+        )
+
+    def test_oboje_malzonkowie_jednym_zapytaniem(self):
+        with self.assertNumQueries(1):
+            wpisy = skorowidz(Ksiega.MALZENSTWO, 2023)
+        self.assertEqual(
+            [(w["nazwisko"], w["akt"]) for w in wpisy],
+            [("Lis", "10"), ("Łoś", "10"), ("Zając", "2"), ("Żak", "2")],
+        )
+        self.assertEqual(wpisy[3]["nazwisko_rodowe"], "Łoś")
+
+    def test_cache_do_zmiany_rocznika(self):
+        skorowidz(Ksiega.MALZENSTWO, 2023)
+        with self.assertNumQueries(0):
+            skorowidz(Ksiega.MALZENSTWO, 2023)
+
+        # przeniesienie aktu do innego roku zmienia oba roczniki
+        malzenstwo = Malzenstwo.objects.get(akt_nr="10")
+        skorowidz(Ksiega.MALZENSTWO, 2024)
+        malzenstwo.rok = "2024"
+        malzenstwo.save()
+        self.assertEqual(len(skorowidz(Ksiega.MALZENSTWO, 2023)), 2)
+        self.assertEqual(len(skorowidz(Ksiega.MALZENSTWO, 2024)), 2)
+
+        # zmiana nazwiska osoby też unieważnia skorowidz
+        self.zajac.nazwisko = "Zajączkowski"
+        self.zajac.save()
+        self.assertEqual(skorowidz(Ksiega.MALZENSTWO, 2023)[0]["nazwisko"], "Zajączkowski")
+
+    def test_eksport_csv_i_pdf(self):
+        resp = self.client.get(reverse("skorowidz_csv"), {"ksiega": Ksiega.MALZENSTWO, "rok": 2023})
+        tresc = b"".join(resp.streaming_content).decode("utf-8")
+        self.assertEqual(tresc.splitlines()[1], "Lis;Ewa;;2023;10")
+
+        with patch("sakramenty.skorowidz.html_do_pdf", return_value=b"%PDF") as render:
+            for _ in range(2):
+                resp = self.client.get(reverse("skorowidz_pdf"), {"ksiega": Ksiega.MALZENSTWO, "rok": 2023})
+                self.assertEqual(resp.content, b"%PDF")
+        render.assert_called_once()
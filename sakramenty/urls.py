@@ -64,5 +64,13 @@ urlpatterns = [
     path("namaszczenia/pdf/", views.NamaszczenieListaPDFView.as_view(), name="namaszczenie_lista_pdf"),
     path("zgon/<int:pk>/pdf/", views.ZgonPDFView.as_view(), name="zgon_pdf"),
     path("zgony/pdf/", views.ZgonListaPDFView.as_view(), name="zgon_lista_pdf"),
+
+    # KSIĘGI ROCZNE (wydruk w tle)
+    path("ksiegi/wydruki/", views.WydrukiKsiagListaView.as_view(), name="wydruki_ksiag"),
+    path("ksiegi/wydruki/nowy/", views.WydrukKsiegiNowyView.as_view(), name="wydruk_ksiegi_dodaj"),
+    path("ksiegi/wydruki/<int:pk>/status/", views.WydrukKsiegiStatusView.as_view(), name="wydruk_ksiegi_status"),
+    path("ksiegi/wydruki/<int:pk>/pobierz/", views.WydrukKsiegiPobierzView.as_view(), name="wydruk_ksiegi_pobierz"),
+    path("ksiegi/skorowidz/pdf/", views.SkorowidzPDFView.as_view(), name="skorowidz_pdf"),
+    path("ksiegi/skorowidz/csv/", views.SkorowidzCSVView.as_view(), name="skorowidz_csv"),
 ]
 
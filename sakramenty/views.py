@@ -2,14 +2,15 @@
 
 # === IMPORTY ===
 from django.views.generic import View
-from parafia.utils_pdf import render_to_pdf
+from parafia.utils_csv import strumien_csv
+from parafia.utils_pdf import odpowiedz_pdf, render_to_pdf
 from django.conf import settings
 from django import forms
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
 from django.db.models import Q
-from django.http import HttpResponseRedirect
+from django.http import FileResponse, Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -28,6 +29,8 @@ from konta.mixins import RolaWymaganaMixin
 from konta.models import Rola
 
 from osoby.models import Osoba
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import klucz_fonetyczny, normalizuj
 from .models import (
     Chrzest,
     PierwszaKomunia,
@@ -35,6 +38,14 @@ from .models import (
     Malzenstwo,
     NamaszczenieChorych,
     Zgon,
+    StatusWydruku,
+    WydrukKsiegi,
+)
+from .ksiegi import zlec_wydruk
+from .skorowidz import (
+    NAGLOWEK_CSV as NAGLOWEK_CSV_SKOROWIDZA,
+    pdf_skorowidza,
+    wiersze_csv as wiersze_csv_skorowidza,
 )
 from .forms import (
     ChrzestForm,
@@ -43,28 +54,66 @@ from .forms import (
     MalzenstwoForm,
     NamaszczenieChorychForm,
     ZgonForm,
+    WydrukKsiegiForm,
+    SkorowidzForm,
 )
 
 
+def _filtr_brzmi_jak(qs, fraza: str, osoby: list[str], pola: tuple[str, ...] = ()):
+    """
+    Tryb "brzmi jak": każde słowo frazy musi pasować do wpisu – kluczem
+    fonetycznym do nazwiska (lub rodowego) którejś z `osoby` albo do pola
+    *_fonet wpisu z `pola`, ewentualnie dokładnie do imienia osoby.
+    "Jan Kowalski" znajduje więc Jana Kovalskiego, ale nie każdego Jana.
+    Słowa bez liter (rok, nr aktu) nie mają klucza i są pomijane.
+
+    Warunki słowa dotyczą tylko kolumn tej tabeli (FK do osób przez
+    podzapytanie po indeksach Osoby), więc SQLite łączy je przez indeksy
+    (MULTI-INDEX OR), bez przeglądania całej księgi.
+    """
+    slowa = [(klucz_fonetyczny(slowo), normalizuj(slowo)) for slowo in fraza.split()]
+    slowa = [(klucz, imie) for klucz, imie in slowa if klucz]
+    if not slowa:
+        return qs.none()
+    for klucz, imie in slowa:
+        pasujace_osoby = Osoba.objects.filter(
+            Q(nazwisko_fonet=klucz) | Q(nazwisko_rodowe_fonet=klucz) | Q(imie_norm=imie)
+        ).values("pk")
+        warunek = Q()
+        for osoba in osoby:
+            warunek |= Q(**{f"{osoba}_id__in": pasujace_osoby})
+        for pole in pola:
+            warunek |= Q(**{pole: klucz})
+        qs = qs.filter(warunek)
+    return qs
+
+
 # =============================================================================
 # === CHRZEST
 # =============================================================================
 
-class ChrzestListaView(LoginRequiredMixin, ListView):
+class ChrzestListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Chrzest
     template_name = "sakramenty/chrzest_lista.html"
     context_object_name = "chrzty"
     paginate_by = 50
+    klucz_stronicowania = ("-rok", "akt_nr", "pk")
 
     def get_queryset(self):
         qs = Chrzest.objects.select_related("ochrzczony").order_by("-rok", "akt_nr")
 
         # 1. Filtrowanie po frazie (nazwisko, imię, nr aktu)
         szukaj = (self.request.GET.get("q") or "").strip()
-        if szukaj:
+        if szukaj and self.request.GET.get("brzmi"):
+            # tryb "brzmi jak" – klucz fonetyczny nazwiska ochrzczonego lub rodziców
+            qs = _filtr_brzmi_jak(
+                qs, szukaj, ["ochrzczony"], ("ojciec_fonet", "matka_fonet", "nazwisko_matki_rodowe_fonet")
+            )
+        elif szukaj:
+            szukaj_norm = normalizuj(szukaj)
             qs = qs.filter(
-                Q(ochrzczony__nazwisko__icontains=szukaj)
-                | Q(ochrzczony__imie_pierwsze__icontains=szukaj)
+                Q(ochrzczony__nazwisko_norm__contains=szukaj_norm)
+                | Q(ochrzczony__imie_norm__contains=szukaj_norm)
                 | Q(akt_nr__icontains=szukaj)
             )
 
@@ -79,6 +128,7 @@ class ChrzestListaView(LoginRequiredMixin, ListView):
         ctx = super().get_context_data(**kwargs)
         ctx["filtr_q"] = self.request.GET.get("q", "")
         ctx["filtr_rok"] = self.request.GET.get("rok", "")
+        ctx["filtr_brzmi"] = bool(self.request.GET.get("brzmi"))
         return ctx
     
 
@@ -254,7 +304,7 @@ class ChrzestListaPDFView(ChrzestListaView):
 # === I KOMUNIA ŚW.
 # =============================================================================
 
-class KomuniaListaView(LoginRequiredMixin, ListView):
+class KomuniaListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = PierwszaKomunia
     template_name = "sakramenty/komunia_lista.html"
     context_object_name = "komunie"
@@ -267,10 +317,11 @@ class KomuniaListaView(LoginRequiredMixin, ListView):
         q = (self.request.GET.get("q") or "").strip()
         if q:
             for slowo in q.split():
+                slowo_norm = normalizuj(slowo)
                 qs = qs.filter(
-                    Q(osoba__nazwisko__icontains=slowo)
-                    | Q(osoba__imie_pierwsze__icontains=slowo)
-                    | Q(parafia__nazwa__icontains=slowo)
+                    Q(osoba__nazwisko_norm__contains=slowo_norm)
+                    | Q(osoba__imie_norm__contains=slowo_norm)
+                    | Q(parafia__nazwa_norm__contains=slowo_norm)
                 )
         
         rok = (self.request.GET.get("rok") or "").strip()
@@ -413,7 +464,7 @@ class KomuniaListaPDFView(KomuniaListaView):
 # === BIERZMOWANIE
 # =============================================================================
 
-class BierzmowanieListaView(LoginRequiredMixin, ListView):
+class BierzmowanieListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Bierzmowanie
     template_name = "sakramenty/bierzmowanie_lista.html"
     context_object_name = "bierzmowania"
@@ -426,11 +477,12 @@ class BierzmowanieListaView(LoginRequiredMixin, ListView):
         q = (self.request.GET.get("q") or "").strip()
         if q:
             for slowo in q.split():
+                slowo_norm = normalizuj(slowo)
                 qs = qs.filter(
-                    Q(osoba__nazwisko__icontains=slowo)
-                    | Q(osoba__imie_pierwsze__icontains=slowo)
+                    Q(osoba__nazwisko_norm__contains=slowo_norm)
+                    | Q(osoba__imie_norm__contains=slowo_norm)
                     | Q(akt_nr__icontains=slowo)
-                    | Q(parafia__nazwa__icontains=slowo)
+                    | Q(parafia__nazwa_norm__contains=slowo_norm)
                 )
         
         rok = (self.request.GET.get("rok") or "").strip()
@@ -585,7 +637,7 @@ class BierzmowanieListaPDFView(BierzmowanieListaView):
 # === MAŁŻEŃSTWO
 # =============================================================================
 
-class MalzenstwoListaView(LoginRequiredMixin, ListView):
+class MalzenstwoListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Malzenstwo
     template_name = "sakramenty/malzenstwo_lista.html"
     context_object_name = "malzenstwa"
@@ -596,21 +648,23 @@ class MalzenstwoListaView(LoginRequiredMixin, ListView):
         qs = super().get_queryset().select_related("malzonek_a", "malzonek_b", "parafia")
         
         q = (self.request.GET.get("q") or "").strip()
-        if q:
+        if q and self.request.GET.get("brzmi"):
+            # tryb "brzmi jak" – klucz fonetyczny nazwiska (lub rodowego) małżonków
+            qs = _filtr_brzmi_jak(qs, q, ["malzonek_a", "malzonek_b"])
+        elif q:
             for slowo in q.split():
+                slowo_norm = normalizuj(slowo)
                 qs = qs.filter(
-                    Q(malzonek_a__nazwisko__icontains=slowo)
-                    | Q(malzonek_a__nazwisko_rodowe__icontains=slowo)
-                    | Q(malzonek_a__imie_pierwsze__icontains=slowo)
-                    | Q(malzonek_b__nazwisko__icontains=slowo)
-                    | Q(malzonek_b__nazwisko_rodowe__icontains=slowo)
-                    | Q(malzonek_b__imie_pierwsze__icontains=slowo)
+                    Q(malzonek_a__nazwisko_norm__contains=slowo_norm)
+                    | Q(malzonek_a__nazwisko_rodowe_norm__contains=slowo_norm)
+                    | Q(malzonek_a__imie_norm__contains=slowo_norm)
+                    | Q(malzonek_b__nazwisko_norm__contains=slowo_norm)
+                    | Q(malzonek_b__nazwisko_rodowe_norm__contains=slowo_norm)
+                    | Q(malzonek_b__imie_norm__contains=slowo_norm)
                     | Q(akt_nr__icontains=slowo)
-                    | Q(parafia__nazwa__icontains=slowo)
-                    | Q(akt_nr__icontains=slowo)  
-                    | Q(parafia__nazwa__icontains=slowo)
+                    | Q(parafia__nazwa_norm__contains=slowo_norm)
                     | Q(parafia_opis_reczny__icontains=slowo)
-                    | Q(swiadek_urzedowy__imie_nazwisko__icontains=slowo)
+                    | Q(swiadek_urzedowy__imie_nazwisko_norm__contains=slowo_norm)
                     | Q(swiadek_urzedowy_opis_reczny__icontains=slowo)  
                 )
 
@@ -753,11 +807,13 @@ class MalzenstwoListaPDFView(MalzenstwoListaView):
 # === NAMASZCZENIE CHORYCH
 # =============================================================================
 
-class NamaszczenieListaView(LoginRequiredMixin, ListView):
+class NamaszczenieListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = NamaszczenieChorych
     template_name = "sakramenty/namaszczenie_lista.html"
     context_object_name = "namaszczenia"
     paginate_by = 20
+    # data bywa pusta – takie wpisy idą na koniec listy
+    klucz_stronicowania = ("-data", "osoba__nazwisko", "pk")
 
     def get_queryset(self):
         qs = (
@@ -768,9 +824,10 @@ class NamaszczenieListaView(LoginRequiredMixin, ListView):
         
         q = (self.request.GET.get("q") or "").strip()
         if q:
+            q_norm = normalizuj(q)
             qs = qs.filter(
-                Q(osoba__nazwisko__icontains=q)
-                | Q(osoba__imie_pierwsze__icontains=q)
+                Q(osoba__nazwisko_norm__contains=q_norm)
+                | Q(osoba__imie_norm__contains=q_norm)
                 | Q(miejsce__icontains=q)
             )
 
@@ -915,7 +972,7 @@ class NamaszczenieListaPDFView(NamaszczenieListaView):
 # === ZGON
 # =============================================================================
 
-class ZgonListaView(LoginRequiredMixin, ListView):
+class ZgonListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     model = Zgon
     template_name = "sakramenty/zgon_lista.html"
     context_object_name = "zgony"
@@ -926,11 +983,15 @@ class ZgonListaView(LoginRequiredMixin, ListView):
         qs = super().get_queryset().select_related("osoba")
         
         q = (self.request.GET.get("q") or "").strip()
-        if q:
+        if q and self.request.GET.get("brzmi"):
+            # tryb "brzmi jak" – klucz fonetyczny nazwiska (lub rodowego) zmarłego
+            qs = _filtr_brzmi_jak(qs, q, ["osoba"])
+        elif q:
             for slowo in q.split():
+                slowo_norm = normalizuj(slowo)
                 qs = qs.filter(
-                    Q(osoba__nazwisko__icontains=slowo)
-                    | Q(osoba__imie_pierwsze__icontains=slowo)
+                    Q(osoba__nazwisko_norm__contains=slowo_norm)
+                    | Q(osoba__imie_norm__contains=slowo_norm)
                     | Q(akt_nr__icontains=slowo)
                     | Q(cmentarz__icontains=slowo)
                 )
@@ -1161,4 +1222,109 @@ class ZgonPDFView(LoginRequiredMixin, View):
             # 'parafia' - dodane automatycznie
         }
         filename = f"Zgon_{zgon.osoba.nazwisko}.pdf"
-        return render_to_pdf('sakramenty/druki/zgon_pdf.html', context, filename)
\ No newline at end of file
+        return render_to_pdf('sakramenty/druki/zgon_pdf.html', context, filename)
+
+
+# =============================================================================
+# === KSIĘGI ROCZNE – WYDRUK W TLE
+# =============================================================================
+
+class WydrukiKsiagListaView(RolaWymaganaMixin, ListView):
+    """
+    Zlecenia wydruku całych roczników ksiąg. PDF generuje w tle komenda
+    `manage.py generuj_ksiegi` – strona tylko pokazuje postęp i pliki.
+    """
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+    model = WydrukKsiegi
+    template_name = "sakramenty/wydruki_ksiag.html"
+    context_object_name = "wydruki"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return WydrukKsiegi.objects.select_related("zlecil").order_by("-utworzono", "-pk")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["form"] = WydrukKsiegiForm(initial={"rok": timezone.localdate().year - 1})
+        ctx["form_skorowidz"] = SkorowidzForm(
+            initial={"rok": timezone.localdate().year - 1}, auto_id="skorowidz_%s"
+        )
+        ctx["w_toku"] = any(w.aktywny for w in ctx["wydruki"])
+        return ctx
+
+
+class WydrukKsiegiNowyView(RolaWymaganaMixin, View):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+
+    def post(self, request, *args, **kwargs):
+        form = WydrukKsiegiForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, "Wybierz księgę i poprawny rok.")
+            return redirect("wydruki_ksiag")
+
+        zlecenie, nowe = zlec_wydruk(form.cleaned_data["ksiega"], form.cleaned_data["rok"], request.user)
+        if nowe:
+            zapisz_log(request, "WYDRUK_KSIEGI", zlecenie, opis=f"Zlecono wydruk: {zlecenie}")
+            messages.success(request, f"Zlecono wydruk: {zlecenie.get_ksiega_display()} {zlecenie.rok}.")
+        else:
+            messages.info(request, "Ten rocznik jest już w kolejce – poczekaj na zakończenie.")
+        return redirect("wydruki_ksiag")
+
+
+class WydrukKsiegiStatusView(RolaWymaganaMixin, View):
+    """Postęp zlecenia (JSON) – odpytywany przez stronę listy."""
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+
+    def get(self, request, pk):
+        zlecenie = get_object_or_404(WydrukKsiegi, pk=pk)
+        return JsonResponse({
+            "status": zlecenie.status,
+            "status_opis": zlecenie.get_status_display(),
+            "wykonano": zlecenie.wykonano,
+            "razem": zlecenie.razem,
+            "procent": zlecenie.procent,
+            "pobierz": (
+                reverse("wydruk_ksiegi_pobierz", args=[zlecenie.pk])
+                if zlecenie.status == StatusWydruku.GOTOWY else None
+            ),
+        })
+
+
+class WydrukKsiegiPobierzView(RolaWymaganaMixin, View):
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+
+    def get(self, request, pk):
+        zlecenie = get_object_or_404(WydrukKsiegi, pk=pk)
+        if zlecenie.status != StatusWydruku.GOTOWY or not zlecenie.plik:
+            raise Http404("Wydruk nie jest gotowy.")
+        nazwa = f"{zlecenie.get_ksiega_display().replace(' ', '_')}_{zlecenie.rok}.pdf"
+        return FileResponse(zlecenie.plik.open("rb"), content_type="application/pdf", filename=nazwa)
+
+
+# =============================================================================
+# === SKOROWIDZE ROCZNIKÓW
+# =============================================================================
+
+class SkorowidzPDFView(RolaWymaganaMixin, View):
+    """Alfabetyczny skorowidz rocznika (?ksiega=…&rok=…) – PDF z cache (skorowidz.py)."""
+    dozwolone_role = [Rola.ADMIN, Rola.KSIADZ]
+
+    def get(self, request, *args, **kwargs):
+        form = SkorowidzForm(request.GET)
+        if not form.is_valid():
+            messages.error(request, "Wybierz księgę i poprawny rok skorowidza.")
+            return redirect("wydruki_ksiag")
+        ksiega, rok = form.cleaned_data["ksiega"], form.cleaned_data["rok"]
+        return self.odpowiedz(ksiega, rok)
+
+    def odpowiedz(self, ksiega, rok):
+        return odpowiedz_pdf(pdf_skorowidza(ksiega, rok), f"Skorowidz_{ksiega.lower()}_{rok}.pdf")
+
+
+class SkorowidzCSVView(SkorowidzPDFView):
+    def odpowiedz(self, ksiega, rok):
+        return strumien_csv(
+            NAGLOWEK_CSV_SKOROWIDZA,
+            wiersze_csv_skorowidza(ksiega, rok),
+            f"skorowidz_{ksiega.lower()}_{rok}.csv",
+        )
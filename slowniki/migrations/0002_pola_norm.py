@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+def uzupelnij_parafie(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("slowniki", "Parafia"), {
+        "nazwa_norm": ("nazwa",),
+        "lokalizacja_norm": ("miejscowosc", "diecezja"),
+    })
+
+
+def uzupelnij_duchownych(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("slowniki", "Duchowny"), {
+        "imie_nazwisko_norm": ("imie_nazwisko",),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slowniki', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='duchowny',
+            name='imie_nazwisko_norm',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='parafia',
+            name='lokalizacja_norm',
+            field=models.CharField(blank=True, editable=False, max_length=101),
+        ),
+        migrations.AddField(
+            model_name='parafia',
+            name='nazwa_norm',
+            field=models.CharField(blank=True, editable=False, max_length=80),
+        ),
+        migrations.AddIndex(
+            model_name='duchowny',
+            index=models.Index(fields=['imie_nazwisko_norm'], name='slowniki_du_imie_na_93cc67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parafia',
+            index=models.Index(fields=['nazwa_norm'], name='slowniki_pa_nazwa_n_92dd90_idx'),
+        ),
+        migrations.RunPython(uzupelnij_parafie, migrations.RunPython.noop),
+        migrations.RunPython(uzupelnij_duchownych, migrations.RunPython.noop),
+    ]
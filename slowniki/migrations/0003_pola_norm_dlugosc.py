@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+from parafia.utils_tekst import uzupelnij_pola_norm
+
+
+# wartości przycięte do poprzedniej długości kolumn – liczymy od nowa
+def uzupelnij_parafie(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("slowniki", "Parafia"), {
+        "nazwa_norm": ("nazwa",),
+        "lokalizacja_norm": ("miejscowosc", "diecezja"),
+    })
+
+
+def uzupelnij_duchownych(apps, schema_editor):
+    uzupelnij_pola_norm(apps.get_model("slowniki", "Duchowny"), {
+        "imie_nazwisko_norm": ("imie_nazwisko",),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slowniki', '0002_pola_norm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='duchowny',
+            name='imie_nazwisko_norm',
+            field=models.CharField(blank=True, editable=False, max_length=60),
+        ),
+        migrations.AlterField(
+            model_name='parafia',
+            name='lokalizacja_norm',
+            field=models.CharField(blank=True, editable=False, max_length=202),
+        ),
+        migrations.AlterField(
+            model_name='parafia',
+            name='nazwa_norm',
+            field=models.CharField(blank=True, editable=False, max_length=160),
+        ),
+        migrations.RunPython(uzupelnij_parafie, migrations.RunPython.noop),
+        migrations.RunPython(uzupelnij_duchownych, migrations.RunPython.noop),
+    ]
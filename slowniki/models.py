@@ -1,6 +1,8 @@
 #slowniki/models.py
 from django.db import models
 
+from parafia.utils_tekst import ustaw_pola_norm
+
 class Parafia(models.Model):
     nazwa = models.CharField(
         "Nazwa parafii",
@@ -60,16 +62,35 @@ class Parafia(models.Model):
         help_text="Np. dekanat, status, uwagi własne"
     )
 
+    # Kolumny-cienie do wyszukiwania (bez polskich znaków, małymi literami)
+    # (dwa razy dłuższe niż źródła – normalizacja może wydłużyć tekst: ß -> ss)
+    nazwa_norm = models.CharField(max_length=160, blank=True, editable=False)
+    lokalizacja_norm = models.CharField(max_length=202, blank=True, editable=False)
+
+    POLA_NORM = {
+        "nazwa_norm": ("nazwa",),
+        "lokalizacja_norm": ("miejscowosc", "diecezja"),
+    }
+
     class Meta:
         verbose_name = "Parafia"
         verbose_name_plural = "Parafie"
         ordering = ["miejscowosc", "nazwa"]
+        indexes = [
+            models.Index(fields=["nazwa_norm"]),
+        ]
 
     def __str__(self):
         if self.miejscowosc:
             return f"{self.miejscowosc} – {self.nazwa}"
         return self.nazwa
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self, self.POLA_NORM, kwargs.get("update_fields")
+        )
+        super().save(*args, **kwargs)
+
 
 class Duchowny(models.Model):
     TYTUL_CHOICES = [
@@ -119,16 +140,33 @@ class Duchowny(models.Model):
         help_text="Np. proboszcz, wikariusz, biskup pomocniczy"
     )
 
+    # Kolumna-cień do wyszukiwania (bez polskich znaków, małymi literami)
+    # (dwa razy dłuższa niż źródło – normalizacja może wydłużyć tekst: ß -> ss)
+    imie_nazwisko_norm = models.CharField(max_length=60, blank=True, editable=False)
+
+    POLA_NORM = {
+        "imie_nazwisko_norm": ("imie_nazwisko",),
+    }
+
     class Meta:
         verbose_name = "Duchowny"
         verbose_name_plural = "Duchowni"
         ordering = ["imie_nazwisko"]
+        indexes = [
+            models.Index(fields=["imie_nazwisko_norm"]),
+        ]
 
     def __str__(self):
         if self.tytul:
             return f"{self.tytul} {self.imie_nazwisko}"
         return self.imie_nazwisko
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = ustaw_pola_norm(
+            self, self.POLA_NORM, kwargs.get("update_fields")
+        )
+        super().save(*args, **kwargs)
+
 
 class Wyznanie(models.Model):
     nazwa = models.CharField(
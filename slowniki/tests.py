@@ -1,6 +1,7 @@
 # slowniki/tests.py
 from django.test import TestCase
 from slowniki.forms import ParafiaForm
+from slowniki.models import Duchowny, Parafia
 
 class ParafiaFormValidationTest(TestCase):
     def test_invalid_postal_code(self):
@@ -35,3 +36,16 @@ class ParafiaFormValidationTest(TestCase):
             "telefon": "123456789",
         })
         self.assertTrue(form.is_valid(), form.errors)
+
+
+class PolaNormTest(TestCase):
+    def test_parafia_i_duchowny_maja_kolumny_norm(self):
+        parafia = Parafia.objects.create(nazwa="Parafia św. Józefa", miejscowosc="Łódź", diecezja="Łódzka")
+        duchowny = Duchowny.objects.create(imie_nazwisko="Paweł Ślęzak", parafia=parafia)
+
+        self.assertEqual(parafia.nazwa_norm, "parafia sw. jozefa")
+        self.assertEqual(parafia.lokalizacja_norm, "lodz lodzka")
+        self.assertEqual(duchowny.imie_nazwisko_norm, "pawel slezak")
+        self.assertEqual(
+            list(Duchowny.objects.filter(imie_nazwisko_norm__contains="slez")), [duchowny]
+        )
@@ -9,6 +9,8 @@ from django.views.generic import CreateView, DeleteView, DetailView, ListView, U
 
 from konta.mixins import RolaWymaganaMixin
 from konta.models import Rola
+from parafia.utils_stronicowanie import StronicowanieKluczoweMixin
+from parafia.utils_tekst import normalizuj
 
 from .forms import DuchownyForm, ParafiaForm, WyznanieForm
 from .models import Duchowny, Parafia, Wyznanie
@@ -35,10 +37,10 @@ class ParafiaListaView(LoginRequiredMixin, ListView):
 
         if q:
             for s in q.split():
+                s_norm = normalizuj(s)
                 qs = qs.filter(
-                    Q(nazwa__icontains=s)
-                    | Q(miejscowosc__icontains=s)
-                    | Q(diecezja__icontains=s)
+                    Q(nazwa_norm__contains=s_norm)
+                    | Q(lokalizacja_norm__contains=s_norm)
                 )
         return qs
 
@@ -118,7 +120,7 @@ class ParafiaUsunView(RolaWymaganaMixin, DeleteView):
 # =============================================================================
 
 
-class DuchownyListaView(LoginRequiredMixin, ListView):
+class DuchownyListaView(LoginRequiredMixin, StronicowanieKluczoweMixin, ListView):
     """
     Lista duchownych z wyszukiwarką po imieniu i nazwisku.
     """
@@ -135,7 +137,7 @@ class DuchownyListaView(LoginRequiredMixin, ListView):
 
         if q:
             for s in q.split():
-                qs = qs.filter(Q(imie_nazwisko__icontains=s))
+                qs = qs.filter(Q(imie_nazwisko_norm__contains=normalizuj(s)))
         return qs
 
     def get_context_data(self, **kwargs):